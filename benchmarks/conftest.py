@@ -0,0 +1,120 @@
+"""
+Shared fixtures and options for the benchmark suite.
+
+Run with `python -m pytest benchmarks`. Pass --bench-json to record the
+results, and --bench-baseline with an earlier recording to fail any
+benchmark that got slower than --bench-threshold times its old time.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict
+
+import pytest
+
+# Make the 'lib' package importable without installing anything
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Results of this session: benchmark name -> measurements
+RESULTS: Dict[str, Dict[str, Any]] = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--bench-json", default=None,
+                    help="write benchmark results to this JSON file")
+    group.addoption("--bench-baseline", default=None,
+                    help="JSON results from an earlier run to check for regressions")
+    group.addoption("--bench-threshold", type=float, default=1.25,
+                    help="slowdown factor over the baseline counted as a regression")
+
+
+def _git_commit() -> str:
+    """
+    Returns the current commit hash, or an empty string outside a git checkout
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+class Bench:
+    """
+    Times a callable: best of several rounds, each long enough to measure
+    """
+
+    def __init__(self, name: str, baseline: Dict[str, Any], threshold: float):
+        self.name = name
+        self.baseline = baseline
+        self.threshold = threshold
+
+    def __call__(self, func: Callable, *args, rounds: int = 5, min_time: float = 0.005) -> float:
+        """
+        Benchmarks func(*args) and returns the best time per call in nanoseconds
+        """
+        # Calibrate the number of calls per round
+        number = 1
+        while True:
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                func(*args)
+            elapsed = time.perf_counter_ns() - start
+            if elapsed >= min_time * 1e9 or number >= 1 << 20:
+                break
+            number *= 2
+
+        best = elapsed / number
+        for _ in range(rounds - 1):
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                func(*args)
+            best = min(best, (time.perf_counter_ns() - start) / number)
+
+        RESULTS[self.name] = {"ns_per_call": best, "calls_per_round": number, "rounds": rounds}
+
+        old = self.baseline.get(self.name)
+        if old and best > old["ns_per_call"] * self.threshold:
+            pytest.fail(f"{self.name} regressed: {best:.0f} ns/call vs "
+                        f"{old['ns_per_call']:.0f} ns/call in the baseline")
+        return best
+
+
+@pytest.fixture(scope="session")
+def _baseline(request) -> Dict[str, Any]:
+    path = request.config.getoption("--bench-baseline")
+    if not path:
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)["results"]
+
+
+@pytest.fixture
+def bench(request, _baseline) -> Bench:
+    """
+    Benchmark timer named after the requesting test
+    """
+    return Bench(request.node.nodeid.split("::", 1)[-1], _baseline,
+                 request.config.getoption("--bench-threshold"))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    path = session.config.getoption("--bench-json")
+    if path and RESULTS:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"commit": _git_commit(), "python": sys.version.split()[0],
+                       "results": RESULTS}, f, indent=2, sort_keys=True)
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not RESULTS:
+        return
+    terminalreporter.section("benchmarks")
+    width = max(len(name) for name in RESULTS)
+    for name, result in sorted(RESULTS.items()):
+        ns = result["ns_per_call"]
+        terminalreporter.write_line(f"{name:<{width}}  {ns / 1000:>12.2f} us/call")
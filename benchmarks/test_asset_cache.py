@@ -0,0 +1,71 @@
+"""
+The memory-mapped pixel cache: images loaded from it can be drawn on, without changing the file
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+from conftest import ROOT  # noqa: E402
+from lib.asset_cache import AssetCache  # noqa: E402
+
+DIE = os.path.join(ROOT, "assets", "diceOne.png")
+PORTRAIT = os.path.join(ROOT, "assets", "human.png")
+
+
+def scaled(source, size):
+    return pygame.transform.smoothscale(pygame.image.load(source).convert_alpha(), size)
+
+
+def test_cached_image_can_be_drawn_on(tmp_path):
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((10, 10))
+    path = str(tmp_path / "pixels.bin")
+    cache = AssetCache(path)
+    for size in [(60, 60), (30, 30), (7, 7)]:
+        cache.put(DIE, size, scaled(DIE, size))
+    cache.save()
+    original = pygame.image.tobytes(scaled(DIE, (30, 30)), cache.format)
+
+    cache = AssetCache(path)
+    for size in [(60, 60), (30, 30), (7, 7)]:
+        die = cache.get(DIE, size)
+        die.fill((255, 0, 0))
+        pygame.draw.rect(die, (0, 0, 255), die.get_rect(), 2)
+        assert die.get_at((size[0] // 2, size[1] // 2)) == (255, 0, 0, 255)
+    assert cache.hits == 3
+
+    # The drawing stayed in memory: rewriting the file keeps the cached pixels as they were
+    cache.put(PORTRAIT, (40, 40), scaled(PORTRAIT, (40, 40)))
+    cache.save()
+    die = AssetCache(path).get(DIE, (30, 30))
+    assert pygame.image.tobytes(die, cache.format) == original
+
+
+def test_file_keeps_only_recent_sizes(tmp_path, monkeypatch):
+    from lib import asset_cache
+
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((10, 10))
+    monkeypatch.setattr(asset_cache, 'MAX_SIZES', 3)
+    path = str(tmp_path / "pixels.bin")
+    image = scaled(DIE, (8, 8))
+
+    # One run per window size, as a kiosk that keeps being resized
+    for size in range(8, 20):
+        cache = AssetCache(path)
+        for kept in range(max(8, size - 2), size):
+            assert cache.get(DIE, (kept, kept)) is not None
+        cache.put(DIE, (size, size), pygame.transform.scale(image, (size, size)))
+        cache.save()
+        # Saving twice in one run keeps what the first save wrote
+        cache.put(PORTRAIT, (size, size), pygame.transform.scale(image, (size, size)))
+        cache.save()
+        assert len(cache.index) <= 2 * 3
+
+    cache = AssetCache(path)
+    assert sorted(key.split('|')[3] for key in cache.index) == ['17x17', '18x18', '19x19', '19x19']
+    assert os.path.getsize(path) < 64 * 1024
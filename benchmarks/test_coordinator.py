@@ -0,0 +1,87 @@
+"""
+The simulation coordinator with local worker processes, on localhost
+"""
+import asyncio
+import json
+
+from lib.coordinator import Coordinator, run_coordinator, summarize_range
+
+GAMES, RANGE_SIZE = 60, 5
+
+
+class StallingCoordinator(Coordinator):
+    """
+    Stops handing out work once <stop_after> ranges are in, so a test can kill the run partway
+    """
+
+    def __init__(self, *args, stop_after: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stop_after = stop_after
+        self.stalled = asyncio.Event()
+
+    def dispatch(self, leased, command, arg):
+        if command == 'WORK' and len(self.totals.done) >= self.stop_after:
+            self.stalled.set()
+            return {'wait': 0.05}
+        return super().dispatch(leased, command, arg)
+
+
+async def killed_partway(checkpoint: str) -> int:
+    coordinator = StallingCoordinator('greedy', GAMES, range_size=RANGE_SIZE, checkpoint=checkpoint, stop_after=4)
+    run = asyncio.ensure_future(run_coordinator(coordinator, port=0, local_workers=2, progress=False))
+    await asyncio.wait_for(coordinator.stalled.wait(), timeout=60)
+    run.cancel()
+    await asyncio.gather(run, return_exceptions=True)
+    return coordinator.totals.games
+
+
+def run_to_end(checkpoint=None, workers=3):
+    coordinator = Coordinator('greedy', GAMES, range_size=RANGE_SIZE, checkpoint=checkpoint)
+    return asyncio.run(run_coordinator(coordinator, port=0, local_workers=workers, progress=False))
+
+
+def test_resumed_run_matches_uninterrupted(tmp_path):
+    checkpoint = str(tmp_path / "run.json")
+    played = asyncio.run(killed_partway(checkpoint))
+    assert 0 < played < GAMES
+    with open(checkpoint, encoding='utf-8') as f:
+        assert json.load(f)['games_played'] == played
+
+    resumed = run_to_end(checkpoint, workers=2)
+    uninterrupted = run_to_end()
+    assert resumed.games == uninterrupted.games == GAMES
+    assert resumed.histogram == uninterrupted.histogram
+    assert resumed.category_totals == uninterrupted.category_totals
+
+
+def test_bad_results_get_err():
+    async def session():
+        coordinator = Coordinator('greedy', 20, range_size=10)
+        await coordinator.start(port=0)
+        reader, writer = await asyncio.open_connection('127.0.0.1', coordinator.port)
+
+        async def request(line: bytes) -> str:
+            writer.write(line + b"\n")
+            return (await reader.readline()).decode().strip()
+
+        try:
+            work = json.loads((await request(b"WORK"))[3:])
+            summary = summarize_range('greedy', work['first'], work['count'])
+            not_leased = dict(summary, first=10)
+            short = dict(summary, count=summary['count'] - 1)
+            replies = [await request(b"RESULT " + json.dumps(bad).encode()) for bad in (not_leased, short)]
+            replies.append(await request(b"RESULT {"))
+            replies.append(await request(b"\xff\xfeWORK"))
+            # The connection survived all that, and the lease is still good
+            replies.append(await request(b"RESULT " + json.dumps(summary).encode()))
+        finally:
+            writer.close()
+            await coordinator.close()
+        return replies
+
+    *errors, accepted = asyncio.run(session())
+    assert errors[0] == "ERR Range 10 isn't leased to this worker"
+    assert errors[1] == "ERR Range 0 has the wrong number of games"
+    assert errors[2].startswith("ERR ")
+    assert errors[3] == "ERR Request is not utf-8 text"
+    assert accepted == 'OK {"games_played":10}'
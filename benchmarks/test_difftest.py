@@ -0,0 +1,45 @@
+"""
+Differential checks of the fast scoring paths against ScorecardLogic, and of the harness itself
+"""
+from lib.difftest import check_states, check_tables, fuzz, fuzz_range
+from lib.rules import STANDARD, VariantScorecard
+
+
+class SingleBonusScorecard(VariantScorecard):
+    """
+    A fast scorecard with a planted bug: a bonus Yahtzee counts once
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name, STANDARD)
+
+    def update_score(self, dice_values, category):
+        before = self.yahtzee_bonus
+        super().update_score(dice_values, category)
+        if self.yahtzee_bonus > before:
+            self.yahtzee_bonus -= 1
+
+
+def test_tables_match_reference():
+    assert check_tables() == []
+
+
+def test_edge_states_match_reference():
+    checked, mismatch = check_states()
+    assert checked > 252 * 13
+    assert mismatch is None, str(mismatch)
+
+
+def test_fuzz_finds_and_minimizes_planted_bug():
+    played, found = fuzz(2000, SingleBonusScorecard, workers=1)
+    assert found is not None
+    mismatch = found[1]
+    assert mismatch.field == 'yahtzee_bonus'
+    # A scored Yahtzee, then a second one anywhere: the lowest faces that still show it
+    assert len(mismatch.history) == 2
+    assert mismatch.history[0] == ((1, 1, 1, 1, 1), 'Yahtzee')
+    assert mismatch.history[1][0] == (1, 1, 1, 1, 1)
+
+
+def test_fuzz_speed(bench):
+    bench(fuzz_range, 'variant', 0, 20)
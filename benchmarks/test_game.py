@@ -0,0 +1,55 @@
+"""
+Benchmarks for dice rolling, bot turns and complete headless games
+"""
+from random import Random
+
+import pytest
+
+from lib.dice_logic import DiceLogic
+from lib.game_logic import MAX_ROUNDS, YahtzeeGame
+from lib.scorecard_logic import ScorecardLogic
+
+
+def test_roll_dice_first(bench):
+    dice = DiceLogic(Random(1))
+
+    def first_roll():
+        dice.rolled = []
+        dice.roll_dice()
+    bench(first_roll)
+
+
+def test_roll_dice_with_holds(bench):
+    dice = DiceLogic(Random(1))
+    dice.roll_dice()
+    dice.held = [True, False, True, False, False]
+    bench(dice.roll_dice)
+
+
+@pytest.fixture(scope="module")
+def game():
+    game = YahtzeeGame()
+    game.active_dice.rng = Random(1)
+    return game
+
+
+@pytest.mark.parametrize("strategy", ["greedy", "ev"])
+def test_process_turn_ai(bench, game, strategy):
+    def one_turn():
+        scorecard = ScorecardLogic("bench")
+        game.reset_turn()
+        game.process_turn_ai(scorecard, strategy)
+    bench(one_turn, rounds=3)
+
+
+@pytest.mark.parametrize("strategy", ["greedy", "ev"])
+def test_full_game(bench, game, strategy):
+    def full_game():
+        game.setup_new_game("bench", "")
+        game.active_dice.rng = Random(1)
+        for _ in range(MAX_ROUNDS):
+            game.reset_turn()
+            game.process_turn_ai(game.player1_scorecard, strategy)
+            game.next_round()
+        assert game.is_game_over()
+    bench(full_game, rounds=3)
@@ -0,0 +1,51 @@
+"""
+Headless frame-render benchmarks, using SDL's dummy video driver
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+from conftest import ROOT  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def ui():
+    # ui_common loads its assets relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        from lib import dice_ui, scorecard_ui
+    finally:
+        os.chdir(cwd)
+    return dice_ui, scorecard_ui
+
+
+def test_scorecard_draw(bench, ui):
+    _, scorecard_ui = ui
+    from lib.scorecard_logic import ScorecardLogic
+    scorecard = ScorecardLogic("bench")
+    for category in scorecard.get_all_categories()[:7]:
+        scorecard.update_score([3, 3, 3, 4, 5], category)
+    card_ui = scorecard_ui.ScorecardUI(50, 300, scorecard)
+    bench(card_ui.draw)
+
+
+def test_dice_draw(bench, ui):
+    dice_ui, _ = ui
+    from lib.dice_logic import DiceLogic
+    dice = DiceLogic()
+    dice.roll_dice()
+    dice.held = [True, False, True, False, False]
+    bench(dice_ui.DiceUI(dice).draw)
+
+
+def test_canvas_refuses_plain_surfaces(ui):
+    from lib.ui_common import FONT, SCREEN, int_to_die
+    SCREEN.blit(FONT.render("Held", True, (255, 255, 255)), (10, 10))
+    SCREEN.blit(int_to_die[6], (10, 50))
+    with pytest.raises(TypeError, match="LayoutImage"):
+        SCREEN.blit(pygame.Surface((8, 8)), (10, 10))
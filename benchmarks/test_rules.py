@@ -0,0 +1,105 @@
+"""
+Rules variants: STANDARD against ScorecardLogic, and the scoring of each variant beyond it
+"""
+from random import Random
+
+import pytest
+
+from lib.rules import FORCED_ORDER, STANDARD, TRIPLE, YATZY, VariantScorecard, get_rules
+from lib.scorecard_logic import ScorecardLogic
+
+TOTALS = ['upper_sub', 'lower_sub', 'total_score', 'plus_minus', 'yahtzee_bonus', 'has_upper_bonus']
+
+
+def scored(rules, plays):
+    """
+    A scorecard for <rules> with each (dice, category) of <plays> scored in turn
+    """
+    scorecard = VariantScorecard("Ann", rules)
+    for dice, category in plays:
+        scorecard.update_score(list(dice), category)
+    return scorecard
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_standard_matches_scorecard_logic(seed):
+    rng = Random(seed)
+    logic, variant = ScorecardLogic("Ann"), VariantScorecard("Ann", STANDARD)
+    assert variant.get_all_categories() == logic.get_all_categories()
+    categories = logic.get_all_categories()
+    rng.shuffle(categories)
+    for category in categories:
+        # Plenty of Yahtzees, to exercise the bonus and jokers
+        dice = [rng.randint(1, 6)] * 5 if rng.random() < 0.3 else [rng.randint(1, 6) for _ in range(5)]
+        assert variant.calculate_score(dice, category) == logic.calculate_score(dice, category)
+        logic.update_score(dice, category)
+        variant.update_score(dice, category)
+        assert variant.scores == logic.scores
+        assert [getattr(variant, name) for name in TOTALS] == [getattr(logic, name) for name in TOTALS]
+    assert variant.final_tally() == logic.final_tally()
+
+
+@pytest.mark.parametrize("dice, category, score", [
+    ((3, 3, 5, 5, 6), 'One Pair', 10),
+    ((3, 3, 5, 5, 6), 'Two Pairs', 16),
+    ((4, 4, 4, 4, 4), 'Two Pairs', 0),
+    ((2, 2, 2, 6, 6), 'Three of a Kind', 6),
+    ((5, 5, 5, 5, 1), 'Four of a Kind', 20),
+    ((1, 2, 3, 4, 5), 'Small Straight', 15),
+    ((2, 3, 4, 5, 6), 'Small Straight', 0),
+    ((2, 3, 4, 5, 6), 'Large Straight', 20),
+    ((2, 2, 6, 6, 6), 'Full House', 22),
+    ((6, 6, 6, 6, 6), 'Full House', 0),
+    ((1, 3, 4, 6, 6), 'Chance', 20),
+    ((2, 2, 2, 2, 2), 'Yatzy', 50),
+])
+def test_yatzy_categories(dice, category, score):
+    assert VariantScorecard("Ann", YATZY).calculate_score(dice, category) == score
+
+
+def test_yatzy_bonuses():
+    # 50 for the upper section at 63, and neither jokers nor extra Yatzy bonuses
+    scorecard = scored(YATZY, [((6, 6, 6, 1, 2), 'Sixes'), ((5, 5, 5, 1, 2), 'Fives'), ((4, 4, 4, 1, 2), 'Fours'),
+                               ((3, 3, 3, 1, 2), 'Threes'), ((2, 2, 2, 1, 1), 'Twos'), ((1, 1, 1, 2, 3), 'Ones')])
+    assert scorecard.has_upper_bonus and scorecard.upper_sub == 63 + 50
+    scorecard.update_score([4, 4, 4, 4, 4], 'Yatzy')
+    scorecard.update_score([4, 4, 4, 4, 4], 'Full House')
+    assert scorecard.scores['Full House'] == 0
+    assert scorecard.yahtzee_bonus == 0 and scorecard.final_tally() == 63 + 50 + 50
+    assert YATZY.rounds == 15
+
+
+def test_forced_order_fills_top_to_bottom():
+    scorecard = VariantScorecard("Ann", FORCED_ORDER)
+    assert [c for c in scorecard.get_all_categories() if not scorecard.is_category_used(c)] == ['Ones']
+    # Anything but the next category is ignored
+    scorecard.update_score([6, 6, 6, 6, 6], 'Yahtzee')
+    assert scorecard.scores['Yahtzee'] is None and scorecard.total_score == 0
+    scorecard.update_score([1, 1, 2, 3, 4], 'Ones')
+    assert scorecard.scores['Ones'] == 2
+    assert FORCED_ORDER.best_category([6, 6, 6, 6, 6], scorecard) == 'Twos'
+
+
+def test_triple_columns_multiply():
+    assert TRIPLE.rounds == 39
+    assert TRIPLE.categories[13] == 'Ones x2' and TRIPLE.categories[-1] == 'Chance x3'
+    faces = ['Ones', 'Twos', 'Threes', 'Fours', 'Fives', 'Sixes']
+    # Three of each face in the second column: 63, and the bonus, both doubled
+    scorecard = scored(TRIPLE, [((face, face, face, 1, 2) if face > 2 else (face,) * 3 + (5, 6), f"{name} x2")
+                                for face, name in enumerate(faces, 1)])
+    assert scorecard.upper_sub == 2 * (63 + 35)
+    assert scorecard.plus_minus == 0
+
+    scorecard.update_score([5, 5, 5, 5, 5], 'Yahtzee x3')
+    assert scorecard.scores['Yahtzee x3'] == 150
+    # An extra Yahtzee: the 100 point bonus once, and the joker score times the column
+    scorecard.update_score([2, 2, 2, 2, 2], 'Large Straight x2')
+    assert scorecard.scores['Large Straight x2'] == 80
+    assert scorecard.lower_sub == 150 + 100 + 80
+    assert scorecard.final_tally() == 2 * (63 + 35) + 150 + 100 + 80
+
+
+def test_unknown_variant():
+    assert get_rules('yatzy') is YATZY
+    with pytest.raises(ValueError, match="Unknown rules variant"):
+        get_rules('nope')
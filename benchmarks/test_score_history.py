@@ -0,0 +1,131 @@
+"""
+The SQLite game history: upgrading old databases, the trigger-kept totals, the leaderboard view
+and importing the legacy high score file
+"""
+import sqlite3
+
+from lib.score_history import ScoreHistory
+
+# The database as the first version of the history created it, before games could be unranked
+FIRST_SCHEMA = """
+CREATE TABLE scores (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    player TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    won INTEGER
+);
+CREATE TABLE score_counts (score INTEGER PRIMARY KEY, n INTEGER NOT NULL);
+CREATE TABLE player_totals (player TEXT PRIMARY KEY, games INTEGER NOT NULL, total INTEGER NOT NULL);
+CREATE TRIGGER scores_count_insert AFTER INSERT ON scores BEGIN
+    INSERT INTO score_counts (score, n) VALUES (NEW.score, 1)
+        ON CONFLICT (score) DO UPDATE SET n = n + 1;
+    INSERT INTO player_totals (player, games, total) VALUES (NEW.player, 1, NEW.score)
+        ON CONFLICT (player) DO UPDATE SET games = games + 1, total = total + NEW.score;
+END;
+CREATE VIEW high_scores AS
+    SELECT score, player, opponent FROM scores
+    WHERE opponent != ''
+    ORDER BY score DESC, player DESC, opponent DESC;
+"""
+
+
+def test_first_version_database_is_upgraded(tmp_path):
+    path = str(tmp_path / "history.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(FIRST_SCHEMA)
+    conn.executemany("INSERT INTO scores (played_at, player, opponent, score, won) VALUES (?, ?, ?, ?, ?)", [
+        (1.0, "Ann", "Yahtzee Bot", 250, 1),
+        (1.0, "Yahtzee Bot", "Ann", 200, 0),
+        (2.0, "Yahtzee Bot 1", "Yahtzee Bot 2", 400, 1),
+        (2.0, "Yahtzee Bot 2", "Yahtzee Bot 1", 150, 0),
+        (3.0, "Yahtzee Bot 1", "Yahtzee Bot 2 & Yahtzee Bot 3", 380, 1),
+        (4.0, "Yahtzee Bot 1", "Bob & Yahtzee Bot 2", 300, 1),
+        (5.0, "Cat", "", 350, None),
+    ])
+    conn.commit()
+    conn.close()
+
+    for _ in range(2):
+        history = ScoreHistory(path)
+        # Bot-only games are off the leaderboard, and so are practice games; the rest stay on it
+        assert history.top_scores() == [(300, "Yahtzee Bot 1", "Bob & Yahtzee Bot 2"),
+                                        (250, "Ann", "Yahtzee Bot"), (200, "Yahtzee Bot", "Ann")]
+        # ...but every game still counts in the statistics
+        assert history.player_stats("Yahtzee Bot 1")['games'] == 3
+        assert history.percentile(400) == 100.0 * 6 / 7
+        # Each opponent is linked, with their score where the game's other rows give it
+        assert history.head_to_head("Ann", "Yahtzee Bot") == {'games': 1, 'wins': 1, 'losses': 0, 'ties': 0}
+        assert history.head_to_head("Yahtzee Bot 1", "Yahtzee Bot 2") == {'games': 3, 'wins': 1, 'losses': 0,
+                                                                          'ties': 0}
+        history.close()
+
+
+def check_totals(history):
+    """
+    The trigger-kept tables agree with the games themselves
+    """
+    conn = history.conn
+    assert conn.execute("SELECT score, n FROM score_counts WHERE n > 0 ORDER BY score").fetchall() == \
+        conn.execute("SELECT score, COUNT(*) FROM scores GROUP BY score ORDER BY score").fetchall()
+    assert conn.execute("SELECT player, games, total FROM player_totals WHERE games > 0 "
+                        "ORDER BY player").fetchall() == \
+        conn.execute("SELECT player, COUNT(*), SUM(score) FROM scores GROUP BY player ORDER BY player").fetchall()
+
+
+def test_triggers_keep_totals(tmp_path):
+    history = ScoreHistory(str(tmp_path / "history.db"))
+    assert history.is_empty()
+    assert history.percentile(200) == 0.0 and history.score_at_percentile(50) == 0
+
+    history.record_game([("Ann", "Bob", 200, 0), ("Bob", "Ann", 240, 1)], played_at=1.0)
+    history.record_game([("Ann", "Bob", 260, 1), ("Bob", "Ann", 240, 0)], played_at=2.0)
+    history.record_game([("Ann", "", 180, None)], ranked=False)
+    history.bulk_insert([(3.0, "Cat", "Ann", 300, 1), (3.0, "Ann", "Cat", 100, 0)])
+    check_totals(history)
+    assert history.player_averages() == [("Cat", 1, 300.0), ("Bob", 2, 240.0), ("Ann", 4, 185.0)]
+    assert history.percentile(240) == 100.0 * 3 / 7
+    assert history.score_at_percentile(50) == 240
+    assert history.score_at_percentile(100) == 300
+
+    with history.conn:
+        history.conn.execute("DELETE FROM scores WHERE player = 'Cat' OR score < 200")
+    check_totals(history)
+    assert history.player_averages() == [("Bob", 2, 240.0), ("Ann", 2, 230.0)]
+    assert history.player_stats("Ann") == {'games': 2, 'average': 230.0, 'best': 260, 'worst': 200, 'wins': 1}
+    assert history.head_to_head("Ann", "Bob") == {'games': 2, 'wins': 1, 'losses': 1, 'ties': 0}
+    history.close()
+
+
+def test_legacy_high_scores_import(tmp_path):
+    legacy = tmp_path / "high_scores.txt"
+    legacy.write_text("250,Ann,Bob\nnot a score\n275,Bob,Ann\n,,\n190,Ann,Yahtzee Bot\n", encoding='utf-8')
+    history = ScoreHistory(str(tmp_path / "history.db"))
+    assert history.import_legacy(str(legacy)) == 3
+    assert history.top_scores(2) == [(275, "Bob", "Ann"), (250, "Ann", "Bob")]
+    check_totals(history)
+    # The file doesn't say who won
+    assert history.player_stats("Ann") == {'games': 2, 'average': 220.0, 'best': 250, 'worst': 190, 'wins': 0}
+    assert history.head_to_head("Ann", "Bob") == {'games': 1, 'wins': 0, 'losses': 0, 'ties': 0}
+    history.close()
+
+
+def test_head_to_head_in_multiplayer_games(tmp_path):
+    history = ScoreHistory(str(tmp_path / "history.db"))
+    history.record_game([("Ann", "Bob & Cat", 250, 0), ("Bob", "Ann & Cat", 270, 1), ("Cat", "Ann & Bob", 200, 0)],
+                        played_at=1.0)
+    history.record_game([("Ann", "Bob", 260, 1), ("Bob", "Ann", 240, 0)], played_at=2.0)
+    history.record_game([("Ann", "Bob", 230, 0), ("Bob", "Ann", 230, 0)], played_at=3.0)
+    # Whoever else was playing, Ann beat Cat once and lost to Bob once
+    assert history.head_to_head("Ann", "Bob") == {'games': 3, 'wins': 1, 'losses': 1, 'ties': 1}
+    assert history.head_to_head("Bob", "Ann") == {'games': 3, 'wins': 1, 'losses': 1, 'ties': 1}
+    assert history.head_to_head("Ann", "Cat") == {'games': 1, 'wins': 1, 'losses': 0, 'ties': 0}
+    assert history.head_to_head("Cat", "Bob") == {'games': 1, 'wins': 0, 'losses': 1, 'ties': 0}
+    assert history.head_to_head("Ann", "Bob & Cat") == {'games': 0, 'wins': 0, 'losses': 0, 'ties': 0}
+
+    with history.conn:
+        history.conn.execute("DELETE FROM scores WHERE played_at = 1.0")
+    assert history.head_to_head("Ann", "Bob") == {'games': 2, 'wins': 1, 'losses': 0, 'ties': 1}
+    assert history.conn.execute("SELECT COUNT(*) FROM opponents").fetchone()[0] == 4
+    history.close()
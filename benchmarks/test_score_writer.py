@@ -0,0 +1,80 @@
+"""
+Crash-safe writes, the high score file lock, and several processes sharing one high score file
+"""
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from lib.score_writer import (
+    HighScoreWriter, atomic_write_bytes, atomic_write_text, file_lock, merge_high_scores, read_high_score_file
+)
+
+
+def test_atomic_writes_replace_whole_files(tmp_path):
+    path = str(tmp_path / "scores.txt")
+    atomic_write_text(path, "250,Ann,Bob\n")
+    atomic_write_text(path, "300,Bob,Ann\n")
+    assert read_high_score_file(path) == [(300, 'Bob', 'Ann')]
+
+    data = bytes(range(256)) * 3
+    atomic_write_bytes(path, data)
+    with open(path, 'rb') as f:
+        assert f.read() == data
+
+    # A write that fails partway leaves the old file, and no temp file behind
+    with pytest.raises(TypeError):
+        atomic_write_bytes(path, "not bytes")
+    with open(path, 'rb') as f:
+        assert f.read() == data
+    assert os.listdir(tmp_path) == ["scores.txt"]
+
+
+def test_file_lock_is_exclusive(tmp_path):
+    path = str(tmp_path / "scores.txt")
+    entered = threading.Event()
+
+    def other_writer():
+        with file_lock(path):
+            entered.set()
+
+    with file_lock(path):
+        thread = threading.Thread(target=other_writer)
+        thread.start()
+        assert not entered.wait(0.2)
+    thread.join(timeout=10)
+    assert entered.is_set()
+
+
+def merge_many(path, player, count):
+    for score in range(count):
+        merge_high_scores(path, [(score, player, "Bot")], limit=100)
+
+
+def test_processes_sharing_a_file_keep_every_score(tmp_path):
+    path = str(tmp_path / "scores.txt")
+    players = ["Ann", "Bob", "Cat", "Dan"]
+    writers = [multiprocessing.Process(target=merge_many, args=(path, player, 15)) for player in players]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join(timeout=60)
+        assert writer.exitcode == 0
+
+    scores = read_high_score_file(path)
+    assert sorted(scores) == sorted((score, player, "Bot") for player in players for score in range(15))
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_writer_thread_keeps_the_best(tmp_path):
+    path = str(tmp_path / "scores.txt")
+    merge_high_scores(path, [(120, "Old", "Bot")])
+    writer = HighScoreWriter(path, limit=5)
+    for score in range(100, 300, 20):
+        writer.submit([(score, "Ann", "Bot")])
+    writer.flush()
+    assert read_high_score_file(path) == [(score, "Ann", "Bot") for score in range(280, 180, -20)]
+    writer.submit([(500, "Bob", "Ann")])
+    writer.close()
+    assert read_high_score_file(path)[0] == (500, "Bob", "Ann")
@@ -0,0 +1,50 @@
+"""
+Benchmarks for ScorecardLogic scoring and score updates
+"""
+import pytest
+
+from lib.scorecard_logic import ScorecardLogic
+
+CATEGORIES = ScorecardLogic("").get_all_categories()
+
+# A roll which scores in each category
+ROLLS = {
+    'Ones': [1, 1, 1, 4, 5], 'Twos': [2, 2, 3, 4, 5], 'Threes': [3, 3, 3, 3, 1],
+    'Fours': [4, 4, 1, 2, 6], 'Fives': [5, 5, 5, 2, 2], 'Sixes': [6, 6, 6, 6, 6],
+    'Three of a Kind': [4, 4, 4, 2, 6], 'Four of a Kind': [3, 3, 3, 3, 5],
+    'Full House': [2, 2, 5, 5, 5], 'Small Straight': [1, 2, 3, 4, 6],
+    'Large Straight': [2, 3, 4, 5, 6], 'Yahtzee': [5, 5, 5, 5, 5], 'Chance': [1, 3, 4, 6, 6],
+}
+
+
+@pytest.mark.parametrize("category", CATEGORIES)
+def test_calculate_score(bench, category):
+    scorecard = ScorecardLogic("bench")
+    bench(scorecard.calculate_score, ROLLS[category], category)
+
+
+def test_update_score_plain(bench):
+    def fill_card():
+        scorecard = ScorecardLogic("bench")
+        for category in CATEGORIES:
+            scorecard.update_score([1, 2, 3, 4, 6], category)
+    bench(fill_card)
+
+
+def test_update_score_upper_bonus(bench):
+    def earn_bonus():
+        scorecard = ScorecardLogic("bench")
+        for face, category in enumerate(CATEGORIES[:6], 1):
+            scorecard.update_score([face] * 4 + [1], category)
+        assert scorecard.has_upper_bonus
+    bench(earn_bonus)
+
+
+def test_update_score_joker(bench):
+    def score_jokers():
+        scorecard = ScorecardLogic("bench")
+        scorecard.update_score([4] * 5, 'Yahtzee')
+        for category in ('Full House', 'Small Straight', 'Large Straight', 'Fours'):
+            scorecard.update_score([4] * 5, category)
+        assert scorecard.scores['Large Straight'] == 40
+    bench(score_jokers)
@@ -0,0 +1,212 @@
+"""
+The table server, its client and the load generator, on localhost
+"""
+import asyncio
+import os
+import threading
+
+import pytest
+
+from lib.loadgen import MOVES, run_load
+from lib.net_client import GameClient, ServerError, apply_state
+from lib.outcomes import CATEGORY_INDEX, OUTCOME_INDEX, SCORE_TABLE
+from lib.server import GameServer
+
+
+class ServerThread:
+    """
+    A GameServer on port 0, run on its own event loop in a background thread
+    """
+
+    def __init__(self, **kwargs):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.server = GameServer(**kwargs)
+        self.call(self.server.start('127.0.0.1', 0))
+
+    def call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout=30)
+
+    @staticmethod
+    async def _cancel_handlers() -> None:
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def client(self) -> GameClient:
+        return GameClient('127.0.0.1', self.server.port)
+
+    def stop(self) -> None:
+        self.call(self.server.close())
+        # Connections a failed test left open
+        self.call(self._cancel_handlers())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+@pytest.fixture
+def server():
+    thread = ServerThread(bot_workers=2)
+    yield thread
+    thread.stop()
+
+
+def best_category(state):
+    """
+    The open category the current dice score most in
+    """
+    scores = SCORE_TABLE[OUTCOME_INDEX[tuple(sorted(state['dice']))]]
+    player = state['players'][state['player']]
+    return max((c for c, score in player['scores'].items() if score is None),
+               key=lambda c: scores[CATEGORY_INDEX[c]])
+
+
+def play_to_end(client, state):
+    """
+    Plays the human seats of a table to game over, one roll a turn; returns every state seen
+    """
+    states = [state]
+    while not state['game_over']:
+        state = client.roll()
+        states.append(state)
+        state = client.score(best_category(state))
+        states.append(state)
+    return states
+
+
+def test_moves_and_full_game(server):
+    client = server.client()
+    try:
+        state = client.new_table(["Ann", "Yahtzee Bot"])
+        assert [player['name'] for player in state['players']] == ["Ann", "Yahtzee Bot"]
+        assert (state['round'], state['player'], state['rolls_left']) == (0, 0, 3)
+
+        state = client.roll()
+        assert state['rolls_left'] == 2 and len(state['dice']) == 5
+        state = client.hold(1)
+        assert state['held'] == [False, True, False, False, False]
+        kept = state['dice'][1]
+        state = client.roll()
+        assert state['dice'][1] == kept
+        state = client.hold(1)
+        assert not any(state['held'])
+
+        category = best_category(state)
+        dice = state['dice']
+        state = client.score(category)
+        # The bot's turn was played before the reply
+        assert (state['round'], state['player'], state['rolls_left']) == (1, 0, 3)
+        assert state['players'][0]['scores'][category] == SCORE_TABLE[OUTCOME_INDEX[tuple(sorted(dice))]][
+            CATEGORY_INDEX[category]]
+        assert sum(score is not None for score in state['players'][1]['scores'].values()) == 1
+        client.roll()
+        with pytest.raises(ServerError, match="already scored"):
+            client.score(category)
+
+        state = play_to_end(client, client.score(best_category(client.state())))[-1]
+        assert state['game_over'] and state['round'] == 13
+        for player in state['players']:
+            assert all(score is not None for score in player['scores'].values())
+        with pytest.raises(ServerError, match="Game over"):
+            client.roll()
+    finally:
+        client.close()
+
+
+def test_load_generator():
+    latencies = asyncio.run(run_load(clients=4, games=1, names="Load;Yahtzee Bot", bot_workers=2))
+    assert len(latencies['NEW']) == len(latencies['CLOSE']) == 4
+    assert len(latencies['SCORE']) == 4 * 13
+    for move in MOVES:
+        assert latencies[move] == sorted(latencies[move])
+
+
+def test_remote_game_names_the_winner(server):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pytest.importorskip("pygame")
+    from lib.net_client import RemoteGameUI
+
+    client = server.client()
+    try:
+        state = client.new_table(["Ann", "Yahtzee Bot"])
+        ui = RemoteGameUI(client, state)
+        for state in play_to_end(client, state):
+            apply_state(ui.game, state)
+        ui.game_over = state['game_over']
+    finally:
+        client.close()
+
+    totals = [player['total'] for player in state['players']]
+    assert all(totals)
+    winner = max(range(2), key=lambda seat: (totals[seat], seat))
+    assert list(ui.game.board.totals) == totals
+    assert ui.status_text() == (f"Game over: {state['players'][winner]['name']} wins with {totals[winner]}. "
+                                "Press Q to quit.")
+
+
+def raw_request(sock_file, line: bytes) -> str:
+    sock_file.write(line + b"\n")
+    sock_file.flush()
+    return sock_file.readline().decode().rstrip("\n")
+
+
+def test_bad_requests_get_err(server):
+    client = server.client()
+    try:
+        file = client.file
+        assert raw_request(file, b"ROLL").startswith("ERR No table")
+        assert raw_request(file, b"NEW").startswith("ERR ")
+        assert raw_request(file, b"JOIN nope").startswith("ERR No such table")
+        assert raw_request(file, b"NEW Ann;Yahtzee Bot").startswith("OK ")
+        assert raw_request(file, b"HOLD 0").startswith("ERR Roll first")
+        assert raw_request(file, b"SCORE Chance").startswith("ERR Roll first")
+        assert raw_request(file, b"ROLL").startswith("OK ")
+        for arg in ["5", "-1", "x", "", "²", "١"]:
+            assert raw_request(file, f"HOLD {arg}".encode()).startswith("ERR HOLD needs"), arg
+        assert raw_request(file, b"SCORE Nothing").startswith("ERR No such category")
+        assert raw_request(file, b"\xff\xfe ROLL") == "ERR Request is not utf-8 text"
+        assert raw_request(file, b"JUMP").startswith("ERR Unknown command")
+        # None of that cost the connection
+        assert raw_request(file, b"STATE").startswith("OK ")
+    finally:
+        client.close()
+
+
+def wait_for_tables(server, count):
+    """
+    Waits for the server to notice disconnects, until it hosts <count> tables
+    """
+    for _ in range(200):
+        if len(server.server.tables) == count:
+            return
+        threading.Event().wait(0.01)
+    assert len(server.server.tables) == count
+
+
+def test_tables_close_with_their_last_connection():
+    server = ServerThread(max_tables=2, bot_workers=1)
+    try:
+        # Far more tables over the server's life than it may host at once
+        for _ in range(5):
+            client = server.client()
+            client.new_table(["Ann", "Yahtzee Bot"])
+            # Starting another table leaves the first
+            table_id = client.new_table(["Ann", "Yahtzee Bot"])['table']
+            assert list(server.server.tables) == [table_id]
+            client.close()
+            wait_for_tables(server, 0)
+
+        first, second = server.client(), server.client()
+        table_id = first.new_table(["Ann", "Bob"])['table']
+        second.join(table_id)
+        first.close()
+        wait_for_tables(server, 1)
+        assert second.roll()['rolls_left'] == 2
+        second.close()
+        wait_for_tables(server, 0)
+    finally:
+        server.stop()
@@ -0,0 +1,94 @@
+"""
+Saving a game in progress, and carrying on from the snapshot exactly where it left off
+"""
+import json
+import random
+
+import pytest
+
+from lib.game_logic import YahtzeeGame
+from lib.rules import get_rules
+from lib.snapshot import SNAPSHOT_VERSION, clear_snapshot, load_snapshot, restore_game, save_snapshot, snapshot_game
+
+
+def finish_turn(game):
+    """
+    Plays out the current turn from wherever it is, with the greedy bot's choices
+    """
+    dice = game.active_dice
+    scorecard = game.scorecards[game.current_player]
+    if dice.rolls_left == 3:
+        dice.roll_dice()
+        dice.rolls_left -= 1
+    while dice.rolls_left > 0 and game.ai_choose_holds(scorecard, 'greedy'):
+        dice.roll_dice()
+        dice.rolls_left -= 1
+    game.ai_choose_category(scorecard, 'greedy')
+    game.end_turn()
+    game.reset_turn()
+
+
+def play_out(game):
+    """
+    Plays the game to the end; returns everyone's final score
+    """
+    while not game.is_game_over():
+        finish_turn(game)
+    return [scorecard.final_tally() for scorecard in game.scorecards]
+
+
+def as_json(snapshot):
+    return json.loads(json.dumps(snapshot))
+
+
+@pytest.mark.parametrize("rules", [None, 'yatzy', 'triple'])
+def test_restored_game_plays_on_identically(tmp_path, rules):
+    path = str(tmp_path / "snapshot.json")
+    random.seed(4)
+    game = YahtzeeGame(load_high_scores=False, rules=get_rules(rules) if rules else None)
+    game.setup_new_game("Ann", "Yahtzee Bot", "Bob")
+    for _ in range(7):
+        finish_turn(game)
+    # Partway through a turn: rolled once, with a die held
+    dice = game.active_dice
+    dice.roll_dice()
+    dice.rolls_left -= 1
+    dice.set_hold(2, True)
+
+    save_snapshot(game, path, time_scale=4.0)
+    saved = load_snapshot(path)
+    assert saved == as_json(snapshot_game(game, 4.0))
+    assert (saved['round'], saved['player']) == (2, 1)
+
+    expected = play_out(game)
+    totals = list(game.board.totals)
+
+    # The dice are rolled from the global generator, which has moved on since: restoring puts it back
+    random.seed(99)
+    restored = YahtzeeGame(load_high_scores=False)
+    restore_game(restored, saved)
+    assert as_json(snapshot_game(restored, 4.0)) == saved
+    assert restored.bots == [None, restored.bot_strategy, None]
+    assert (restored.rules.name if restored.rules else None) == rules
+    assert play_out(restored) == expected
+    assert list(restored.board.totals) == totals
+
+
+def test_unusable_snapshots_are_ignored(tmp_path):
+    path = tmp_path / "snapshot.json"
+    assert load_snapshot(str(path)) is None
+
+    path.write_text("{not json", encoding='utf-8')
+    assert load_snapshot(str(path)) is None
+
+    game = YahtzeeGame(load_high_scores=False)
+    game.setup_new_game("Ann", "")
+    stale = dict(snapshot_game(game), version=SNAPSHOT_VERSION - 1)
+    path.write_text(json.dumps(stale), encoding='utf-8')
+    assert load_snapshot(str(path)) is None
+
+    save_snapshot(game, str(path))
+    assert load_snapshot(str(path))['time_scale'] is None
+    clear_snapshot(str(path))
+    clear_snapshot(str(path))
+    assert not path.exists()
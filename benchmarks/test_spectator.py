@@ -0,0 +1,26 @@
+"""
+The spectator's headless tables: results counted as the tournament counts them
+"""
+from lib.spectator import SpectatedTable
+
+
+def test_ties_are_not_wins():
+    table = SpectatedTable(0, ['greedy', 'greedy'], seed=0)
+    finals = []
+    new_game = table._new_game
+
+    def record_final():
+        finals.append(list(table.game.board.totals))
+        new_game()
+
+    table._new_game = record_final
+    while table.games < 100:
+        table.step()
+
+    expected_wins = [0, 0]
+    for totals in finals:
+        if totals[0] != totals[1]:
+            expected_wins[totals.index(max(totals))] += 1
+    assert table.wins == expected_wins
+    assert table.ties == sum(totals[0] == totals[1] for totals in finals) > 0
+    assert table.snapshot.wins == tuple(expected_wins) and table.snapshot.ties == table.ties
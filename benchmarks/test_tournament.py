@@ -0,0 +1,15 @@
+"""
+The tournament runner's report
+"""
+from lib.tournament import run_tournament
+
+
+def test_a_strategy_can_play_itself(capsys):
+    run_tournament(['greedy', 'greedy'], solitaire=False, max_games=30, batch_size=10, workers=1)
+    report = capsys.readouterr().out.splitlines()
+    # One line per seat, not one for both
+    assert any(line.startswith("greedy #1 ") for line in report)
+    assert any(line.startswith("greedy #2 ") for line in report)
+    pairing = next(line for line in report if line.startswith("greedy #1 vs greedy #2"))
+    wins, losses, ties = (int(n) for n in pairing.split()[5:8])
+    assert wins + losses + ties == 30
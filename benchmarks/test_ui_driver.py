@@ -0,0 +1,223 @@
+"""
+Complete games played through the real UI by lib.ui_driver: headless, scripted, on virtual time
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+from lib.ui_driver import UIDriver, auto_script, practice_script  # noqa: E402
+
+
+def test_practice_game_end_to_end(tmp_path):
+    driver = UIDriver(practice_script("Tester"), seed=3, workdir=str(tmp_path)).run()
+    scorecard = driver.ui.game.scorecards[0]
+    assert all(score is not None for score in scorecard.scores.values())
+    assert driver.scores == [scorecard.total_score]
+    assert driver.frames > 13
+    # The game ended through the UI, which clears the saved game and records it in the history
+    assert not (tmp_path / "yahtzee_snapshot.json").exists()
+    assert (tmp_path / "score_history.db").exists()
+
+
+def test_practice_game_frames_repeat(tmp_path):
+    first = UIDriver(practice_script(), seed=5, hash_frames=True, workdir=str(tmp_path / "a")).run()
+    second = UIDriver(practice_script(), seed=5, hash_frames=True, workdir=str(tmp_path / "b")).run()
+    assert first.frame_hashes == second.frame_hashes
+    assert first.captures == second.captures
+
+
+def test_bot_vs_bot_game_on_virtual_time(tmp_path):
+    driver = UIDriver(auto_script("0"), seed=1, workdir=str(tmp_path)).run()
+    assert driver.ui.game.is_game_over()
+    assert len(driver.scores) == 2
+    assert "game 1 over" in driver.captures
+    # Recorded in the history, but kept off the leaderboard
+    assert (tmp_path / "score_history.db").exists()
+    assert driver.ui.game.get_sorted_high_scores() == []
+
+
+def test_full_game_speed(bench, tmp_path):
+    bench(lambda: UIDriver(practice_script(), seed=7, workdir=str(tmp_path)).run(), rounds=2, min_time=0)
+
+
+class CardHashDriver(UIDriver):
+    """
+    Also hashes each player's scorecard area in every frame shown before the game is over
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.card_hashes = {}
+
+    def _present(self, rects=None):
+        super()._present(rects)
+        from lib import ui_common
+
+        ui = getattr(self, 'ui', None)
+        if ui is None or not ui.card_uis or ui.game.is_game_over():
+            return
+        for seat, card in enumerate(ui.card_uis):
+            area = pygame.Rect(card.x, card.y - 70, 670, 660).clip(ui_common.SCREEN.get_rect())
+            self.card_hashes.setdefault(seat, set()).add(self.screen_hash(ui_common.SCREEN.subsurface(area)))
+
+
+def test_fast_forward_redraws_every_card(tmp_path):
+    # At 16x two turns are played per frame, one by each bot: both cards must keep up
+    driver = CardHashDriver(auto_script("16"), seed=2, workdir=str(tmp_path)).run()
+    assert driver.ui.game.is_game_over()
+    assert sorted(driver.card_hashes) == [0, 1]
+    assert all(len(hashes) > 6 for hashes in driver.card_hashes.values()), \
+        {seat: len(hashes) for seat, hashes in driver.card_hashes.items()}
+
+
+def resize_script(sizes, seen, fetched):
+    """
+    The practice game, with the window dragged to each of <sizes> and let go
+    after the first roll. Records what the window showed after each step, and
+    whether the dice on the table were fetched at the settled size.
+    """
+    def script(driver):
+        from lib import ui_common
+
+        def shown():
+            window = pygame.display.get_surface()
+            area = pygame.Rect(ui_common.VIEWPORT.offset, ui_common.VIEWPORT.size)
+            return window.get_size(), ui_common.SCREEN.surface.get_size(), driver.screen_hash(window.subsurface(area))
+
+        for n, item in enumerate(practice_script("Ann")(driver)):
+            yield item
+            if n == 2:
+                for size in sizes:
+                    canvas = ui_common.SCREEN.surface.copy()
+                    yield driver.resize(size)
+                    stretched = pygame.transform.scale(canvas, ui_common.VIEWPORT.size)
+                    seen.append(('drag', size, shown(), driver.screen_hash(stretched)))
+                    yield driver.settle()
+                    seen.append(('settled', size, shown(), driver.screen_hash(ui_common.SCREEN)))
+                    hits = ui_common.die_image.cache_info().hits
+                    rolled = driver.ui.game.active_dice.rolled
+                    for value in rolled:
+                        ui_common.die_image(value, round(ui_common.DS * ui_common.SCREEN.scale))
+                    fetched.append(ui_common.die_image.cache_info().hits == hits + len(rolled))
+
+    return script
+
+
+def test_resize_redraws_at_new_scale(tmp_path):
+    from lib import ui_common
+
+    seen, fetched = [], []
+    # Doubled, odd, then a run of sizes as a window dragged around would settle at
+    sizes = [(2880, 1800), (1001, 700)] + [(1440 + 37 * i, 900 + 23 * i) for i in range(1, 9)]
+    driver = UIDriver(resize_script(sizes, seen, fetched), seed=3, workdir=str(tmp_path)).run()
+    assert [(step, size) for step, size, _, _ in seen] == [(step, size) for size in sizes for step in ('drag', 'settled')]
+    canvas_size = (1440, 900)
+    for step, size, (window_size, surface_size, window_hash), expected in seen:
+        assert window_size == size
+        scale = min(size[0] / 1440, size[1] / 900)
+        if step == 'drag':
+            # Still the last frame, stretched to fit
+            assert surface_size == canvas_size
+        else:
+            # Drawn afresh at the window's scale, and shown as it is
+            canvas_size = (round(1440 * scale), round(900 * scale))
+            assert surface_size == canvas_size
+        assert window_hash == expected
+    # The dice on the table were fetched at each settled size, not scaled from the layout-sized ones
+    assert all(fetched)
+    # Only the current scale's fonts and images are kept, however many sizes the window had
+    assert ui_common.die_image.cache_info().currsize <= 12
+    assert ui_common.portrait.cache_info().currsize <= 2
+    assert ui_common.font.cache_info().currsize <= 12
+    # Every click after the resize landed: the game played out
+    assert all(score is not None for score in driver.ui.game.scorecards[0].scores.values())
+
+
+def test_ui_game_streams_events(tmp_path, monkeypatch):
+    from lib.events import read_events
+
+    path = tmp_path / "events.jsonl"
+    monkeypatch.setenv("YAHTZEE_EVENTS", str(path))
+    driver = UIDriver(practice_script("Ann"), seed=3, workdir=str(tmp_path)).run()
+    driver.ui.game.events.close()
+
+    events = list(read_events(str(path)))
+    kinds = [event['kind'] for event in events]
+    assert kinds[0] == 'game_start' and kinds[-1] == 'game_end'
+    assert {'roll', 'hold', 'category_scored'} <= set(kinds)
+    assert kinds.count('category_scored') == 13
+    assert events[-1]['scores'] == driver.scores
+
+
+def test_speed_keys_only_in_bot_vs_bot(tmp_path):
+    from lib import ui_common
+
+    plus = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_PLUS, unicode='+', mod=0)
+    UIDriver(practice_script(), seed=3, workdir=str(tmp_path / "practice")).run()
+    assert not ui_common.SPEED_KEYS
+    assert not ui_common.handle_speed_key(plus)
+    assert ui_common.TIME_SCALE == 1.0 and not ui_common.fast_forward()
+
+    UIDriver(auto_script("4"), seed=3, workdir=str(tmp_path / "auto")).run()
+    assert ui_common.SPEED_KEYS
+    assert ui_common.handle_speed_key(plus)
+    assert ui_common.TIME_SCALE == 8.0 and ui_common.fast_forward()
+    ui_common.set_time_scale(1.0)
+
+
+def test_hud_key_answered_while_bots_play(tmp_path):
+    from lib import ui_common
+    from lib.instrument import INSTRUMENTS
+
+    UIDriver(auto_script("4"), seed=3, workdir=str(tmp_path)).run()
+    ui_common.set_time_scale(1.0)
+    hud = INSTRUMENTS.hud
+    try:
+        # The shared pump behind bot turns and pauses answers 'd', not just the human turn's loop
+        pygame.event.clear()
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_d, unicode='d', mod=0))
+        ui_common.pump_events()
+        assert INSTRUMENTS.hud != hud
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_d, unicode='d', mod=0))
+        ui_common.pause(0)
+        assert INSTRUMENTS.hud == hud
+    finally:
+        INSTRUMENTS.hud = hud
+
+
+def test_bot_vs_bot_saves_every_frame_and_resumes_at_speed(tmp_path, monkeypatch):
+    import json
+    import math
+    from lib import game_ui, snapshot, ui_common
+
+    saved = []
+    real_save = game_ui.save_snapshot
+
+    def save_snapshot(game, path=snapshot.SNAPSHOT_FILE, time_scale=None):
+        saved.append(json.dumps(snapshot.snapshot_game(game, time_scale)))
+        real_save(game, path, time_scale)
+
+    monkeypatch.setattr(game_ui, 'save_snapshot', save_snapshot)
+    played = UIDriver(auto_script("0"), seed=1, workdir=str(tmp_path / "played")).run()
+    # Uncapped, eight turns are played per frame: 26 turns are saved 3 times, not 26
+    assert len(saved) == 3
+    assert all(json.loads(state)['time_scale'] == 0 for state in saved)
+
+    resumed_dir = tmp_path / "resumed"
+    resumed_dir.mkdir()
+    (resumed_dir / snapshot.SNAPSHOT_FILE).write_text(saved[1], encoding='utf-8')
+    ui_common.set_time_scale(1.0)
+
+    def resume_script(driver):
+        yield driver.key('y')
+        driver.capture("game over")
+        yield driver.key('q')
+
+    resumed = UIDriver(resume_script, seed=9, workdir=str(resumed_dir)).run()
+    assert ui_common.TIME_SCALE == math.inf and ui_common.SPEED_KEYS
+    assert resumed.scores == played.scores
+    ui_common.set_time_scale(1.0)
@@ -0,0 +1,266 @@
+"""
+Cache of the UI's scaled images as raw pixels, so a launch doesn't have to
+decode and scale the PNGs again.
+
+Every image ui_common scales (portraits and dice, at each size asked for) is
+stored in one file. The pixels are kept in the display's own format, keyed
+by the source file's path, modification time and size, and by the target
+size and pixel format. The file is memory-mapped, and each image is a
+pygame.image.frombuffer() view of its bytes, so loading one costs neither a
+decode nor a copy. The images are mapped copy-on-write: drawing on one
+copies just the pages touched, and never reaches the file. A changed source
+file just misses, and the cache file is rewritten (atomically) with whatever
+was scaled afresh. Only images used by the run that writes the file are kept,
+at no more than MAX_SIZES sizes (the most recently used), so a window that is
+resized again and again doesn't grow it without bound.
+
+YAHTZEE_ASSET_CACHE names the cache file (assets/.pixel_cache.bin by
+default); set it empty to turn the cache off. `python -m lib.asset_cache
+startup` times `python main.py` to its first frame with and without the
+cache.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pygame
+
+CACHE_PATH = os.environ.get("YAHTZEE_ASSET_CACHE", os.path.join("assets", ".pixel_cache.bin"))
+MAGIC = b"YZPIXEL2"
+# magic, then the length of the JSON index that follows; pixel data comes after the index
+HEADER = struct.Struct("<8sI")
+# The pixel data and each image in it start on a multiple of this, as SDL's
+# SIMD blitters and fills expect (an unaligned view crashes when drawn on)
+ALIGN = 64
+# Most distinct image sizes kept, in memory and in the file
+MAX_SIZES = 12
+# Raw formats frombuffer() can view without conversion, tried in order
+PIXEL_FORMATS = ['BGRA', 'RGBA', 'ARGB']
+
+
+def _padding(length: int) -> int:
+    """
+    Bytes to add after <length> bytes to reach the next ALIGN boundary
+    """
+    return -length % ALIGN
+
+
+def display_format() -> Tuple[str, bool]:
+    """
+    The raw format whose frombuffer() surfaces match the display's alpha
+    format, and whether one does (if not, loaded images are converted)
+    """
+    wanted = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha().get_masks()
+    for fmt in PIXEL_FORMATS:
+        try:
+            if pygame.image.frombuffer(bytes(4), (1, 1), fmt).get_masks() == wanted:
+                return fmt, True
+        except ValueError:
+            # Not supported by this pygame
+            continue
+    return 'RGBA', False
+
+
+class AssetCache:
+    """
+    The memory-mapped cache file, plus the images scaled since it was read
+    """
+
+    def __init__(self, path: str = CACHE_PATH):
+        # Saved at exit too, by which time the working directory may have changed
+        self.path = os.path.abspath(path) if path else path
+        self.format, self.native = display_format()
+        # key -> (offset into the pixel data, length)
+        self.index: Dict[str, Tuple[int, int]] = {}
+        self.hits = 0
+        self.misses = 0
+        # The file as read, for save(); images are views of _pixels, a copy-on-write map of it
+        self._map: Optional[mmap.mmap] = None
+        self._pixels: Optional[mmap.mmap] = None
+        self._data_start = 0
+        self._new: Dict[str, bytes] = {}
+        # Keys loaded or added this run, least recently used first (values unused)
+        self._used: Dict[str, None] = {}
+        self._stats: Dict[str, Optional[os.stat_result]] = {}
+        if path:
+            self._open()
+
+    def _open(self) -> None:
+        try:
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                # Writable, so callers can draw on what they're given
+                self._pixels = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            magic, index_length = HEADER.unpack_from(self._map)
+            if magic != MAGIC:
+                raise ValueError("not a pixel cache")
+            index = json.loads(self._map[HEADER.size:HEADER.size + index_length])
+            self.index = {key: (offset, length) for key, (offset, length) in index.items()}
+            self._data_start = HEADER.size + index_length + _padding(HEADER.size + index_length)
+        except (OSError, ValueError, struct.error):
+            # Missing or unreadable: start empty, and write a fresh one
+            self.index = {}
+            self._map = self._pixels = None
+
+    def key(self, source: str, size: Tuple[int, int]) -> Optional[str]:
+        """
+        The cache key of <source> scaled to <size>, or None if the source file is missing
+        """
+        if source not in self._stats:
+            try:
+                self._stats[source] = os.stat(source)
+            except OSError:
+                self._stats[source] = None
+        stat = self._stats[source]
+        if stat is None:
+            return None
+        return f"{source}|{stat.st_mtime_ns}|{stat.st_size}|{size[0]}x{size[1]}|{self.format}"
+
+    def get(self, source: str, size: Tuple[int, int]) -> Optional[pygame.Surface]:
+        """
+        The cached image of <source> at <size>, if there is one
+        """
+        key = self.key(source, size)
+        if key is None or self._map is None or key not in self.index:
+            self.misses += 1
+            return None
+        self._use(key)
+        offset, length = self.index[key]
+        start = self._data_start + offset
+        image = pygame.image.frombuffer(memoryview(self._pixels)[start:start + length], size, self.format)
+        self.hits += 1
+        return image if self.native else image.convert_alpha()
+
+    def put(self, source: str, size: Tuple[int, int], image: pygame.Surface) -> None:
+        """
+        Adds a freshly scaled image, to be written out by save()
+        """
+        key = self.key(source, size)
+        if key is not None and self.path:
+            self._new[key] = pygame.image.tobytes(image, self.format)
+            self._use(key)
+
+    def _use(self, key: str) -> None:
+        """
+        Marks <key> as the most recently used, and forgets the keys of sizes
+        beyond the MAX_SIZES most recently used
+        """
+        self._used.pop(key, None)
+        self._used[key] = None
+        sizes: Dict[str, None] = {}
+        for used in reversed(self._used):
+            sizes[used.split('|')[3]] = None
+            if len(sizes) > MAX_SIZES:
+                break
+        if len(sizes) <= MAX_SIZES:
+            return
+        kept = set(list(sizes)[:MAX_SIZES])
+        for old in [used for used in self._used if used.split('|')[3] not in kept]:
+            del self._used[old]
+            self._new.pop(old, None)
+
+    def _current(self, key: str) -> bool:
+        """
+        Whether an entry read from the file still matches its source file and the display format
+        """
+        source, mtime, length, _, fmt = key.split('|')
+        now = self.key(source, (0, 0))
+        return now is not None and now.split('|')[1:3] == [mtime, length] and fmt == self.format
+
+    def save(self) -> None:
+        """
+        Rewrites the cache file with the entries used this run, if any are
+        new. Failing to write it is not an error.
+        """
+        if not self._new:
+            return
+        entries: List[Tuple[str, bytes]] = []
+        for key, (offset, length) in self.index.items():
+            if key in self._used and key not in self._new and self._current(key):
+                start = self._data_start + offset
+                entries.append((key, self._map[start:start + length]))
+        entries.extend(self._new.items())
+
+        index, offset, chunks = {}, 0, []
+        for key, pixels in entries:
+            index[key] = (offset, len(pixels))
+            chunks += [pixels, bytes(_padding(len(pixels)))]
+            offset += len(pixels) + _padding(len(pixels))
+        index_bytes = json.dumps(index).encode()
+        header = HEADER.pack(MAGIC, len(index_bytes)) + index_bytes
+        from .score_writer import atomic_write_bytes
+        try:
+            atomic_write_bytes(self.path, header + bytes(_padding(len(header))) + b"".join(chunks))
+        except OSError as e:
+            print(f"Couldn't write the asset cache {self.path}: {e}")
+            self._new = {}
+            return
+        self._new = {}
+        # Map what was just written, so a later save keeps it. Images already
+        # handed out hold on to the old map through their buffers.
+        self._open()
+
+
+def _first_frame_ms(root: str, env: Dict[str, str]) -> float:
+    """
+    Launches `python main.py` and returns the ms until it first shows a frame
+    """
+    import subprocess
+    import time
+
+    child = ("import os, sys, time, runpy, pygame\n"
+             "def shown(*args):\n"
+             "    print(time.time())\n"
+             "    sys.stdout.flush()\n"
+             "    os._exit(0)\n"
+             "pygame.display.flip = pygame.display.update = shown\n"
+             "runpy.run_path('main.py', run_name='__main__')\n")
+    start = time.time()
+    output = subprocess.run([sys.executable, "-c", child], cwd=root, env=env, capture_output=True,
+                            text=True, check=True).stdout
+    return (float(output.strip().splitlines()[-1]) - start) * 1000
+
+
+def startup(runs: int = 5) -> None:
+    """
+    Times launches of the game to its first frame, without and with the cache file
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    cache = os.path.join(root, CACHE_PATH or os.path.join("assets", ".pixel_cache.bin"))
+    env["YAHTZEE_ASSET_CACHE"] = cache
+
+    cold, warm = [], []
+    for _ in range(runs):
+        if os.path.exists(cache):
+            os.unlink(cache)
+        cold.append(_first_frame_ms(root, env))
+        warm.append(_first_frame_ms(root, env))
+    env["YAHTZEE_ASSET_CACHE"] = ""
+    off = [_first_frame_ms(root, env) for _ in range(runs)]
+    for label, samples in (("no cache", off), ("cold cache", cold), ("warm cache", warm)):
+        samples.sort()
+        print(f"{label:<11} median {samples[len(samples) // 2]:7.1f} ms  "
+              f"min {samples[0]:7.1f} ms  max {samples[-1]:7.1f} ms")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Time game startup, or clear the pixel cache")
+    parser.add_argument('command', choices=['startup', 'clear'])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+    if args.command == 'startup':
+        startup(args.runs)
+    elif CACHE_PATH and os.path.exists(CACHE_PATH):
+        os.unlink(CACHE_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 Defines class Button() which prints a text button to the screen.
 """
 import pygame
-from .ui_common import BLUE, DARK_GRAY, SCREEN, DARK_BLUE, LIGHT_GRAY, WHITE, FONT
+from .ui_common import BLUE, DARK_GRAY, SCREEN, DARK_BLUE, LIGHT_GRAY, WHITE, FONT, draw_rect
 
 
 class Button:
@@ -25,17 +25,17 @@ class Button:
         x_offset, y_offset = (2, 2) if not self.pressed else (0, 0)
 
         # Draw shadow
-        pygame.draw.rect(SCREEN,
-                         self.shadow_color,
-                         (self.x + 4, self.y + 4, self.width, self.height),
-                         border_radius=8)
+        draw_rect(SCREEN,
+                  self.shadow_color,
+                  (self.x + 4, self.y + 4, self.width, self.height),
+                  border_radius=8)
 
         # Draw button (change color if hovered)
         button_color = DARK_BLUE if self.pressed \
             else (LIGHT_GRAY if self.is_hovered(m_pos) else self.color)
-        pygame.draw.rect(SCREEN, button_color,
-                         (self.x + x_offset, self.y + y_offset, self.width, self.height),
-                         border_radius=8)
+        draw_rect(SCREEN, button_color,
+                  (self.x + x_offset, self.y + y_offset, self.width, self.height),
+                  border_radius=8)
 
         # Render text
         text_surface = FONT.render(self.text, True, WHITE)
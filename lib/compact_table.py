@@ -0,0 +1,265 @@
+"""
+Compact EV bot table: the EV bot's hold decisions for every scorecard state,
+small enough to load into every kiosk process and simulation worker.
+
+The full table behind the EV bot is two float64 values per keep (462 keeps),
+per roll, for each of the 8191 sets of open categories: about 60 MB. A keep
+value is only ever compared with the other keeps of the same dice, so the
+decision is stored instead of the values. For each set of open categories,
+rolls left and dice outcome, the table keeps the slot of the best keep among
+the outcome's keeps (OUTCOME_KEEPS). There are never more than 32 of them, so
+a slot fits in a byte. Decisions come out exactly as the EV bot's own, with no
+quantization loss.
+
+The open-category mask is itself a minimal perfect hash of the reachable
+states (every non-empty mask can occur), so blocks are indexed by mask
+directly. Runs of GROUP_MASKS neighbouring masks share a lot of their
+decisions and are zlib-compressed together: about 0.4 MB on disk, with a few
+decompressed groups cached while playing.
+
+Build the table with `python -m lib.compact_table build` (about a minute per
+core), then play it as the `compact` strategy. `python -m lib.compact_table
+measure` compares it with the `ev` bot for size, decision time and score.
+"""
+import argparse
+import hashlib
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from functools import lru_cache
+from random import Random
+from typing import List, Optional, Sequence
+
+from .dice_logic import DiceLogic
+from .outcomes import KEEPS, OUTCOME_INDEX, OUTCOME_KEEPS, OUTCOMES, holds_for_keep
+from .scorecard_logic import ScorecardLogic
+from .strategy import VALUES, ev_category, open_mask, register_strategy, solve_turn, turn_table
+
+# Where the table is read from unless told otherwise
+DEFAULT_TABLE_PATH = os.environ.get(
+    "YAHTZEE_COMPACT_TABLE", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ev_table.bin"))
+MAGIC = b"YZEVTAB1"
+# magic, masks, masks per group, hash of the EV values the table was built from
+HEADER = struct.Struct("<8sII16s")
+MASKS = 1 << len(VALUES[0])
+GROUP_MASKS = 64
+# Decompressed groups kept while playing (32 KB each)
+GROUP_CACHE = 16
+# Bytes per mask: one slot per outcome with one roll left, then with two
+BLOCK = 2 * len(OUTCOMES)
+
+
+def values_digest() -> bytes:
+    """
+    Hash of the EV bot's category values: a table built from other values is stale
+    """
+    return hashlib.blake2b(repr(VALUES).encode(), digest_size=16).digest()
+
+
+def mask_block(mask: int) -> bytes:
+    """
+    The best keep slot of each outcome, with one and then two rolls left, for one set of open categories
+    """
+    if not mask:
+        return bytes(BLOCK)
+    block = bytearray()
+    for table in solve_turn(VALUES, mask):
+        # First best keep, as EVStrategy's max() picks it
+        block.extend(max(range(len(keeps)), key=lambda i: table[keeps[i]]) for keeps in OUTCOME_KEEPS)
+    return bytes(block)
+
+
+def _group(first: int) -> bytes:
+    return zlib.compress(b"".join(mask_block(mask) for mask in range(first, first + GROUP_MASKS)), 9)
+
+
+def build_table(workers: Optional[int] = None) -> bytes:
+    """
+    Solves every set of open categories over a process pool and returns the table file's contents
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    firsts = range(0, MASKS, GROUP_MASKS)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        groups = list(pool.map(_group, firsts))
+
+    offsets = array('I', [0])
+    for group in groups:
+        offsets.append(offsets[-1] + len(group))
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+    header = HEADER.pack(MAGIC, MASKS, GROUP_MASKS, values_digest())
+    return header + offsets.tobytes() + b"".join(groups)
+
+
+class CompactTable:
+    """
+    A loaded table: the compressed groups, and the best keep for a state on lookup
+    """
+
+    def __init__(self, data: bytes):
+        magic, masks, group_masks, digest = HEADER.unpack_from(data)
+        if magic != MAGIC or masks != MASKS or group_masks != GROUP_MASKS:
+            raise ValueError("Not a compact EV table")
+        if digest != values_digest():
+            raise ValueError("The compact EV table was built for other category values: rebuild it")
+        count = masks // group_masks
+        self.offsets = array('I')
+        self.offsets.frombytes(data[HEADER.size:HEADER.size + 4 * (count + 1)])
+        if sys.byteorder != 'little':
+            self.offsets.byteswap()
+        self.data = data[HEADER.size + 4 * (count + 1):]
+        self._group = lru_cache(maxsize=GROUP_CACHE)(self._decompress)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TABLE_PATH) -> 'CompactTable':
+        """
+        Reads a table file
+        """
+        try:
+            with open(path, 'rb') as f:
+                return cls(f.read())
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No compact EV table at {path}: build one with "
+                                    f"`python -m lib.compact_table build`") from None
+
+    def _decompress(self, group: int) -> bytes:
+        return zlib.decompress(self.data[self.offsets[group]:self.offsets[group + 1]])
+
+    def best_keep(self, mask: int, outcome: int, rolls_left: int) -> int:
+        """
+        The index in KEEPS of the best keep for an outcome, open categories and rolls left
+        """
+        group, index = divmod(mask, GROUP_MASKS)
+        slot = self._group(group)[index * BLOCK + (len(OUTCOMES) if rolls_left > 1 else 0) + outcome]
+        return OUTCOME_KEEPS[outcome][slot]
+
+    @property
+    def resident_bytes(self) -> int:
+        """
+        Memory held by the table: the compressed groups, the index and the cached groups
+        """
+        cached = self._group.cache_info().currsize * GROUP_MASKS * BLOCK
+        return len(self.data) + self.offsets.itemsize * len(self.offsets) + cached
+
+
+@register_strategy("compact")
+class CompactEVStrategy:
+    """
+    Plays the EV bot's decisions from a compact table file, loaded on first use
+    """
+
+    def __init__(self, path: str = DEFAULT_TABLE_PATH):
+        self.path = path
+        self.table: Optional[CompactTable] = None
+
+    def choose_holds(self, dice: DiceLogic, scorecard: ScorecardLogic) -> List[bool]:
+        """
+        Holds the dice the EV bot would
+        """
+        # The table covers the standard rules only; variants solve their own turns
+        rules = getattr(scorecard, 'rules', None)
+        if rules is not None:
+            one_left, two_left = rules.turn_table(rules.open_mask(scorecard))
+            table = one_left if dice.rolls_left <= 1 else two_left
+            keeps = OUTCOME_KEEPS[OUTCOME_INDEX[tuple(sorted(dice.rolled))]]
+            return holds_for_keep(dice.rolled, KEEPS[max(keeps, key=lambda k: table[k])])
+
+        if self.table is None:
+            self.table = CompactTable.load(self.path)
+        outcome = OUTCOME_INDEX[tuple(sorted(dice.rolled))]
+        return holds_for_keep(dice.rolled, KEEPS[self.table.best_keep(open_mask(scorecard), outcome, dice.rolls_left)])
+
+    def choose_category(self, dice: DiceLogic, scorecard: ScorecardLogic) -> str:
+        """
+        Picks the open category with the best value: no table needed
+        """
+        return ev_category(dice.rolled, scorecard)
+
+
+def _positions(count: int, seed: int) -> List[tuple]:
+    """
+    Random (mask, outcome, rolls left) states to time lookups on
+    """
+    rng = Random(seed)
+    return [(rng.randrange(1, MASKS), rng.randrange(len(OUTCOMES)), rng.choice((1, 2))) for _ in range(count)]
+
+
+def measure(path: str, games: int, lookups: int = 20000, seed: int = 0) -> None:
+    """
+    Compares the compact table with the full EV tables: size, lookup time, decisions and score
+    """
+    from .tournament import play_game
+
+    table = CompactTable.load(path)
+    full_bytes = (MASKS - 1) * 2 * len(KEEPS) * 8
+    print(f"full float64 table   {full_bytes / 2 ** 20:8.1f} MB ({turn_table.cache_info().maxsize} masks "
+          f"cached by the ev bot: {turn_table.cache_info().maxsize * 2 * len(KEEPS) * 8 / 2 ** 20:.1f} MB)")
+    print(f"compact table file   {os.path.getsize(path) / 2 ** 20:8.2f} MB")
+
+    positions = _positions(lookups, seed)
+    start = time.perf_counter()
+    for mask, outcome, rolls_left in positions:
+        table.best_keep(mask, outcome, rolls_left)
+    compact_us = (time.perf_counter() - start) / lookups * 1e6
+    print(f"compact resident     {table.resident_bytes / 2 ** 20:8.2f} MB after {lookups} random lookups")
+    # In mask order, as a game's states mostly fall in groups already decompressed
+    start = time.perf_counter()
+    for mask, outcome, rolls_left in sorted(positions):
+        table.best_keep(mask, outcome, rolls_left)
+    ordered_us = (time.perf_counter() - start) / lookups * 1e6
+
+    # The full table: solve (or find in the cache) and pick the best keep, as EVStrategy does
+    sample = positions[:max(1, lookups // 20)]
+    agree = 0
+    start = time.perf_counter()
+    for mask, outcome, rolls_left in sample:
+        one_left, two_left = turn_table(mask)
+        values = one_left if rolls_left <= 1 else two_left
+        best = max(OUTCOME_KEEPS[outcome], key=lambda k: values[k])
+        agree += best == table.best_keep(mask, outcome, rolls_left)
+    full_us = (time.perf_counter() - start) / len(sample) * 1e6
+    print(f"lookup compact {compact_us:.1f} us at random, {ordered_us:.2f} us in mask order; "
+          f"full {full_us:.1f} us at random; decisions agree {agree}/{len(sample)}")
+
+    timings = {}
+    means = {}
+    scores = {}
+    for name in ('ev', 'compact'):
+        start = time.perf_counter()
+        scores[name] = [play_game([name], seed + g)[0] for g in range(games)]
+        timings[name] = (time.perf_counter() - start) / games * 1000
+        means[name] = sum(scores[name]) / games
+    differing = sum(a != b for a, b in zip(scores['ev'], scores['compact']))
+    print(f"{games} games on common seeds: ev mean {means['ev']:.2f} ({timings['ev']:.1f} ms/game), "
+          f"compact mean {means['compact']:.2f} ({timings['compact']:.1f} ms/game), "
+          f"{differing} games scored differently")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Build or measure the compact EV bot table")
+    parser.add_argument('command', choices=['build', 'measure'])
+    parser.add_argument('--table', default=DEFAULT_TABLE_PATH, help="table file to write or read")
+    parser.add_argument('--workers', type=int, default=None, help="build processes (default: one per core)")
+    parser.add_argument('--games', type=int, default=500, help="games per bot when measuring")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        from .score_writer import atomic_write_bytes
+        start = time.perf_counter()
+        data = build_table(args.workers)
+        atomic_write_bytes(args.table, data)
+        print(f"Wrote {args.table}: {len(data) / 2 ** 20:.2f} MB in {time.perf_counter() - start:.1f}s")
+    else:
+        measure(args.table, args.games, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+Coordinator for long simulation runs spread over worker processes on one or
+more hosts, with checkpoints so a killed run picks up where it left off.
+
+The seeds of a run are cut into fixed-size ranges. Workers connect to the
+coordinator and use a line protocol like the one in lib/server.py. Each request
+is one line and gets one reply line, 'OK <json>' or 'ERR <message>':
+
+    WORK                 lease the next seed range: {"first", "count", "strategy", "rules"},
+                         {"wait": <seconds>} while the last ranges are out, or {"done": true}
+    RESULT <json>        hand in the summary of a leased range (see summarize_range())
+    QUIT                 close the connection
+
+A range still leased when its worker disconnects goes back in the queue.
+The merged results are written atomically to the checkpoint file after every
+range. Ranges are deterministic in their seeds, so a resumed run ends with the
+same totals as one that was never interrupted.
+
+Run with e.g. `python -m lib.coordinator serve --games 1000000 --strategy ev --workers 4 --checkpoint run.json`
+and add workers on other hosts with `python -m lib.coordinator work --host <coordinator> --port 7780`.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from .rules import VARIANTS
+from .score_writer import atomic_write_text
+from .strategy import available_strategies
+from .tournament import play_scorecards
+
+# Encoding of the line protocol
+ENCODING = 'utf-8'
+# Bumped whenever the checkpoint layout changes
+CHECKPOINT_VERSION = 1
+# How long a worker waits before asking again while the last ranges are out (seconds)
+WAIT_SECONDS = 0.5
+
+
+def summarize_range(strategy: str, first: int, count: int, rules: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Plays solitaire games on seeds first .. first + count - 1 and returns their
+    score histogram and the total scored in each category
+    """
+    histogram: Dict[int, int] = {}
+    category_totals: Dict[str, int] = {}
+    for seed in range(first, first + count):
+        scorecard = play_scorecards([strategy], seed, rules)[0]
+        score = scorecard.final_tally()
+        histogram[score] = histogram.get(score, 0) + 1
+        for category, points in scorecard.scores.items():
+            category_totals[category] = category_totals.get(category, 0) + (points or 0)
+    return {'first': first, 'count': count, 'histogram': histogram, 'category_totals': category_totals}
+
+
+class RunTotals:
+    """
+    Merged results of the ranges finished so far
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.histogram: Dict[int, int] = {}
+        self.category_totals: Dict[str, int] = {}
+        self.done: Set[int] = set()
+
+    def merge(self, summary: Dict[str, Any]) -> None:
+        """
+        Adds one range's summary
+        """
+        self.done.add(summary['first'])
+        self.games += summary['count']
+        for score, n in summary['histogram'].items():
+            self.histogram[int(score)] = self.histogram.get(int(score), 0) + n
+        for category, points in summary['category_totals'].items():
+            self.category_totals[category] = self.category_totals.get(category, 0) + points
+
+    def mean(self) -> float:
+        """
+        Returns the mean final score
+        """
+        return sum(score * n for score, n in self.histogram.items()) / self.games if self.games else 0.0
+
+    def percentile(self, pct: float) -> int:
+        """
+        Returns the score below which <pct> percent of the games fall
+        """
+        target = pct / 100 * self.games
+        seen = 0
+        for score in sorted(self.histogram):
+            seen += self.histogram[score]
+            if seen >= target:
+                return score
+        return 0
+
+    def category_means(self) -> Dict[str, float]:
+        """
+        Returns the mean score of each category
+        """
+        return {category: total / self.games for category, total in self.category_totals.items()} if self.games else {}
+
+
+class Coordinator:
+    """
+    Hands out seed ranges to workers, merges their results and checkpoints them
+    """
+
+    def __init__(self, strategy: str, games: int, seed: int = 0, rules: Optional[str] = None,
+                 range_size: int = 10000, checkpoint: Optional[str] = None):
+        self.strategy = strategy
+        self.games = games
+        self.seed = seed
+        self.rules = rules
+        self.range_size = range_size
+        self.checkpoint = checkpoint
+        self.totals = RunTotals()
+        if checkpoint and os.path.exists(checkpoint):
+            self._load_checkpoint()
+
+        ranges = range(seed, seed + games, range_size)
+        self.range_total = len(ranges)
+        self.pending: List[int] = [first for first in ranges if first not in self.totals.done]
+        # Seed ranges out with a worker, by the worker's connection
+        self.leases: Dict[int, Set[int]] = {}
+        self.finished = asyncio.Event()
+        if not self.pending:
+            self.finished.set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections = 0
+
+    def _params(self) -> Dict[str, Any]:
+        return {'strategy': self.strategy, 'games': self.games, 'seed': self.seed,
+                'rules': self.rules, 'range_size': self.range_size}
+
+    def _load_checkpoint(self) -> None:
+        """
+        Picks up the finished ranges of an earlier run with the same parameters
+        """
+        with open(self.checkpoint, encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('version') != CHECKPOINT_VERSION or saved['params'] != self._params():
+            raise ValueError(f"{self.checkpoint} is a checkpoint of a different run: {saved.get('params')}")
+        self.totals.games = saved['games_played']
+        self.totals.histogram = {int(score): n for score, n in saved['histogram'].items()}
+        self.totals.category_totals = saved['category_totals']
+        self.totals.done = set(saved['done'])
+
+    def save_checkpoint(self) -> None:
+        """
+        Atomically writes the finished ranges and merged results
+        """
+        if not self.checkpoint:
+            return
+        atomic_write_text(self.checkpoint, json.dumps({
+            'version': CHECKPOINT_VERSION,
+            'params': self._params(),
+            'done': sorted(self.totals.done),
+            'games_played': self.totals.games,
+            'histogram': self.totals.histogram,
+            'category_totals': self.totals.category_totals,
+        }, separators=(',', ':')))
+
+    def range_count(self, first: int) -> int:
+        """
+        Returns the number of games in the range starting at <first>
+        """
+        return min(self.range_size, self.seed + self.games - first)
+
+    async def start(self, host: str = '127.0.0.1', port: int = 7780) -> None:
+        """
+        Starts listening for workers
+        """
+        self._server = await asyncio.start_server(self.handle_worker, host, port)
+
+    @property
+    def port(self) -> int:
+        """
+        The TCP port being listened on (useful when started on port 0)
+        """
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """
+        Stops listening
+        """
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves one worker connection, one request line at a time
+        """
+        self._connections += 1
+        conn = self._connections
+        leased = self.leases.setdefault(conn, set())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    try:
+                        command, _, arg = line.decode(ENCODING).strip().partition(" ")
+                    except UnicodeDecodeError:
+                        raise ValueError(f"Request is not {ENCODING} text")
+                    command = command.upper()
+                    if command == 'QUIT':
+                        break
+                    response = "OK " + json.dumps(self.dispatch(leased, command, arg.strip()), separators=(',', ':'))
+                except (ValueError, KeyError, TypeError) as e:
+                    response = f"ERR {e}"
+                writer.write((response + "\n").encode(ENCODING))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            # Whatever the worker didn't finish goes to someone else
+            self.pending.extend(sorted(leased))
+            del self.leases[conn]
+            writer.close()
+
+    def dispatch(self, leased: Set[int], command: str, arg: str) -> Dict[str, Any]:
+        """
+        Carries out one command for a worker holding the <leased> ranges
+        """
+        if command == 'WORK':
+            if self.pending:
+                first = self.pending.pop(0)
+                leased.add(first)
+                return {'first': first, 'count': self.range_count(first),
+                        'strategy': self.strategy, 'rules': self.rules}
+            if self.finished.is_set():
+                return {'done': True}
+            return {'wait': WAIT_SECONDS}
+
+        if command == 'RESULT':
+            summary = json.loads(arg)
+            first = summary['first']
+            if first not in leased:
+                raise ValueError(f"Range {first} isn't leased to this worker")
+            if summary['count'] != self.range_count(first) or sum(summary['histogram'].values()) != summary['count']:
+                raise ValueError(f"Range {first} has the wrong number of games")
+            leased.discard(first)
+            self.totals.merge(summary)
+            self.save_checkpoint()
+            if len(self.totals.done) == self.range_total:
+                self.finished.set()
+            return {'games_played': self.totals.games}
+
+        raise ValueError(f"Unknown command: {command}")
+
+
+def run_worker(host: str = '127.0.0.1', port: int = 7780) -> int:
+    """
+    Plays seed ranges for a coordinator until the run is done. Returns the number of games played.
+    """
+    played = 0
+    with socket.create_connection((host, port)) as sock, sock.makefile('rw', encoding=ENCODING) as conn:
+        def request(line: str) -> Dict[str, Any]:
+            conn.write(line + "\n")
+            conn.flush()
+            status, _, body = conn.readline().strip().partition(" ")
+            if status != 'OK':
+                raise RuntimeError(f"Coordinator error: {body or 'connection closed'}")
+            return json.loads(body)
+
+        while True:
+            work = request("WORK")
+            if work.get('done'):
+                break
+            if 'wait' in work:
+                time.sleep(work['wait'])
+                continue
+            summary = summarize_range(work['strategy'], work['first'], work['count'], work['rules'])
+            request("RESULT " + json.dumps(summary, separators=(',', ':')))
+            played += work['count']
+        conn.write("QUIT\n")
+        conn.flush()
+    return played
+
+
+async def run_coordinator(coordinator: Coordinator, host: str = '127.0.0.1', port: int = 7780,
+                          local_workers: int = 0, progress: bool = True) -> RunTotals:
+    """
+    Serves workers until every range is done, starting <local_workers> worker
+    processes on this machine. Returns the merged results.
+    """
+    await coordinator.start(host, port)
+    if progress:
+        print(f"Coordinating {coordinator.games} games of {coordinator.strategy} on {host}:{coordinator.port}"
+              f" ({coordinator.totals.games} already played)")
+    worker_host = '127.0.0.1' if host in ('', '0.0.0.0') else host
+    workers = [multiprocessing.Process(target=run_worker, args=(worker_host, coordinator.port), daemon=True)
+               for _ in range(local_workers)]
+    for worker in workers:
+        worker.start()
+
+    start = time.perf_counter()
+    played_before = coordinator.totals.games
+    try:
+        while not coordinator.finished.is_set():
+            try:
+                await asyncio.wait_for(coordinator.finished.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                pass
+            if progress:
+                rate = (coordinator.totals.games - played_before) / (time.perf_counter() - start)
+                print(f"{coordinator.totals.games}/{coordinator.games} games ({rate:.0f} games/sec)")
+        # Let the workers hear that the run is done
+        for worker in workers:
+            while worker.is_alive():
+                await asyncio.sleep(0.05)
+    finally:
+        await coordinator.close()
+        for worker in workers:
+            if worker.is_alive():
+                # Not terminate(): a forked worker inherits any SIGTERM handler
+                # the parent had (pygame's SDL installs one) and would ignore it
+                worker.kill()
+            worker.join()
+    return coordinator.totals
+
+
+def report(totals: RunTotals) -> None:
+    """
+    Prints the score distribution and per-category means
+    """
+    print(f"{totals.games} games  mean score {totals.mean():.2f}  "
+          f"p10 {totals.percentile(10)}  p50 {totals.percentile(50)}  p90 {totals.percentile(90)}")
+    for category, mean in totals.category_means().items():
+        print(f"  {category:<16} {mean:6.2f}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Run a simulation over many worker processes and hosts")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help="coordinate a run")
+    serve.add_argument('--strategy', choices=available_strategies(), default='ev')
+    serve.add_argument('--games', type=int, default=1000000)
+    serve.add_argument('--seed', type=int, default=0)
+    serve.add_argument('--rules', choices=sorted(VARIANTS), default='standard')
+    serve.add_argument('--range-size', type=int, default=10000)
+    serve.add_argument('--checkpoint', default=None, help="save progress to, and resume from, this file")
+    serve.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="local worker processes")
+    serve.add_argument('--host', default='127.0.0.1', help="use 0.0.0.0 to accept workers from other hosts")
+    serve.add_argument('--port', type=int, default=7780)
+    work = commands.add_parser('work', help="play seed ranges for a coordinator")
+    work.add_argument('--host', default='127.0.0.1')
+    work.add_argument('--port', type=int, default=7780)
+    args = parser.parse_args(argv)
+
+    if args.command == 'work':
+        print(f"Played {run_worker(args.host, args.port)} games")
+        return
+
+    rules = None if args.rules == 'standard' else args.rules
+
+    async def serve_run() -> RunTotals:
+        coordinator = Coordinator(args.strategy, args.games, args.seed, rules, args.range_size, args.checkpoint)
+        return await run_coordinator(coordinator, args.host, args.port, args.workers)
+
+    try:
+        report(asyncio.run(serve_run()))
+    except KeyboardInterrupt:
+        print("Interrupted; run again with the same --checkpoint to resume")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 """
 Defines the core dice logic for Yahtzee game, independent of any UI.
 """
-from random import randint
-from typing import List, Dict, Tuple, Any
+from random import Random, randint
+from typing import List, Dict, Tuple, Any, Optional
+from .events import EventStream
 
 
 class DiceLogic:
@@ -10,27 +11,36 @@ class DiceLogic:
     Core dice logic responsible for rolling and tracking dice state
     """
 
-    def __init__(self):
+    def __init__(self, rng: Optional[Random] = None):
+        # Random number generator for rolls (None uses the global generator)
+        self.rng = rng
         # List to hold the current dice values (1-6)
         self.rolled: List[int] = []
         # Whether each die is held (True) or not (False)
         self.held: List[bool] = [False] * 5
         # Remaining rolls in this turn
         self.rolls_left = 3
+        # Analytics event stream, if one is attached
+        self.events: Optional[EventStream] = None
 
     def roll_dice(self) -> None:
         """
         Rolls dice. If this is the first roll, generate 5 dice values;
         otherwise, re-roll only dice that aren't held.
         """
+        roll = self.rng.randint if self.rng else randint
+
         # First roll: initialize all dice
         if not self.rolled:
-            self.rolled = [randint(1, 6) for _ in range(5)]
+            self.rolled = [roll(1, 6) for _ in range(5)]
         else:
             # For subsequent rolls, replace dice that aren't held
             for i in range(5):
                 if not self.held[i]:
-                    self.rolled[i] = randint(1, 6)
+                    self.rolled[i] = roll(1, 6)
+
+        if self.events:
+            self.events.emit('roll', dice=list(self.rolled), held=list(self.held))
 
     def toggle_hold(self, die_index: int) -> None:
         """
@@ -38,13 +48,19 @@ class DiceLogic:
         """
         if 0 <= die_index < 5:  # Ensure index is valid
             self.held[die_index] = not self.held[die_index]
+            if self.events:
+                self.events.emit('hold', die=die_index, held=self.held[die_index])
 
     def set_hold(self, die_index: int, held: bool) -> None:
         """
-        Set whether a die is held or not
+        Set whether a die is held or not. A change is streamed as a hold
+        event, as a toggle is, so bot turns can be followed too.
         """
         if 0 <= die_index < 5:  # Ensure index is valid
+            changed = self.held[die_index] != held
             self.held[die_index] = held
+            if changed and self.events:
+                self.events.emit('hold', die=die_index, held=held)
 
     def reset(self) -> None:
         """
@@ -1,9 +1,8 @@
 """
 UI components for dice visualization
 """
-import pygame
 from .dice_logic import DiceLogic
-from .ui_common import SCREEN, POOL_TABLE_GREEN, RED, int_to_die, pause
+from .ui_common import SCREEN, POOL_TABLE_GREEN, RED, int_to_die, draw_rect, fast_forward, pause, present
 
 
 class DiceUI:
@@ -29,7 +28,7 @@ class DiceUI:
         Draws the dice to the screen without animation
         """
         # Clear previous dice area
-        pygame.draw.rect(SCREEN, POOL_TABLE_GREEN, [535, 95, 360, 80])
+        draw_rect(SCREEN, POOL_TABLE_GREEN, [535, 95, 360, 80])
         
         # Draw each die
         for i, die_value in enumerate(self.dice_logic.rolled):
@@ -39,24 +38,29 @@ class DiceUI:
                 
                 # Draw selection border if the die is held
                 if self.dice_logic.held[i]:
-                    pygame.draw.rect(SCREEN, RED, rect, 5)
+                    draw_rect(SCREEN, RED, rect, 5)
     
     def animate_roll(self) -> None:
         """
         Sequentially draws newly rolled dice to the screen with animation
         """
+        # No time for animation when fast-forwarding
+        if fast_forward():
+            self.draw()
+            return
+
         # Clear the dice area
-        pygame.draw.rect(SCREEN, POOL_TABLE_GREEN, [535, 95, 360, 80])
-        pygame.display.flip()
+        draw_rect(SCREEN, POOL_TABLE_GREEN, [535, 95, 360, 80])
+        present()
         
         # First draw the held dice
         for i, (die_value, is_held) in enumerate(zip(self.dice_logic.rolled, self.dice_logic.held)):
             if is_held:
                 rect = SCREEN.blit(int_to_die[die_value], self.positions[i])
                 self.dice_rects[i] = rect
-                pygame.draw.rect(SCREEN, RED, rect, 5)
+                draw_rect(SCREEN, RED, rect, 5)
         
-        pygame.display.flip()
+        present()
         
         # Then animate the non-held dice
         for i, (die_value, is_held) in enumerate(zip(self.dice_logic.rolled, self.dice_logic.held)):
@@ -64,7 +68,7 @@ class DiceUI:
                 pause(1000)
                 rect = SCREEN.blit(int_to_die[die_value], self.positions[i])
                 self.dice_rects[i] = rect
-                pygame.display.flip()
+                present()
     
     def get_die_at_pos(self, pos: tuple[int, int]) -> int:
         """
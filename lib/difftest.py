@@ -0,0 +1,315 @@
+"""
+Differential tests of the fast scoring and rolling paths against the
+reference ScorecardLogic.
+
+Three checks, from exhaustive to random:
+- tables: SCORE_TABLE against calculate_score() for all 252 outcomes x 13
+  categories, and each keep's re-roll distribution in KEEP_TRANSITIONS
+  against enumerating every re-roll
+- states: every outcome scored in every open category, from scorecard
+  states chosen to hit the edge cases: a Yahtzee scored or scratched (joker
+  substitution, the bonus counted twice), the upper section just short of
+  the 63 bonus, and the bonus already won
+- fuzz: random full games, with extra Yahtzees thrown in, played through the
+  reference and the fast scorecard side by side on a process pool. Both
+  cards are compared after every move.
+
+A mismatch is minimized before it is reported. Moves are dropped while the
+mismatch still shows, then the dice are lowered, so the report shows the
+shortest game found that goes wrong.
+
+Run with e.g. `python -m lib.difftest --games 1000000`. The fast scorecard
+is VariantScorecard with the STANDARD rules unless --fast names another
+factory (`module:callable`, taking a player name).
+"""
+import argparse
+import importlib
+import os
+import time
+from itertools import product
+from random import Random
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .outcomes import (CATEGORIES, CATEGORY_INDEX, KEEP_TRANSITIONS, KEEPS, OUTCOME_INDEX, OUTCOMES, SCORE_TABLE,
+                       roll_distribution)
+from .scorecard_logic import ScorecardLogic
+
+# A game so far: the dice scored and the category they went in, move by move
+History = List[Tuple[Tuple[int, ...], str]]
+Factory = Callable[[str], object]
+
+# Scorecard state compared after every move
+FIELDS = ('scores', 'throws', 'upper_sub', 'lower_sub', 'total_score', 'plus_minus', 'yahtzee_bonus',
+          'has_upper_bonus')
+# Share of fuzzed turns whose dice are forced to a Yahtzee, to reach the joker and bonus rules often
+YAHTZEE_RATE = 0.1
+# Games per task handed to a fuzz worker
+CHUNK = 2000
+
+
+def _variant(name: str):
+    from .rules import STANDARD, VariantScorecard
+    return VariantScorecard(name, STANDARD)
+
+
+# Fast scorecards known by name
+FAST = {'variant': _variant}
+
+# Scorecard states to score every outcome from, as the moves that lead to them
+_UPPER_AT_60 = [((4, 4, 4, 4, 1), 'Fours'), ((5, 5, 5, 5, 1), 'Fives'), ((6, 6, 6, 6, 1), 'Sixes')]
+STATES: Dict[str, History] = {
+    'empty': [],
+    'yahtzee scored': [((2, 2, 2, 2, 2), 'Yahtzee')],
+    'yahtzee scratched': [((1, 2, 3, 4, 6), 'Yahtzee')],
+    'upper at 60': _UPPER_AT_60,
+    'upper bonus won': _UPPER_AT_60 + [((3, 3, 3, 3, 1), 'Threes')],
+    'yahtzee scored, upper at 60': [((2, 2, 2, 2, 2), 'Yahtzee')] + _UPPER_AT_60,
+    'yahtzee scored, upper bonus won': [((2, 2, 2, 2, 2), 'Yahtzee')] + _UPPER_AT_60 + [((3, 3, 3, 3, 1), 'Threes')],
+}
+
+
+class Mismatch:
+    """
+    The first move of a history after which the two scorecards disagree
+    """
+
+    def __init__(self, history: History, step: int, field: str, reference: object, fast: object):
+        self.history = history[:step + 1]
+        self.step = step
+        self.field = field
+        self.reference = reference
+        self.fast = fast
+
+    def __str__(self) -> str:
+        moves = "\n".join(f"  {i + 1}. {list(dice)} -> {category}" for i, (dice, category) in enumerate(self.history))
+        return (f"{self.field} differs after move {self.step + 1}:\n{moves}\n"
+                f"  reference: {self.reference!r}\n  fast:      {self.fast!r}")
+
+
+def resolve(fast: Union[str, Factory]) -> Factory:
+    """
+    A fast scorecard factory: a name in FAST, a 'module:callable' path, or the factory itself
+    """
+    if callable(fast):
+        return fast
+    if fast in FAST:
+        return FAST[fast]
+    module, _, attr = fast.partition(':')
+    return getattr(importlib.import_module(module), attr)
+
+
+def replay(history: History, fast: Union[str, Factory]) -> Optional[Mismatch]:
+    """
+    Plays <history> on a reference and a fast scorecard, and returns the first mismatch, if any
+    """
+    reference, other = ScorecardLogic("difftest"), resolve(fast)("difftest")
+    for step, (dice, category) in enumerate(history):
+        expected = reference.calculate_score(list(dice), category)
+        actual = other.calculate_score(list(dice), category)
+        if expected != actual:
+            return Mismatch(history, step, 'calculate_score', expected, actual)
+        reference.update_score(list(dice), category)
+        other.update_score(list(dice), category)
+        for field in FIELDS:
+            expected, actual = getattr(reference, field), getattr(other, field)
+            if expected != actual:
+                return Mismatch(history, step, field, expected, actual)
+    return None
+
+
+def minimize(mismatch: Mismatch, fast: Union[str, Factory]) -> Mismatch:
+    """
+    Shrinks a mismatch's history while the same field still differs: first
+    dropping moves, then lowering dice
+    """
+    def still(history: History) -> Optional[Mismatch]:
+        found = replay(history, fast)
+        return found if found and found.field == mismatch.field else None
+
+    history = mismatch.history
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for i in range(len(history)):
+            found = still(history[:i] + history[i + 1:])
+            if found:
+                mismatch, history, shrunk = found, found.history, True
+                break
+
+    for i in range(len(history)):
+        if i >= len(history):
+            # Lowered dice made the mismatch show up sooner
+            break
+        dice, category = history[i]
+        # All the dice down together first (keeping a Yahtzee a Yahtzee), then one at a time
+        for j in [None] + list(range(len(dice))):
+            if j is None:
+                lowerings = [tuple(max(1, d - step) for d in dice) for step in range(5, 0, -1)]
+            else:
+                lowerings = [dice[:j] + (value,) + dice[j + 1:] for value in range(1, dice[j])]
+            for lowered in lowerings:
+                if lowered == dice:
+                    continue
+                found = still(history[:i] + [(lowered, category)] + history[i + 1:])
+                if found:
+                    mismatch, history, dice = found, found.history, lowered
+                    break
+    return mismatch
+
+
+def check_tables() -> List[str]:
+    """
+    Compares SCORE_TABLE with calculate_score() and KEEP_TRANSITIONS with
+    enumerated re-rolls; returns a description of each mismatch
+    """
+    problems = []
+    reference = ScorecardLogic("difftest")
+    for o, dice in enumerate(OUTCOMES):
+        for category in CATEGORIES:
+            # Unsorted dice, as the game passes them
+            expected = reference.calculate_score(list(reversed(dice)), category)
+            if SCORE_TABLE[o][CATEGORY_INDEX[category]] != expected:
+                problems.append(f"SCORE_TABLE{list(dice)}[{category}] = "
+                                f"{SCORE_TABLE[o][CATEGORY_INDEX[category]]}, reference {expected}")
+
+    for k, keep in enumerate(KEEPS):
+        rerolled = 5 - len(keep)
+        counts: Dict[int, int] = {}
+        for faces in product(range(1, 7), repeat=rerolled):
+            o = OUTCOME_INDEX[tuple(sorted(keep + faces))]
+            counts[o] = counts.get(o, 0) + 1
+        indices, probs = KEEP_TRANSITIONS[k]
+        table = dict(zip(indices, probs))
+        if set(table) != set(counts) or any(abs(table[o] - n / 6 ** rerolled) > 1e-12 for o, n in counts.items()):
+            problems.append(f"KEEP_TRANSITIONS for keep {list(keep)} differs from enumerating its re-rolls")
+    if abs(sum(p for _, p in roll_distribution(5)) - 1) > 1e-12:
+        problems.append("roll_distribution(5) doesn't sum to 1")
+    return problems
+
+
+def check_states(fast: Union[str, Factory] = 'variant') -> Tuple[int, Optional[Mismatch]]:
+    """
+    Scores every outcome in every open category from each of STATES. Returns
+    the number of moves checked and the first mismatch, minimized
+    """
+    checked = 0
+    for prefix in STATES.values():
+        used = {category for _, category in prefix}
+        for category in CATEGORIES:
+            if category in used:
+                continue
+            for dice in OUTCOMES:
+                checked += 1
+                found = replay(prefix + [(tuple(reversed(dice)), category)], fast)
+                if found:
+                    return checked, minimize(found, fast)
+    return checked, None
+
+
+def random_game(rng: Random) -> History:
+    """
+    A full game of random dice and random category choices, with extra Yahtzees thrown in
+    """
+    open_categories = list(CATEGORIES)
+    rng.shuffle(open_categories)
+    history = []
+    for category in open_categories:
+        if rng.random() < YAHTZEE_RATE:
+            dice = (rng.randint(1, 6),) * 5
+        else:
+            dice = tuple(rng.randint(1, 6) for _ in range(5))
+        history.append((dice, category))
+    return history
+
+
+def fuzz_range(fast: Union[str, Factory], first: int, count: int) -> Tuple[int, Optional[Tuple[int, Mismatch]]]:
+    """
+    Plays the games seeded <first> to <first> + <count> - 1 and returns how
+    many were played, and the first mismatch found with its seed
+    """
+    for seed in range(first, first + count):
+        found = replay(random_game(Random(seed)), fast)
+        if found:
+            return seed - first + 1, (seed, found)
+    return count, None
+
+
+def fuzz(games: int, fast: Union[str, Factory] = 'variant', seed: int = 0,
+         workers: Optional[int] = None) -> Tuple[int, Optional[Tuple[int, Mismatch]]]:
+    """
+    Fuzzes <games> games over a process pool (in this process if <workers>
+    is 1). Returns the games played and the lowest-seeded mismatch, minimized.
+    Stops handing out work once a mismatch turns up.
+    """
+    ranges = [(first, min(CHUNK, seed + games - first)) for first in range(seed, seed + games, CHUNK)]
+    played, first_found = 0, None
+    if workers == 1:
+        for first, count in ranges:
+            n, found = fuzz_range(fast, first, count)
+            played += n
+            if found:
+                first_found = found
+                break
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(fuzz_range, fast, first, count) for first, count in ranges]
+            # In seed order, so the first mismatch to come back is the lowest-seeded
+            for future in futures:
+                n, found = future.result()
+                played += n
+                if found:
+                    first_found = found
+                    for rest in futures:
+                        rest.cancel()
+                    break
+    if first_found:
+        first_found = (first_found[0], minimize(first_found[1], fast))
+    return played, first_found
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Check the fast scoring paths against ScorecardLogic")
+    parser.add_argument('--games', type=int, default=1_000_000, help="random games to fuzz")
+    parser.add_argument('--fast', default='variant', help="fast scorecard: 'variant' or module:callable")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    failed = False
+
+    start = time.perf_counter()
+    problems = check_tables()
+    print(f"tables: {len(OUTCOMES) * len(CATEGORIES)} scores and {len(KEEPS)} re-roll distributions, "
+          f"{len(problems)} mismatches ({time.perf_counter() - start:.1f}s)")
+    for problem in problems[:10]:
+        print(f"  {problem}")
+    failed |= bool(problems)
+
+    start = time.perf_counter()
+    checked, found = check_states(args.fast)
+    print(f"states: {checked} moves from {len(STATES)} scorecard states ({time.perf_counter() - start:.1f}s)")
+    if found:
+        print(found)
+        failed = True
+
+    start = time.perf_counter()
+    played, first_found = fuzz(args.games, args.fast, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"fuzz: {played} games on {args.workers or os.cpu_count()} processes in {elapsed:.1f}s "
+          f"({played / elapsed:.0f} games/sec)")
+    if first_found:
+        print(f"game seed {first_found[0]}, minimized:")
+        print(first_found[1])
+        failed = True
+
+    if failed:
+        raise SystemExit(1)
+    print("no mismatches")
+
+
+if __name__ == "__main__":
+    main()
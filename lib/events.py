@@ -0,0 +1,149 @@
+"""
+Streaming gameplay events for analytics.
+
+YahtzeeGame, DiceLogic and ScorecardLogic emit events into an EventStream
+when one is attached (and skip all of this when none is). The stream fans
+events out to sinks, which are generators fed with send(): they buffer
+events and write them in bulk, as JSON lines or as columnar batches.
+
+Event kinds: game_start, roll, hold, category_scored, upper_bonus,
+yahtzee_bonus and game_end. Every event carries the game number and round.
+
+The window and terminal versions stream the games played in them when
+YAHTZEE_EVENTS names a file (written as JSON lines, or as columnar batches
+if YAHTZEE_EVENTS_FORMAT is 'columnar').
+"""
+import atexit
+import json
+import os
+from typing import Any, Dict, Generator, Iterator, List, Optional
+
+Event = Dict[str, Any]
+Sink = Generator[None, Optional[Event], None]
+
+# Column order for columnar batches; events lacking a field get None
+COLUMNS = ['kind', 'game', 'round', 'player', 'players', 'dice', 'held', 'die',
+           'category', 'score', 'throws', 'bonus', 'scores']
+
+
+class EventStream:
+    """
+    Fans game events out to sinks
+    """
+
+    def __init__(self, *sinks: Sink):
+        self.sinks: List[Sink] = []
+        # Context stamped onto every event
+        self.game = 0
+        self.round = 0
+        for sink in sinks:
+            self.add_sink(sink)
+
+    def add_sink(self, sink: Sink) -> None:
+        """
+        Primes a sink generator and starts sending it events
+        """
+        next(sink)
+        self.sinks.append(sink)
+
+    def emit(self, kind: str, **fields: Any) -> None:
+        """
+        Sends an event to every sink
+        """
+        event = {'kind': kind, 'game': self.game, 'round': self.round}
+        event.update(fields)
+        for sink in self.sinks:
+            sink.send(event)
+
+    def close(self) -> None:
+        """
+        Flushes and closes every sink
+        """
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+
+
+def jsonl_sink(path: str, buffer_size: int = 4096) -> Sink:
+    """
+    Sink which writes one JSON object per line, <buffer_size> events at a time
+    """
+    encode = json.JSONEncoder(separators=(',', ':')).encode
+    buffer: List[str] = []
+    with open(path, 'w', encoding='utf-8') as f:
+        try:
+            while True:
+                event = yield
+                buffer.append(encode(event) + "\n")
+                if len(buffer) >= buffer_size:
+                    f.writelines(buffer)
+                    buffer.clear()
+        finally:
+            f.writelines(buffer)
+
+
+def columnar_sink(path: str, batch_size: int = 65536) -> Sink:
+    """
+    Sink which collects events into per-field columns and writes each batch
+    of <batch_size> events as one JSON line: {"rows": n, "columns": {field: [...]}}
+    """
+    columns: Dict[str, List[Any]] = {name: [] for name in COLUMNS}
+    rows = 0
+
+    def write_batch(f) -> None:
+        f.write(json.dumps({'rows': rows, 'columns': columns}, separators=(',', ':')) + "\n")
+        for values in columns.values():
+            values.clear()
+
+    with open(path, 'w', encoding='utf-8') as f:
+        try:
+            while True:
+                event = yield
+                for name, values in columns.items():
+                    values.append(event.get(name))
+                rows += 1
+                if rows >= batch_size:
+                    write_batch(f)
+                    rows = 0
+        finally:
+            if rows:
+                write_batch(f)
+
+
+def make_sink(path: str, fmt: str = 'jsonl') -> Sink:
+    """
+    Returns a sink of the given format ('jsonl' or 'columnar') writing to <path>
+    """
+    if fmt == 'jsonl':
+        return jsonl_sink(path)
+    if fmt == 'columnar':
+        return columnar_sink(path)
+    raise ValueError(f"Unknown event format: {fmt}")
+
+
+def read_events(path: str) -> Iterator[Event]:
+    """
+    Yields the events in a JSON lines or columnar event file
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if 'columns' in record and 'rows' in record:
+                columns = record['columns']
+                for i in range(record['rows']):
+                    yield {name: values[i] for name, values in columns.items() if values[i] is not None}
+            else:
+                yield record
+
+
+def stream_from_env() -> Optional[EventStream]:
+    """
+    The event stream YAHTZEE_EVENTS asks for, or None if it's unset. The
+    stream is closed (and its sink flushed) at exit.
+    """
+    path = os.environ.get("YAHTZEE_EVENTS")
+    if not path:
+        return None
+    stream = EventStream(make_sink(path, os.environ.get("YAHTZEE_EVENTS_FORMAT", "jsonl")))
+    atexit.register(stream.close)
+    return stream
@@ -1,15 +1,30 @@
 """
 Core game logic for Yahtzee, independent of any UI.
 """
-from typing import List, Dict, Optional, Tuple
-import os
+import sqlite3
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
 from .dice_logic import DiceLogic
+from .events import EventStream
+from .instrument import INSTRUMENTS
+from .leaderboard import TopScores
+from .scoreboard import Scoreboard
 from .scorecard_logic import ScorecardLogic
+from .score_history import HISTORY_DB, OPPONENT_SEPARATOR, ScoreHistory
+from .score_writer import HS_LIMIT, HighScoreWriter, read_high_score_file
+
+if TYPE_CHECKING:
+    from .rules import RuleSet
 
 # Maximum number of rounds in a game
 MAX_ROUNDS = 13
 # High score file
 HS_FILE = "high_score.txt"
+# Most players a game can have
+MAX_PLAYERS = 8
+# Name the UI gives the bot (numbered when there is more than one)
+BOT_NAME = "Yahtzee Bot"
+# Strategy the bot plays unless told otherwise (see lib.strategy)
+DEFAULT_STRATEGY = "greedy"
 
 
 class YahtzeeGame:
@@ -17,33 +32,109 @@ class YahtzeeGame:
     Core game logic for Yahtzee
     """
 
-    def __init__(self):
-        self.player1_name = ""
-        self.player2_name = ""
-        self.player1_scorecard: Optional[ScorecardLogic] = None
-        self.player2_scorecard: Optional[ScorecardLogic] = None
+    def __init__(self, bot_strategy: str = DEFAULT_STRATEGY, load_high_scores: bool = True,
+                 rules: Optional['RuleSet'] = None):
+        # Name of the registered strategy the bot plays with
+        self.bot_strategy = bot_strategy
+        # Rules variant, or None for the standard game
+        self.rules = rules
+        self.player_names: List[str] = []
+        self.scorecards: List[ScorecardLogic] = []
+        # Strategy name for each bot player, None for humans
+        self.bots: List[Optional[str]] = []
+        self.board: Optional[Scoreboard] = None
         self.current_round = 0
-        self.high_scores: List[Tuple[int, str, str]] = []
+        # Seat of the player whose turn it is
+        self.current_player = 0
+        # Only the best HS_LIMIT scores are kept in memory
+        self.high_scores = TopScores(HS_LIMIT)
+        # Cached leaderboard, and the high score version it was read at
+        self._sorted_high_scores: List[Tuple[int, str, str]] = []
+        self._sorted_version: Tuple[int, int] = (-1, 0)
         self.active_dice = DiceLogic()
-        self.read_high_scores()
+        # Background high score writer, started on the first write
+        self.hs_writer: Optional[HighScoreWriter] = None
+        # Analytics event stream, if one is attached
+        self.events: Optional[EventStream] = None
+        # Game history database, opened on first use
+        self._history: Optional[ScoreHistory] = None
+        if load_high_scores:
+            self.read_high_scores()
 
-    def setup_new_game(self, player1_name: str, player2_name: str) -> None:
+    def setup_new_game(self, *player_names: str, bots: Optional[Sequence[Optional[str]]] = None) -> None:
         """
-        Set up a new game with player names
+        Set up a new game for 1 to MAX_PLAYERS players.
+
+        Empty names after the first are skipped, so ("name", "") sets up a
+        practice game. <bots> gives a strategy name (or None for a human) per
+        player; by default players named after the bot are bots.
         """
-        self.player1_name = player1_name
-        self.player2_name = player2_name
-        self.player1_scorecard = ScorecardLogic(player1_name)
+        names = list(player_names[:1]) + [name for name in player_names[1:] if name]
+        if not 1 <= len(names) <= MAX_PLAYERS:
+            raise ValueError(f"A game needs 1 to {MAX_PLAYERS} players")
+        if bots is None:
+            bots = [self.bot_strategy if name.startswith(BOT_NAME) else None for name in names]
+        elif len(bots) != len(names):
+            raise ValueError("Need one bot setting per player")
 
-        # Only create player 2 scorecard if not in practice mode
-        if player2_name:
-            self.player2_scorecard = ScorecardLogic(player2_name)
+        self.player_names = names
+        self.bots = list(bots)
+        if self.rules:
+            from .rules import VariantScorecard
+            self.scorecards = [VariantScorecard(name, self.rules) for name in names]
         else:
-            self.player2_scorecard = None
+            self.scorecards = [ScorecardLogic(name) for name in names]
+        self.board = Scoreboard(len(names), self.scorecards[0].get_all_categories())
+        for seat, scorecard in enumerate(self.scorecards):
+            scorecard.board = self.board
+            scorecard.seat = seat
 
         self.current_round = 0
+        self.current_player = 0
         self.active_dice = DiceLogic()
 
+        if self.events:
+            self.events.game += 1
+            self.events.round = 0
+            self.active_dice.events = self.events
+            for scorecard in self.scorecards:
+                scorecard.events = self.events
+            self.events.emit('game_start', players=list(names))
+
+    @property
+    def player1_name(self) -> str:
+        """
+        The first player's name
+        """
+        return self.player_names[0] if self.player_names else ""
+
+    @property
+    def player2_name(self) -> str:
+        """
+        The second player's name, or "" in practice mode
+        """
+        return self.player_names[1] if len(self.player_names) > 1 else ""
+
+    @property
+    def player1_scorecard(self) -> Optional[ScorecardLogic]:
+        """
+        The first player's scorecard
+        """
+        return self.scorecards[0] if self.scorecards else None
+
+    @property
+    def player2_scorecard(self) -> Optional[ScorecardLogic]:
+        """
+        The second player's scorecard, or None in practice mode
+        """
+        return self.scorecards[1] if len(self.scorecards) > 1 else None
+
+    def is_bot(self, seat: int) -> bool:
+        """
+        Check if the player in a seat is a bot
+        """
+        return self.bots[seat] is not None
+
     def reset_turn(self) -> None:
         """
         Reset dice for a new turn
@@ -54,7 +145,7 @@ class YahtzeeGame:
         """
         Check if the game is over
         """
-        return self.current_round >= MAX_ROUNDS
+        return self.current_round >= (self.rules.rounds if self.rules else MAX_ROUNDS)
 
     def next_round(self) -> None:
         """
@@ -62,110 +153,194 @@ class YahtzeeGame:
         """
         self.current_round += 1
 
+        if self.events:
+            self.events.round = self.current_round
+            if self.is_game_over() and self.board:
+                self.events.emit('game_end', scores=list(self.board.totals))
+
+    def end_turn(self) -> None:
+        """
+        Pass the turn to the next player, starting the next round after the last one
+        """
+        self.current_player += 1
+        if self.current_player >= len(self.scorecards):
+            self.current_player = 0
+            self.next_round()
+
+    def get_rankings(self) -> List[Tuple[str, int]]:
+        """
+        Returns (name, score) for every player, best first
+        """
+        if not self.board:
+            return []
+        return [(self.player_names[seat], self.board.totals[seat]) for seat in self.board.rankings()]
+
     def get_winner(self) -> Tuple[str, int, int]:
         """
-        Returns the winner's name and both scores
+        Returns the winner's name and score, and the runner-up's score
         """
-        if not self.player1_scorecard:
+        rankings = self.get_rankings()
+        if not rankings:
             return ("No game in progress", 0, 0)
 
-        p1_score = self.player1_scorecard.final_tally()
+        winner, winner_score = rankings[0]
 
         # Practice mode - only one player
-        if not self.player2_scorecard:
-            return (self.player1_name, p1_score, 0)
+        if len(rankings) == 1:
+            return (winner, winner_score, 0)
 
-        p2_score = self.player2_scorecard.final_tally()
+        return (winner, winner_score, rankings[1][1])
 
-        if p1_score > p2_score:
-            return (self.player1_name, p1_score, p2_score)
-        else:
-            return (self.player2_name, p2_score, p1_score)
+    def ai_choose_holds(self, scorecard: ScorecardLogic, strategy: Optional[str] = None) -> bool:
+        """
+        Let the bot set its holds on the active dice.
+        Returns False if it holds every die, i.e. doesn't want to roll again.
+        """
+        # Strategies are imported on first use: their tables take a while to build
+        from .strategy import get_strategy
+        held = get_strategy(strategy or self.bot_strategy).choose_holds(self.active_dice, scorecard)
+        for i, hold in enumerate(held):
+            self.active_dice.set_hold(i, hold)
+        return not all(held)
 
-    def process_turn_ai(self, scorecard: ScorecardLogic) -> str:
+    def ai_choose_category(self, scorecard: ScorecardLogic, strategy: Optional[str] = None) -> str:
         """
-        Process an AI turn and return the chosen category
+        Let the bot score the active dice, and return the chosen category
+        """
+        from .strategy import get_strategy
+        category = get_strategy(strategy or self.bot_strategy).choose_category(self.active_dice, scorecard)
+        scorecard.update_score(self.active_dice.rolled, category)
+        return category
+
+    def process_turn_ai(self, scorecard: ScorecardLogic, strategy: Optional[str] = None) -> str:
+        """
+        Process a whole AI turn from fresh dice and return the chosen category
         """
         # Roll the dice
         self.active_dice.roll_dice()
         self.active_dice.rolls_left -= 1
 
-        # Roll up to 3 times
+        # Roll up to 3 times, unless the bot is happy with what it has
         while self.active_dice.rolls_left > 0:
-            # Simple strategy: hold dice with the most common value
-            counts: Dict[int, int] = {}
-            for die in self.active_dice.rolled:
-                counts[die] = counts.get(die, 0) + 1
-
-            common_value, _ = max(counts.items(), key=lambda x: x[1])
-
-            for i, die in enumerate(self.active_dice.rolled):
-                self.active_dice.set_hold(i, die == common_value)
-
-            # Roll dice if rolls are still available
+            if not self.ai_choose_holds(scorecard, strategy):
+                break
             self.active_dice.roll_dice()
             self.active_dice.rolls_left -= 1
 
         # After rolling, choose the best scoring category
-        best_category = ""
-        best_score = -1
-
-        for category in scorecard.get_all_categories():
-            if not scorecard.is_category_used(category):
-                score = scorecard.calculate_score(self.active_dice.rolled, category)
-                if score > best_score:
-                    best_score = score
-                    best_category = category
-
-        # Update the scorecard with the chosen category
-        scorecard.update_score(self.active_dice.rolled, best_category)
-
-        return best_category
+        return self.ai_choose_category(scorecard, strategy)
 
     def read_high_scores(self) -> None:
         """
         Read high scores from a file
         """
-        self.high_scores = []
+        self.high_scores = TopScores(HS_LIMIT)
+        with INSTRUMENTS.timer('hiscore_read_ms'):
+            self._read_high_score_file()
+
+    def _read_high_score_file(self) -> None:
+        """
+        Add the entries of the high score file to self.high_scores
+        """
         try:
-            if os.path.exists(HS_FILE):
-                with open(HS_FILE, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        items = line.strip().split(",")
-                        if len(items) >= 3:
-                            self.high_scores.append((int(items[0]), items[1], items[2]))
-        except (IOError, ValueError) as e:
+            self.high_scores.extend(read_high_score_file(HS_FILE))
+        except IOError as e:
             print(f"Could not read from high score file: {e}")
 
+    def _opponents(self, seat: int) -> str:
+        """
+        Returns the names of everyone but the player in <seat>, as recorded in the high scores
+        """
+        return OPPONENT_SEPARATOR.join(name for i, name in enumerate(self.player_names) if i != seat)
+
+    @property
+    def history(self) -> Optional[ScoreHistory]:
+        """
+        The game history database. A new database starts with the legacy high score file imported.
+        """
+        if self._history is None:
+            try:
+                self._history = ScoreHistory(HISTORY_DB)
+                if self._history.is_empty():
+                    self._history.import_legacy(HS_FILE)
+            except (sqlite3.Error, IOError) as e:
+                print(f"Could not open game history: {e}")
+        return self._history
+
+    def record_history(self) -> None:
+        """
+        Add the finished game, practice games included, to the game history
+        """
+        if not self.scorecards or not self.history:
+            return
+
+        if len(self.scorecards) == 1:
+            results = [(self.player1_name, "", self.player1_scorecard.final_tally(), None)]
+        else:
+            # Only an outright best score counts as a win
+            totals = list(self.board.totals)
+            best = max(totals)
+            outright = totals.count(best) == 1
+            results = [(name, self._opponents(seat), score, int(outright and score == best))
+                       for seat, (name, score) in enumerate(zip(self.player_names, totals))]
+        # Practice and bot-only games are kept off the leaderboard, as off the high score file
+        ranked = len(self.scorecards) > 1 and not all(self.bots)
+        try:
+            with INSTRUMENTS.timer('history_write_ms'):
+                self.history.record_game(results, ranked=ranked)
+        except sqlite3.Error as e:
+            print(f"Could not record game history: {e}")
+        # The leaderboard is read from the history, which the high score version doesn't track
+        self._sorted_version = (-1, 0)
+
     def write_high_scores(self) -> None:
         """
-        Write the top 10 high scores to a file
+        Record the game in the history, and queue its scores to be merged into
+        the high score file. The file write happens on a background thread, and is atomic.
         """
         # Add current game scores if available
-        if self.player1_scorecard:
-            p1_score = self.player1_scorecard.final_tally()
-
-            # Practice mode - don't reord high score
-            if not self.player2_scorecard:
-                return
-            else:
-                # Regular mode - record both players
-                p2_score = self.player2_scorecard.final_tally()
-                self.high_scores.append((p1_score, self.player1_name, self.player2_name))
-                self.high_scores.append((p2_score, self.player2_name, self.player1_name))
-
-        # Sort and write top 10
-        sorted_scores = sorted(self.high_scores, reverse=True)
-        try:
-            with open(HS_FILE, 'w', encoding='utf-8') as f:
-                for score in sorted_scores[:10]:
-                    line = f"{score[0]},{score[1]},{score[2]}\n"
-                    f.write(line)
-        except IOError as e:
-            print(f"Could not write to high score file: {e}")
+        if not self.scorecards:
+            return
+
+        self.record_history()
 
-    def get_sorted_high_scores(self, limit: int = 10) -> List[Tuple[int, str, str]]:
+        # Practice mode and bot-only games - don't record high score
+        if len(self.scorecards) == 1 or all(self.bots):
+            return
+
+        # Regular mode - record every player
+        new_scores = [(scorecard.final_tally(), name, self._opponents(seat))
+                      for seat, (name, scorecard) in enumerate(zip(self.player_names, self.scorecards))]
+        self.high_scores.extend(new_scores)
+
+        if self.hs_writer is None:
+            self.hs_writer = HighScoreWriter(HS_FILE)
+        self.hs_writer.submit(new_scores)
+
+    def flush_high_scores(self) -> None:
+        """
+        Block until queued high scores have been written
         """
-        Get sorted high scores
+        if self.hs_writer:
+            self.hs_writer.flush()
+
+    def get_sorted_high_scores(self, limit: int = HS_LIMIT) -> List[Tuple[int, str, str]]:
+        """
+        Get sorted high scores from the game history, or from the high score file without one.
+        The result is cached until this game records new scores.
         """
-        return sorted(self.high_scores, reverse=True)[:limit]
+        if self._sorted_version == (self.high_scores.version, limit):
+            return self._sorted_high_scores
+
+        scores = None
+        if self.history:
+            try:
+                scores = self.history.top_scores(limit)
+            except sqlite3.Error as e:
+                print(f"Could not read game history: {e}")
+        if scores is None:
+            scores = self.high_scores.sorted()[:limit]
+
+        self._sorted_high_scores = scores
+        self._sorted_version = (self.high_scores.version, limit)
+        return scores
@@ -2,18 +2,25 @@
 UI controller for the Yahtzee game
 """
 import sys
+import time
 import pygame
 from typing import Optional, List, Tuple
 
-from .game_logic import YahtzeeGame
+from .game_logic import BOT_NAME, MAX_PLAYERS, YahtzeeGame
 from .dice_logic import DiceLogic
+from .events import stream_from_env
 from .scorecard_logic import ScorecardLogic
 from .dice_ui import DiceUI
-from .scorecard_ui import ScorecardUI
+from .scorecard_ui import ScorecardUI, layout_cards
 from .button import Button
+from .instrument import INSTRUMENTS
+from .odds import dice_odds
+from .snapshot import clear_snapshot, load_snapshot, restore_game, save_snapshot, saved_time_scale
 from .ui_common import (
-    SCREEN, POOL_TABLE_GREEN, WHITE, BLACK, FONT, BUTTON_WIDTH, BUTTON_HEIGHT,
-    HUMAN_IMAGE, BOT_IMAGE, WIDTH, RED, pause, AI_TURN_DELAY
+    SCREEN, POOL_TABLE_GREEN, WHITE, BLACK, FONT, SMALL_FONT, BUTTON_WIDTH, BUTTON_HEIGHT,
+    HUMAN_IMAGE, BOT_IMAGE, WIDTH, HEIGHT, RED, Text, pause, AI_TURN_DELAY, TIME_SCALES,
+    adjustable_time_scale, draw_line, draw_rect, fast_forward, handle_key, layout_font, mouse_pos, on_key,
+    present, pump_events, set_time_scale, turns_per_frame
 )
 
 
@@ -27,38 +34,54 @@ class YahtzeeUI:
         Initialize the UI
         """
         self.game = YahtzeeGame()
+        # Stream the games played to an analytics file, if YAHTZEE_EVENTS names one
+        self.game.events = stream_from_env()
         self.clock = pygame.time.Clock()
         self.new_players = False
+        # Whether to show the odds of making each category during human turns
+        self.show_odds = False
+        # 'd' toggles the debug HUD on anyone's turn, bots' included
+        on_key(pygame.K_d, self._toggle_hud)
 
         # Initialize scorecards UI (they'll be properly set up in init_new_game)
-        self.pl1_card_ui: Optional[ScorecardUI] = None
-        self.pl2_card_ui: Optional[ScorecardUI] = None
+        self.card_uis: List[ScorecardUI] = []
         self.dice_ui: Optional[DiceUI] = None
 
+        # Rendered high score rows, and the list they were rendered from
+        self._hs_source: Optional[List[Tuple[int, str, str]]] = None
+        self._hs_rows: List[Tuple[Text, Text, Text]] = []
+
+        # Offer to carry on with a game that was interrupted
+        snapshot = load_snapshot()
+        if snapshot and self._ask_resume(snapshot):
+            restore_game(self.game, snapshot)
+            time_scale = saved_time_scale(snapshot)
+            if time_scale is None:
+                set_time_scale(1.0)
+            else:
+                set_time_scale(time_scale, speed_keys=True)
+            self.player_names = list(self.game.player_names)
+            self._init_new_game(resume=True)
+
         # Get player info and start a new game
-        self.pl1_name, self.pl2_name = self._get_players()
+        self.player_names = self._get_players()
         self._init_new_game()
 
-    def _init_new_game(self) -> None:
+    def _init_new_game(self, resume: bool = False) -> None:
         """
-        Initialize a new game
+        Initialize a new game, or carry on with the restored one if <resume> is set
         """
         if self.new_players:
-            self.pl1_name, self.pl2_name = self._get_players()
+            self.player_names = self._get_players()
 
         self.new_players = False
 
         # Initialize game logic
-        self.game.setup_new_game(self.pl1_name, self.pl2_name)
+        if not resume:
+            self.game.setup_new_game(*self.player_names)
 
         # Set up UI components
-        self.pl1_card_ui = ScorecardUI(50, 300, self.game.player1_scorecard)
-
-        # Only set up second player UI if not in practice mode
-        if self.pl2_name:  # Practice mode has empty pl2_name
-            self.pl2_card_ui = ScorecardUI(775, 300, self.game.player2_scorecard)
-        else:
-            self.pl2_card_ui = None
+        self.card_uis = layout_cards(self.game.scorecards)
 
         self.dice_ui = DiceUI(self.game.active_dice)
 
@@ -69,15 +92,68 @@ class YahtzeeUI:
         """
         Draw the background and scorecards
         """
-        SCREEN.fill(POOL_TABLE_GREEN)
+        with INSTRUMENTS.timer('frame_ms'):
+            SCREEN.fill(POOL_TABLE_GREEN)
+
+            for card_ui in self.card_uis:
+                card_ui.draw()
+
+            self._draw_hud()
+            present()
+
+    def _draw_cards(self, seats: List[int]) -> None:
+        """
+        Redraw just the given players' scorecards, and clear the dice and status area above the cards
+        """
+        with INSTRUMENTS.timer('frame_ms'):
+            draw_rect(SCREEN, POOL_TABLE_GREEN, (0, 0, WIDTH, 220))
+            for seat in seats:
+                self.card_uis[seat].draw()
+            self._draw_hud()
+            present()
+
+    def _draw_hud(self) -> None:
+        """
+        Draw the instrumentation counters in the bottom corner, if the debug HUD is on
+        """
+        if not INSTRUMENTS.hud:
+            return
 
-        if self.pl1_card_ui:
-            self.pl1_card_ui.draw()
+        lines = INSTRUMENTS.hud_lines() or ["Debug HUD: no samples yet"]
+        y = HEIGHT - 25 * len(lines) - 10
+        draw_rect(SCREEN, BLACK, (0, y - 5, 725, HEIGHT - y + 5))
+        for line in lines:
+            SCREEN.blit(FONT.render(line, True, WHITE), (10, y))
+            y += 25
+
+    def _toggle_hud(self) -> None:
+        """
+        Show or hide the debug HUD; hiding it redraws the screen underneath
+        """
+        INSTRUMENTS.toggle_hud()
+        if INSTRUMENTS.hud:
+            self._draw_hud()
+            present()
+            return
+        self._draw_screen()
+        if self.dice_ui:
+            self.dice_ui.draw()
+            present()
 
-        if self.pl2_card_ui:  # Only draw if exists (not practice mode)
-            self.pl2_card_ui.draw()
+    def _draw_odds(self, scorecard: ScorecardLogic) -> None:
+        """
+        Draw the chance of making each open category, to the right of the dice
+        """
+        area = pygame.Rect(910, 5, WIDTH - 915, 210)
+        draw_rect(SCREEN, POOL_TABLE_GREEN, area)
+        if not self.show_odds:
+            return
 
-        pygame.display.flip()
+        odds = dice_odds(self.game.active_dice)
+        open_categories = [c for c in scorecard.get_all_categories() if not scorecard.is_category_used(c)]
+        for i, category in enumerate(open_categories):
+            text = SMALL_FONT.render(f"{category}: {odds[category]:.0%}", True, WHITE)
+            SCREEN.blit(text, (area.x + (i // 7) * 260, area.y + (i % 7) * 29))
 
     def human_turn(self, scorecard: ScorecardLogic, scorecard_ui: ScorecardUI) -> None:
         """
@@ -98,7 +174,7 @@ class YahtzeeUI:
                 text = f"{name}'s turn. {dice.rolls_left} roll"
                 text += f"{'' if dice.rolls_left == 1 else 's'} left"
                 # Draw 'roll' button
-                pos = pygame.mouse.get_pos()
+                pos = mouse_pos()
                 roll_button.draw(pos)
             else:
                 text = f"No more rolls, {name}. Pick a scoring category..."
@@ -107,20 +183,29 @@ class YahtzeeUI:
             text_rect = surface.get_rect(topleft=(50, 50))
             # Add some width to the rect for consistent clearing
             text_rect.width += 20
-            pygame.draw.rect(SCREEN, POOL_TABLE_GREEN, text_rect)
+            draw_rect(SCREEN, POOL_TABLE_GREEN, text_rect)
             SCREEN.blit(surface, (50, 50))
-            pygame.display.flip()
+            self._draw_odds(scorecard)
+            present()
 
             event = pygame.event.wait()
+            event_time = time.perf_counter()
             if event.type == pygame.QUIT:
                 sys.exit()
 
+            # Keys answered on every turn, e.g. 'd' for the debug HUD
+            handle_key(event)
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_o:
+                # 'o' key pressed: toggle the odds panel
+                self.show_odds = not self.show_odds
+
             if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
                 # 'r' key pressed: roll the dice
                 rolled_once = True
                 rolled = True
 
-            pos = pygame.mouse.get_pos()
+            pos = mouse_pos()
 
             # Handle roll button
             if roll_button.handle_event(event, pos):
@@ -138,12 +223,13 @@ class YahtzeeUI:
                 # Animate the dice roll
                 if dice_ui:
                     dice_ui.animate_roll()
-                pygame.display.flip()
+                present()
+                INSTRUMENTS.record('input_to_flip_ms', (time.perf_counter() - event_time) * 1000)
                 rolled = False
                 continue
 
             if event.type == pygame.MOUSEBUTTONDOWN:
-                pos = pygame.mouse.get_pos()
+                pos = mouse_pos()
 
                 # Check if a die was clicked
                 if dice_ui:
@@ -162,7 +248,8 @@ class YahtzeeUI:
             # Redraw dice
             if dice_ui:
                 dice_ui.draw()
-            pygame.display.flip()
+            present()
+            INSTRUMENTS.record('input_to_flip_ms', (time.perf_counter() - event_time) * 1000)
   
     def ai_turn(self, scorecard: ScorecardLogic) -> None:
         """
@@ -174,12 +261,18 @@ class YahtzeeUI:
         dice_ui = self.dice_ui
         name = scorecard.player_name
 
+        # Fast-forwarding: play the whole turn without drawing it
+        if fast_forward():
+            with INSTRUMENTS.timer('ai_decision_ms'):
+                self.game.process_turn_ai(scorecard)
+            return
+
         # Show initial state
         text = f"{name}'s turn. {dice.rolls_left} roll"
         text += f"{'' if dice.rolls_left == 1 else 's'} left"
         player_name = FONT.render(text, True, WHITE)
         SCREEN.blit(player_name, (50, 50))
-        pygame.display.flip()
+        present()
 
         # First roll
         dice.roll_dice()
@@ -195,73 +288,69 @@ class YahtzeeUI:
             player_name = FONT.render(text, True, WHITE)
             text_rect = player_name.get_rect(topleft=(50, 50))
             text_rect.width += 20
-            pygame.draw.rect(SCREEN, POOL_TABLE_GREEN, text_rect)
+            draw_rect(SCREEN, POOL_TABLE_GREEN, text_rect)
             SCREEN.blit(player_name, (50, 50))
-            pygame.display.flip()
-
-            # Let the game logic decide which dice to hold
-            # The AI logic is now in the game logic
-            # Simple strategy: hold dice with the most common value
-            counts = {}
-            for die in dice.rolled:
-                counts[die] = counts.get(die, 0) + 1
+            present()
 
-            common_value, _ = max(counts.items(), key=lambda x: x[1])
-
-            for i, die in enumerate(dice.rolled):
-                dice.set_hold(i, die == common_value)
+            # Let the bot strategy decide which dice to hold
+            with INSTRUMENTS.timer('ai_decision_ms'):
+                keep_rolling = self.game.ai_choose_holds(scorecard)
+            if not keep_rolling:
+                # Holding everything: no point rolling again
+                break
 
             # Redraw dice with held selections
             if dice_ui:
                 dice_ui.draw()
-            pygame.display.flip()
+            present()
 
             # Wait so human can see the held dice
             pause(AI_TURN_DELAY)
 
             # Roll the dice
-            if dice.rolls_left > 0:
-                dice.roll_dice()
-                dice.rolls_left -= 1
+            dice.roll_dice()
+            dice.rolls_left -= 1
 
-                # Animate the dice roll
-                if dice_ui:
-                    dice_ui.animate_roll()
-                pygame.display.flip()
+            # Animate the dice roll
+            if dice_ui:
+                dice_ui.animate_roll()
+            present()
 
-                # Pause again
-                pause(AI_TURN_DELAY)
+            # Pause again
+            pause(AI_TURN_DELAY)
 
-        # Let the game logic choose the best category
-        chosen_category = self.game.process_turn_ai(scorecard)
+        # Let the bot strategy score the dice it ended up with
+        with INSTRUMENTS.timer('ai_decision_ms'):
+            chosen_category = self.game.ai_choose_category(scorecard)
 
         # Display chosen category
-        text = f"Yahtzee Bot selects {chosen_category} for {scorecard.scores[chosen_category]} points."
+        text = f"{name} selects {chosen_category} for {scorecard.scores[chosen_category]} points."
         surface = FONT.render(text, True, WHITE)
         text_rect = surface.get_rect(topleft=(50, 50))
-        pygame.draw.rect(SCREEN, POOL_TABLE_GREEN, text_rect)
+        draw_rect(SCREEN, POOL_TABLE_GREEN, text_rect)
         SCREEN.blit(surface, (50, 50))
-        pygame.display.flip()
+        present()
 
         # Pause for a moment
         pause(AI_TURN_DELAY)
 
-    def _pl2_turn(self) -> None:
+    def _player_turn(self, seat: int) -> None:
         """
-        Handle player 2's turn (human or AI)
+        Handle one player's turn (human or AI)
         """
-        if not self.game.player2_scorecard or not self.pl2_card_ui:
-            return
-
-        if self.pl2_name == "Yahtzee Bot":
-            self.ai_turn(self.game.player2_scorecard)
+        scorecard = self.game.scorecards[seat]
+        if self.game.is_bot(seat):
+            self.ai_turn(scorecard)
         else:
-            self.human_turn(self.game.player2_scorecard, self.pl2_card_ui)
+            self.human_turn(scorecard, self.card_uis[seat])
 
     def _game_over(self) -> None:
         """
         Show game over screen with options
         """
+        # Nothing left to resume
+        clear_snapshot()
+
         # Get winner info
         winner, winner_score, loser_score = self.game.get_winner()
 
@@ -270,10 +359,10 @@ class YahtzeeUI:
 
         # Draw game over screen
         self._draw_screen()
-        winner_font = pygame.font.SysFont("Arial", 56)
+        winner_font = layout_font(56)
 
         # Different message for practice mode
-        if not self.pl2_name:  # Practice mode
+        if len(self.game.scorecards) == 1:  # Practice mode
             text = winner_font.render(f"Game Complete! Score: {winner_score}", True, BLACK)
         else:
             text = winner_font.render(f"{winner} WINS!!!!", True, BLACK)
@@ -285,10 +374,10 @@ class YahtzeeUI:
         hs_button = Button((1030, 50), (BUTTON_WIDTH + 60, BUTTON_HEIGHT), "(V)iew High Scores")
         q_button = Button((1260, 50), (BUTTON_WIDTH, BUTTON_HEIGHT), "(Q)uit")
 
-        pygame.display.flip()
+        present()
 
         while True:
-            pos = pygame.mouse.get_pos()
+            pos = mouse_pos()
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -319,42 +408,29 @@ class YahtzeeUI:
             np_button.draw(pos)
             hs_button.draw(pos)
             q_button.draw(pos)
-            pygame.display.flip()
+            present()
 
     def _view_high_scores(self) -> None:
         """
         Display high scores screen
         """
         SCREEN.fill(POOL_TABLE_GREEN)
-        big_font = pygame.font.SysFont("Arial", 54)
+        big_font = layout_font(54)
         text = big_font.render("High Scores", True, BLACK)
         SCREEN.blit(text, (500, 80))
 
         # Draw horizontal lines
-        pygame.draw.line(SCREEN, BLACK, (0, 225), (WIDTH, 225), 10)
-        pygame.draw.line(SCREEN, BLACK, (0, 775), (WIDTH, 775), 5)
+        draw_line(SCREEN, BLACK, (0, 225), (WIDTH, 225), 10)
+        draw_line(SCREEN, BLACK, (0, 775), (WIDTH, 775), 5)
 
-        # Get high scores
-        high_scores = self.game.get_sorted_high_scores()
+        # Draw the high score rows
         x, y = 500, 350
+        for i, (name, opponent, score) in enumerate(self._high_score_rows()):
+            SCREEN.blit(name, (x, y + (i * 30)))
+            SCREEN.blit(opponent, (x + 300, y + (i * 30)))
+            SCREEN.blit(score, (x + 600, y + (i * 30)))
 
-        for i, (score, name, opponent) in enumerate(high_scores):
-            # Name
-            t = f"{i + 1}. {name}"
-            text = FONT.render(t, True, WHITE)
-            SCREEN.blit(text, (x, y + (i * 30)))
-
-            # Opponent
-            t = f"vs. {opponent}"
-            text = FONT.render(t, True, WHITE)
-            SCREEN.blit(text, (x + 300, y + (i * 30)))
-
-            # Score
-            t = f"{score}"
-            text = FONT.render(t, True, WHITE)
-            SCREEN.blit(text, (x + 600, y + (i * 30)))
-
-        pygame.display.flip()
+        present()
 
         # Create navigation buttons
         ng_button = Button((370, 800), (BUTTON_WIDTH, BUTTON_HEIGHT), "(P)lay again")
@@ -362,7 +438,7 @@ class YahtzeeUI:
         q_button = Button((730, 800), (BUTTON_WIDTH, BUTTON_HEIGHT), "(Q)uit")
 
         while True:
-            pos = pygame.mouse.get_pos()
+            pos = mouse_pos()
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -388,9 +464,50 @@ class YahtzeeUI:
             ng_button.draw(pos)
             np_button.draw(pos)
             q_button.draw(pos)
-            pygame.display.flip()
+            present()
+
+    def _high_score_rows(self) -> List[Tuple[Text, Text, Text]]:
+        """
+        Returns the rendered (name, opponent, score) text of each high score,
+        re-rendering only when the high scores have changed
+        """
+        high_scores = self.game.get_sorted_high_scores()
+        if high_scores is not self._hs_source:
+            self._hs_source = high_scores
+            self._hs_rows = [
+                (FONT.render(f"{i + 1}. {name}", True, WHITE),
+                 FONT.render(f"vs. {opponent}", True, WHITE),
+                 FONT.render(f"{score}", True, WHITE))
+                for i, (score, name, opponent) in enumerate(high_scores)
+            ]
+        return self._hs_rows
+
+    def _ask_resume(self, snapshot: dict) -> bool:
+        """
+        Ask whether to resume a saved game
+        """
+        players = " vs. ".join(snapshot['players'])
+        lines = [f"Resume your unfinished game? {players}, round {snapshot['round'] + 1}",
+                 "(Y)es, resume  /  (N)o, start a new game"]
+
+        while True:
+            SCREEN.fill(POOL_TABLE_GREEN)
+            for i, line in enumerate(lines):
+                SCREEN.blit(FONT.render(line, True, WHITE), (50, 50 + i * 50))
+            present()
 
-    def _get_players(self) -> Tuple[str, str]:
+            event = pygame.event.wait()
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_y:
+                    return True
+                if event.key == pygame.K_n:
+                    clear_snapshot()
+                    return False
+
+    def _get_players(self) -> List[str]:
         """
         Get player names and types
         """
@@ -398,7 +515,7 @@ class YahtzeeUI:
         hs_button = Button((700, 800), (BUTTON_WIDTH + 60, BUTTON_HEIGHT), "(V)iew High Scores")
 
         while game_mode is None:
-            pos = pygame.mouse.get_pos()
+            pos = mouse_pos()
             SCREEN.fill((255, 248, 220))
 
             question = "Select game mode:"
@@ -420,11 +537,21 @@ class YahtzeeUI:
             bot_surface = FONT.render(bot_text, True, BLACK)
             SCREEN.blit(bot_surface, (50, 250))
 
+            # Option 4: Bot vs Bot, at a chosen speed
+            auto_text = "(A)uto - Bot vs Bot, +/- changes speed"
+            auto_surface = FONT.render(auto_text, True, BLACK)
+            SCREEN.blit(auto_surface, (50, 300))
+
+            # Option 5: Any mix of humans and bots
+            multi_text = f"(M)ulti-player - 2 to {MAX_PLAYERS} players, humans or bots"
+            multi_surface = FONT.render(multi_text, True, BLACK)
+            SCREEN.blit(multi_surface, (50, 350))
+
             # Draw the images for visual clarity
             hum_rect = SCREEN.blit(HUMAN_IMAGE, (200, 400))
             bot_rect = SCREEN.blit(BOT_IMAGE, (700, 400))
             hs_button.draw(pos)
-            pygame.display.flip()
+            present()
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -438,11 +565,15 @@ class YahtzeeUI:
                         game_mode = "human"
                     elif event.key == pygame.K_b:
                         game_mode = "bot"
+                    elif event.key == pygame.K_a:
+                        game_mode = "auto"
+                    elif event.key == pygame.K_m:
+                        game_mode = "multi"
                     elif event.key == pygame.K_v:
                         self._view_high_scores()
 
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    pos = pygame.mouse.get_pos()
+                    pos = mouse_pos()
                     if hum_rect.collidepoint(pos):
                         game_mode = "human"
                     elif bot_rect.collidepoint(pos):
@@ -451,18 +582,61 @@ class YahtzeeUI:
                 if hs_button.handle_event(event, pos):
                     self._view_high_scores()
 
+        # Only Bot vs Bot is sped up, and only it takes the speed keys
+        set_time_scale(1.0)
+
         # Get player name(s) based on mode
-        if game_mode == "practice":
+        if game_mode == "auto":
+            set_time_scale(self._get_time_scale(), speed_keys=True)
+            return [f"{BOT_NAME} 1", f"{BOT_NAME} 2"]
+        elif game_mode == "practice":
             pl1_name = self._get_text_input("Enter Your Name:")
             pl2_name = ""  # No second player in practice mode
         elif game_mode == "human":
             pl1_name = self._get_text_input("Enter Player One's Name:")
             pl2_name = self._get_text_input("Enter Player Two's Name:")
-        else:  # bot mode
+        elif game_mode == "bot":
             pl1_name = self._get_text_input("Enter Your Name:")
-            pl2_name = "Yahtzee Bot"
+            pl2_name = BOT_NAME
+        else:  # multi-player mode
+            return self._get_multi_players()
+
+        return [pl1_name, pl2_name]
 
-        return pl1_name, pl2_name
+    def _get_multi_players(self) -> List[str]:
+        """
+        Get the number of players, then each player's name. A blank name makes that player a bot.
+        """
+        count = 0
+        while not 2 <= count <= MAX_PLAYERS:
+            answer = self._get_text_input(f"How many players? (2-{MAX_PLAYERS})")
+            count = int(answer) if answer.strip().isdigit() else 0
+
+        names = []
+        bots = 0
+        for i in range(count):
+            name = self._get_text_input(f"Enter Player {i + 1}'s Name (leave blank for a bot):")
+            if not name.strip():
+                bots += 1
+                name = f"{BOT_NAME} {bots}"
+            names.append(name)
+        return names
+
+    def _get_time_scale(self) -> float:
+        """
+        Ask how fast a Bot vs Bot game should run
+        """
+        labels = ", ".join(f"{scale:g}" for scale in TIME_SCALES[:-1])
+        while True:
+            answer = self._get_text_input(f"Speed-up? ({labels}, or 0 for uncapped)").strip()
+            try:
+                scale = float(answer) if answer else 1.0
+            except ValueError:
+                continue
+            if scale == 0:
+                return TIME_SCALES[-1]
+            if scale in TIME_SCALES:
+                return scale
 
     def _get_text_input(self, prompt: str) -> str:
         """
@@ -477,7 +651,7 @@ class YahtzeeUI:
             input_surface = FONT.render(input_text, True, WHITE)
             SCREEN.blit(prompt_surface, (50, 50))
             SCREEN.blit(input_surface, (50, 100))
-            pygame.display.flip()
+            present()
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -498,32 +672,49 @@ class YahtzeeUI:
         """
         Main game loop
         """
+        # Turns played since the screen was last drawn, and the seats that played them
+        undrawn = 0
+        stale: List[int] = []
+        first_round = True
+
         while True:
             if self.game.is_game_over():
                 self._game_over()
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    sys.exit()
-
-            # Draw the main game screen
-            self._draw_screen()
-
-            # Player 1's turn (human)
-            if self.game.player1_scorecard and self.pl1_card_ui:
-                self.human_turn(self.game.player1_scorecard, self.pl1_card_ui)
+            pump_events()
 
-            # Redraw and pause
-            self._draw_screen()
-
-            # Only do player 2's turn if not in practice mode
-            if self.pl2_name:  # Practice mode has empty pl2_name
-                pause(1500)
-                self._pl2_turn()
+            # Draw the main game screen, which fast-forwarding only does at the start
+            if not fast_forward() or first_round:
                 self._draw_screen()
+            first_round = False
+
+            # Each player takes a turn, humans and bots alike, from whoever is
+            # up (a resumed game can start mid-round); ending the last turn
+            # starts the next round
+            while True:
+                seat = self.game.current_player
+                if seat > 0:
+                    pause(1500)
+                INSTRUMENTS.profile_turn(self.game.player_names[seat], self._player_turn, seat)
+                self.game.end_turn()
+
+                # Only the cards of players who took a turn have changed; fast-forwarding draws every few turns
+                undrawn += 1
+                if seat not in stale:
+                    stale.append(seat)
+                if undrawn >= turns_per_frame():
+                    self._draw_cards(stale)
+                    undrawn = 0
+                    stale = []
+                    # Save whenever the cards are drawn: after every scored category, so a crash or
+                    # closed window loses at most a turn, or every few turns when fast-forwarding
+                    save_snapshot(self.game, time_scale=adjustable_time_scale())
+
+                if self.game.current_player == 0:
+                    break
 
-            # Next round
-            self.game.next_round()
+            # Write out instrumentation counters if they're due
+            INSTRUMENTS.tick()
 
             # Limit FPS
             self.clock.tick(60)
@@ -0,0 +1,269 @@
+"""
+Weighted heuristic bot, and an evolution strategy that tunes its weights.
+
+The heuristic generalises the greedy bot, which holds its biggest group and
+takes the highest score. This bot rates every keep open to it by a weighted
+sum of features:
+- the size of the biggest group and the number of dice kept, which together
+  give the greedy bot's holds
+- for each open category, the expected score of chasing that category alone
+  from the keep, with a weight per category (or group of categories)
+- extra weight on upper categories while the upper bonus is still to play for
+
+The single-category expectations are solved once at import, 26 small tables
+over the 462 keeps. A decision is a few dozen dot products, so it takes
+microseconds. The category chosen is the one with the best raw score,
+adjusted for upper bonus pursuit and for each category's usual score.
+
+`python -m lib.heuristic tune` searches for the weights with a separable
+evolution strategy. Each generation draws candidates around the current mean
+with per-weight step sizes. Every candidate plays the same fresh block of
+seeds (common random numbers) over a process pool, and the best quarter sets
+the next mean and spread. Tuned weights go in TUNED_WEIGHTS, or in a JSON
+file named by YAHTZEE_HEURISTIC_WEIGHTS.
+"""
+import argparse
+import json
+import math
+import os
+import time
+from random import Random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .dice_logic import DiceLogic
+from .outcomes import CATEGORIES, KEEPS, OUTCOME_INDEX, OUTCOME_KEEPS, SCORE_TABLE, holds_for_keep
+from .scorecard_logic import ScorecardLogic
+from .strategy import CATEGORY_BASELINES, JOKER_SCORES, GreedyStrategy, register_strategy, solve_turn
+
+# Weights of the keep features, then of the category adjustments
+WEIGHT_NAMES = ['kind', 'kept', 'upper', 'bonus', 'three_kind', 'four_kind', 'full_house',
+                'small_straight', 'large_straight', 'yahtzee', 'chance', 'bonus_score', 'baseline']
+# The weight each category's chase potential takes
+CATEGORY_WEIGHTS = ['upper'] * 6 + ['three_kind', 'four_kind', 'full_house', 'small_straight',
+                                    'large_straight', 'yahtzee', 'chance']
+# The greedy bot: hold the biggest group, take the highest score. The tuner starts here.
+GREEDY_WEIGHTS = {name: 0.0 for name in WEIGHT_NAMES}
+GREEDY_WEIGHTS.update(kind=1.0, kept=-0.01)
+# Found with `python -m lib.heuristic tune --generations 25 --population 16 --games 200`
+TUNED_WEIGHTS = {
+    'kind': 2.6744,
+    'kept': -1.8227,
+    'upper': 2.3685,
+    'bonus': -1.8675,
+    'three_kind': 0.1806,
+    'four_kind': 1.3671,
+    'full_house': 1.169,
+    'small_straight': 0.7116,
+    'large_straight': 1.1584,
+    'yahtzee': 1.1849,
+    'chance': 0.7494,
+    'bonus_score': 1.4323,
+    'baseline': 0.6539,
+}
+
+
+def _potentials() -> Tuple[List[Tuple[float, ...]], List[Tuple[float, ...]]]:
+    """
+    For one and for two rolls left, the expected score of chasing each
+    category alone from every keep: POTENTIALS[rolls - 1][keep][category]
+    """
+    scores = [[float(score) for score in row] for row in SCORE_TABLE]
+    one_left, two_left = zip(*(solve_turn(scores, 1 << c) for c in range(len(CATEGORIES))))
+    return list(zip(*one_left)), list(zip(*two_left))
+
+
+POTENTIALS = _potentials()
+# Size of the biggest group, and number of dice, of each keep
+KEEP_KIND = [max((keep.count(face) for face in keep), default=0) for keep in KEEPS]
+KEEP_SIZE = [len(keep) for keep in KEEPS]
+
+
+def load_weights(path: Optional[str] = None) -> Dict[str, float]:
+    """
+    Weights from a JSON file (YAHTZEE_HEURISTIC_WEIGHTS by default), or TUNED_WEIGHTS if there is none
+    """
+    path = path or os.environ.get("YAHTZEE_HEURISTIC_WEIGHTS")
+    if not path:
+        return dict(TUNED_WEIGHTS)
+    with open(path, 'r', encoding='utf-8') as f:
+        weights = json.load(f)
+    return {name: float(weights.get(name, TUNED_WEIGHTS[name])) for name in WEIGHT_NAMES}
+
+
+@register_strategy("heuristic")
+class HeuristicStrategy:
+    """
+    Rates keeps and categories with a handful of tunable weights. Rules
+    variants are played like the greedy bot.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.set_weights(weights or load_weights())
+        self._greedy = GreedyStrategy()
+
+    def set_weights(self, weights: Dict[str, float]) -> None:
+        """
+        Switches to new weights (the tuner does this in its workers)
+        """
+        self.weights = {name: float(weights[name]) for name in WEIGHT_NAMES}
+
+    def category_weights(self, scorecard: ScorecardLogic) -> List[Tuple[int, float]]:
+        """
+        The (category index, weight) of each category whose chase potential counts on this scorecard
+        """
+        w = self.weights
+        chase_bonus = not scorecard.has_upper_bonus
+        result = []
+        for i, category in enumerate(CATEGORIES):
+            score = scorecard.scores[category]
+            # A scored Yahtzee can still earn bonus Yahtzees
+            if score is None or (category == 'Yahtzee' and score):
+                weight = w[CATEGORY_WEIGHTS[i]]
+                if i < 6 and chase_bonus:
+                    weight += w['bonus']
+                if weight:
+                    result.append((i, weight))
+        return result
+
+    def choose_holds(self, dice: DiceLogic, scorecard: ScorecardLogic) -> List[bool]:
+        """
+        Holds the keep with the best weighted value
+        """
+        if getattr(scorecard, 'rules', None) is not None:
+            return self._greedy.choose_holds(dice, scorecard)
+        potentials = POTENTIALS[0 if dice.rolls_left <= 1 else 1]
+        weights = self.category_weights(scorecard)
+        w_kind, w_kept = self.weights['kind'], self.weights['kept']
+
+        best_keep, best_value = 0, float('-inf')
+        for k in OUTCOME_KEEPS[OUTCOME_INDEX[tuple(sorted(dice.rolled))]]:
+            row = potentials[k]
+            value = w_kind * KEEP_KIND[k] + w_kept * KEEP_SIZE[k] + sum(w * row[i] for i, w in weights)
+            if value > best_value:
+                best_keep, best_value = k, value
+        return holds_for_keep(dice.rolled, KEEPS[best_keep])
+
+    def choose_category(self, dice: DiceLogic, scorecard: ScorecardLogic) -> str:
+        """
+        Picks the open category with the best score, adjusted for upper bonus pursuit and usual scores
+        """
+        if getattr(scorecard, 'rules', None) is not None:
+            return self._greedy.choose_category(dice, scorecard)
+        w_bonus, w_baseline = self.weights['bonus_score'], self.weights['baseline']
+        row = SCORE_TABLE[OUTCOME_INDEX[tuple(sorted(dice.rolled))]]
+        joker = len(set(dice.rolled)) == 1 and bool(scorecard.scores['Yahtzee'])
+        chase_bonus = not scorecard.has_upper_bonus
+
+        best_category = ""
+        best_value = float('-inf')
+        for i, category in enumerate(CATEGORIES):
+            if scorecard.scores[category] is not None:
+                continue
+            score = row[i]
+            if joker and category in JOKER_SCORES:
+                score = JOKER_SCORES[category]
+            value = score - w_baseline * CATEGORY_BASELINES[i]
+            if i < 6 and chase_bonus:
+                value += w_bonus * (score - 3 * (i + 1))
+            if value > best_value:
+                best_value = value
+                best_category = category
+        return best_category
+
+
+def evaluate(weights: Dict[str, float], seeds: Sequence[int]) -> float:
+    """
+    Mean solitaire score of the heuristic with <weights> over <seeds>, in this process
+    """
+    from .strategy import get_strategy
+    from .tournament import play_game
+
+    get_strategy("heuristic").strategy.set_weights(weights)
+    return sum(play_game(["heuristic"], seed)[0] for seed in seeds) / len(seeds)
+
+
+def tune(generations: int = 30, population: int = 16, games: int = 300, seed: int = 0,
+         workers: Optional[int] = None, start: Optional[Dict[str, float]] = None,
+         sigma: float = 1.0) -> Tuple[Dict[str, float], float]:
+    """
+    Separable evolution strategy over the weights. Every candidate in a
+    generation plays the same fresh block of <games> seeds. Returns the best
+    mean weights found, and their score on seeds no generation played.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    rng = Random(seed)
+    mean = [float((start or GREEDY_WEIGHTS)[name]) for name in WEIGHT_NAMES]
+    spread = [sigma] * len(mean)
+    elite = max(2, population // 4)
+    # Recombination weights: log-rank, as in CMA-ES
+    ranks = [math.log(elite + 0.5) - math.log(r + 1) for r in range(elite)]
+    ranks = [r / sum(ranks) for r in ranks]
+    best: Tuple[float, List[float]] = (float('-inf'), mean)
+    # Seed blocks: one per generation, then a held-out block for the final score
+    next_seed = seed * 1_000_000
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for generation in range(generations):
+            seeds = range(next_seed, next_seed + games)
+            next_seed += games
+            # The mean plays too, as the generation's reference
+            candidates = [mean] + [[m + s * rng.gauss(0, 1) for m, s in zip(mean, spread)]
+                                   for _ in range(population - 1)]
+            scores = list(pool.map(evaluate, [dict(zip(WEIGHT_NAMES, c)) for c in candidates],
+                                   [seeds] * len(candidates)))
+            order = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
+            if scores[0] > best[0]:
+                best = (scores[0], mean)
+
+            chosen = [candidates[i] for i in order[:elite]]
+            new_mean = [sum(r * c[j] for r, c in zip(ranks, chosen)) for j in range(len(mean))]
+            spread = [max(0.02, 0.7 * s + 0.3 * (sum(r * (c[j] - mean[j]) ** 2 for r, c in zip(ranks, chosen))
+                                                  ** 0.5))
+                      for j, s in enumerate(spread)]
+            mean = new_mean
+            print(f"generation {generation + 1:>3}: mean weights score {scores[0]:6.1f}, "
+                  f"best candidate {scores[order[0]]:6.1f}, step {sum(spread) / len(spread):.3f}")
+
+        held_out = range(next_seed, next_seed + 4 * games)
+        final = [best[1], mean]
+        results = list(pool.map(evaluate, [dict(zip(WEIGHT_NAMES, c)) for c in final], [held_out] * 2))
+    choice = max(range(2), key=lambda i: results[i])
+    return {name: round(w, 4) for name, w in zip(WEIGHT_NAMES, final[choice])}, results[choice]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Tune or score the heuristic bot's weights")
+    parser.add_argument('command', choices=['tune', 'score'])
+    parser.add_argument('--generations', type=int, default=30)
+    parser.add_argument('--population', type=int, default=16)
+    parser.add_argument('--games', type=int, default=300, help="games per candidate per generation")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--weights', default=None, help="JSON weights to start from or to score")
+    parser.add_argument('--out', default=None, help="write the tuned weights to this JSON file")
+    args = parser.parse_args(argv)
+
+    weights = load_weights(args.weights)
+    if args.command == 'score':
+        start = time.perf_counter()
+        mean = evaluate(weights, range(args.seed, args.seed + args.games))
+        elapsed = time.perf_counter() - start
+        print(f"heuristic mean {mean:.2f} over {args.games} games ({elapsed / args.games * 1000:.2f} ms/game)")
+        return
+
+    start = time.perf_counter()
+    tuned, score = tune(args.generations, args.population, args.games, args.seed, args.workers,
+                        weights if args.weights else None)
+    print(f"tuned in {time.perf_counter() - start:.0f}s; held-out mean {score:.2f}")
+    print(json.dumps(tuned, indent=2))
+    if args.out:
+        from .score_writer import atomic_write_text
+        atomic_write_text(args.out, json.dumps(tuned, indent=2))
+
+
+if __name__ == "__main__":
+    main()
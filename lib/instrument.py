@@ -0,0 +1,199 @@
+"""
+Opt-in timing instrumentation and profiling hooks for the game loop.
+
+Set YAHTZEE_INSTRUMENT=1 to record timings (or press 'D' in game to show
+the debug HUD, which also turns recording on). YAHTZEE_INSTRUMENT_FILE names
+a file that summaries are appended to periodically, and YAHTZEE_PROFILE_DIR
+a directory that gets one cProfile stats file per turn.
+"""
+import cProfile
+import json
+import os
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Optional
+
+
+class RingBuffer:
+    """
+    Fixed-size buffer of the most recent float samples
+    """
+
+    def __init__(self, size: int = 512):
+        self.size = size
+        self.samples = array('d', bytes(8 * size))
+        self.count = 0
+
+    def append(self, value: float) -> None:
+        """
+        Adds a sample, overwriting the oldest once the buffer is full
+        """
+        self.samples[self.count % self.size] = value
+        self.count += 1
+
+    def values(self) -> List[float]:
+        """
+        Returns the buffered samples (in no particular order)
+        """
+        return list(self.samples[:min(self.count, self.size)])
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns count, mean, median, 95th percentile and max of the buffered samples
+        """
+        values = sorted(self.values())
+        if not values:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean': sum(values) / len(values),
+            'p50': values[len(values) // 2],
+            'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+            'max': values[-1],
+        }
+
+
+class _Timer:
+    """
+    Context manager which records its elapsed time in milliseconds
+    """
+
+    __slots__ = ('instruments', 'name', 'start')
+
+    def __init__(self, instruments: 'Instrumentation', name: str):
+        self.instruments = instruments
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.instruments.record(self.name, (time.perf_counter() - self.start) * 1000)
+
+
+class _NullTimer:
+    """
+    Context manager used while instrumentation is off
+    """
+
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Instrumentation:
+    """
+    Named timing counters, a dump schedule and a per-turn profiling hook
+    """
+
+    def __init__(self, enabled: bool = False, dump_file: Optional[str] = None,
+                 dump_interval: float = 30.0, profile_dir: Optional[str] = None):
+        self.enabled = enabled
+        # Whether the on-screen debug HUD is showing
+        self.hud = False
+        self.dump_file = dump_file
+        self.dump_interval = dump_interval
+        self.profile_dir = profile_dir
+        self.buffers: Dict[str, RingBuffer] = {}
+        self._last_dump = time.monotonic()
+        self._profiled_turns = 0
+
+    def record(self, name: str, ms: float) -> None:
+        """
+        Records a timing sample in milliseconds
+        """
+        if not self.enabled:
+            return
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            buffer = self.buffers[name] = RingBuffer()
+        buffer.append(ms)
+
+    def timer(self, name: str):
+        """
+        Returns a context manager which times its body under <name>
+        """
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def toggle_hud(self) -> None:
+        """
+        Shows or hides the debug HUD. Showing it starts recording.
+        """
+        self.hud = not self.hud
+        if self.hud:
+            self.enabled = True
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns summary statistics for every counter
+        """
+        return {name: buffer.summary() for name, buffer in sorted(self.buffers.items())}
+
+    def hud_lines(self) -> List[str]:
+        """
+        Returns one line of text per counter for the debug HUD
+        """
+        lines = []
+        for name, stats in self.summary().items():
+            if stats['count']:
+                lines.append(f"{name}: {stats['mean']:.1f} avg  {stats['p95']:.1f} p95  "
+                             f"{stats['max']:.1f} max  (n={stats['count']})")
+        return lines
+
+    def dump(self, path: Optional[str] = None) -> None:
+        """
+        Appends a timestamped summary of every counter to a JSON lines file
+        """
+        path = path or self.dump_file
+        if not path:
+            return
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'time': time.time(), 'counters': self.summary()}) + "\n")
+        except IOError as e:
+            print(f"Could not write instrumentation dump: {e}")
+
+    def tick(self) -> None:
+        """
+        Dumps the counters if the dump interval has passed; call from the game loop
+        """
+        if not self.enabled or not self.dump_file:
+            return
+        now = time.monotonic()
+        if now - self._last_dump >= self.dump_interval:
+            self._last_dump = now
+            self.dump()
+
+    def profile_turn(self, label: str, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Calls func(*args), under cProfile if a profile directory is set,
+        writing the stats to <profile_dir>/turn-<n>-<label>.prof
+        """
+        if not self.profile_dir:
+            return func(*args)
+
+        self._profiled_turns += 1
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args)
+        finally:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            safe_label = "".join(c if c.isalnum() else "_" for c in label)
+            profiler.dump_stats(os.path.join(self.profile_dir,
+                                             f"turn-{self._profiled_turns:04d}-{safe_label}.prof"))
+
+
+# Shared instrumentation, configured from the environment
+INSTRUMENTS = Instrumentation(
+    enabled=os.environ.get("YAHTZEE_INSTRUMENT", "") not in ("", "0"),
+    dump_file=os.environ.get("YAHTZEE_INSTRUMENT_FILE") or None,
+    dump_interval=float(os.environ.get("YAHTZEE_INSTRUMENT_INTERVAL", "30")),
+    profile_dir=os.environ.get("YAHTZEE_PROFILE_DIR") or None,
+)
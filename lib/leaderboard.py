@@ -0,0 +1,61 @@
+"""
+Bounded top-K leaderboard, so the high score list never grows past its size.
+"""
+import heapq
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+HighScore = Tuple[int, str, str]
+
+
+class TopScores:
+    """
+    Keeps the best <limit> (score, name, opponent) entries in a min-heap.
+
+    Adding an entry is O(log K) and the ordered view is cached until the
+    next change, so memory and read cost stay constant however many games
+    are played.
+    """
+
+    def __init__(self, limit: int = 10, scores: Iterable[HighScore] = ()):
+        self.limit = limit
+        # Min-heap: the weakest entry that made the board is always at [0]
+        self._heap: List[HighScore] = []
+        self._sorted: Optional[List[HighScore]] = None
+        # Bumped on every change, so callers can cache anything derived from the board
+        self.version = 0
+        self.extend(scores)
+
+    def add(self, entry: HighScore) -> bool:
+        """
+        Adds an entry if it makes the board. Returns True if the board changed.
+        """
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+        else:
+            return False
+        self._sorted = None
+        self.version += 1
+        return True
+
+    def extend(self, entries: Iterable[HighScore]) -> None:
+        """
+        Adds several entries
+        """
+        for entry in entries:
+            self.add(entry)
+
+    def sorted(self) -> List[HighScore]:
+        """
+        Returns the entries best first
+        """
+        if self._sorted is None:
+            self._sorted = sorted(self._heap, reverse=True)
+        return self._sorted
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __iter__(self) -> Iterator[HighScore]:
+        return iter(self.sorted())
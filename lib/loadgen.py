@@ -0,0 +1,164 @@
+"""
+Load generator for the table server: many concurrent clients, each playing
+whole games, with latency percentiles reported per move.
+
+Run with e.g. `python -m lib.loadgen --clients 200 --games 2` to test
+against a server started in-process, or add `--port 7777` / `--unix PATH`
+to load an already running server.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional, Sequence
+
+from .server import ENCODING, GameServer
+from .outcomes import CATEGORY_INDEX, OUTCOME_INDEX, SCORE_TABLE
+
+# Moves reported on, in order
+MOVES = ['NEW', 'ROLL', 'HOLD', 'SCORE']
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """
+    Returns the <pct> percentile of an ascending list of samples (nearest rank)
+    """
+    if not samples:
+        return 0.0
+    rank = max(1, min(len(samples), round(pct / 100 * len(samples) + 0.5)))
+    return samples[rank - 1]
+
+
+class LoadClient:
+    """
+    One connection playing games at a table of its own
+    """
+
+    def __init__(self, latencies: Dict[str, List[float]], rng: random.Random):
+        self.latencies = latencies
+        self.rng = rng
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self, host: str, port: int, unix_path: Optional[str]) -> None:
+        """
+        Opens the connection
+        """
+        if unix_path:
+            self.reader, self.writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    async def request(self, line: str) -> dict:
+        """
+        Sends one request, recording how long the reply took
+        """
+        start = time.perf_counter()
+        self.writer.write((line + "\n").encode(ENCODING))
+        reply = (await self.reader.readline()).decode(ENCODING)
+        self.latencies[line.split(" ", 1)[0]].append((time.perf_counter() - start) * 1000)
+        status, _, body = reply.partition(" ")
+        if status != "OK":
+            raise RuntimeError(f"{line!r} failed: {reply.strip()}")
+        return json.loads(body)
+
+    async def play(self, names: str) -> int:
+        """
+        Plays one game to the end, greedily, and returns the human seat's score
+        """
+        state = await self.request("NEW " + names)
+        while not state['game_over']:
+            state = await self.request("ROLL")
+            while state['rolls_left'] > 0:
+                # Hold a random die or two, as a player clicking around would
+                for die in self.rng.sample(range(5), self.rng.randint(0, 2)):
+                    state = await self.request(f"HOLD {die}")
+                state = await self.request("ROLL")
+            player = state['players'][state['player']]
+            scores = SCORE_TABLE[OUTCOME_INDEX[tuple(sorted(state['dice']))]]
+            category = max((c for c, score in player['scores'].items() if score is None),
+                           key=lambda c: scores[CATEGORY_INDEX[c]])
+            state = await self.request(f"SCORE {category}")
+        await self.request("CLOSE")
+        return state['players'][0]['total']
+
+    async def close(self) -> None:
+        """
+        Says goodbye and closes the connection
+        """
+        self.writer.write(b"QUIT\n")
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def run_load(clients: int, games: int, names: str, host: str = '127.0.0.1',
+                   port: Optional[int] = None, unix_path: Optional[str] = None,
+                   bot_workers: int = 4, seed: int = 0) -> Dict[str, List[float]]:
+    """
+    Runs <clients> concurrent connections that each play <games> games, against
+    the given server or, when no port or Unix socket is given, one started in
+    this process. Returns the sorted latencies (ms) of each move.
+    """
+    server = None
+    if port is None and unix_path is None:
+        server = GameServer(max_tables=clients, bot_workers=bot_workers)
+        await server.start(host, 0)
+        port = server.port
+
+    latencies: Dict[str, List[float]] = {move: [] for move in MOVES + ['CLOSE']}
+
+    async def one_client(n: int) -> None:
+        client = LoadClient(latencies, random.Random(seed + n))
+        await client.connect(host, port, unix_path)
+        try:
+            for _ in range(games):
+                await client.play(names)
+        finally:
+            await client.close()
+
+    try:
+        await asyncio.gather(*(one_client(n) for n in range(clients)))
+    finally:
+        if server:
+            await server.close()
+
+    for samples in latencies.values():
+        samples.sort()
+    return latencies
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Load test the Yahtzee table server")
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--games', type=int, default=1, help="games per client")
+    parser.add_argument('--players', default="Load;Yahtzee Bot",
+                        help="';'-separated names at each table; the first seat is played by the client")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=None, help="load a running server instead of an in-process one")
+    parser.add_argument('--unix', default=None)
+    parser.add_argument('--bot-workers', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    latencies = asyncio.run(run_load(args.clients, args.games, args.players, args.host, args.port,
+                                     args.unix, args.bot_workers, args.seed))
+    elapsed = time.perf_counter() - start
+
+    requests = sum(len(samples) for samples in latencies.values())
+    print(f"{args.clients} clients x {args.games} games in {elapsed:.1f}s, "
+          f"{requests / elapsed:.0f} requests/sec")
+    print(f"{'move':<6} {'count':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for move in MOVES:
+        samples = latencies[move]
+        if samples:
+            print(f"{move:<6} {len(samples):>8} {percentile(samples, 50):>8.2f} {percentile(samples, 90):>8.2f} "
+                  f"{percentile(samples, 99):>8.2f} {samples[-1]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
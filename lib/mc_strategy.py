@@ -0,0 +1,242 @@
+"""
+Anytime Monte Carlo bot: rates each hold and category choice by playing the
+rest of the game out from a copy of the scorecard, many times over, and
+picks the choice with the best average final score.
+
+It needs no precomputed tables, so it plays any rules variant a scorecard
+can describe. Each decision gets a time budget (YAHTZEE_MC_BUDGET_MS, 50 ms
+by default) and returns the best choice found when the budget runs out.
+
+Rollouts are played in rounds. Each round draws all of its dice in one batch,
+and every candidate is played out on that same batch (common random numbers),
+so differences between candidates aren't drowned in dice luck. The weaker
+half of the candidates is dropped after rounds 4, 8, 16 and so on. With
+YAHTZEE_MC_WORKERS > 1 the rounds run on a process pool, one search per
+worker, and the workers' totals are merged.
+"""
+import copy
+import os
+import time
+from random import Random
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .dice_logic import DiceLogic
+from .outcomes import KEEPS, OUTCOME_INDEX, OUTCOME_KEEPS, holds_for_keep
+from .scorecard_logic import ScorecardLogic
+from .strategy import CATEGORY_BASELINES, UPPER_BONUS_WEIGHT, ev_category, register_strategy
+
+# Time budget per decision (ms), and processes to spread rollouts over (1 plays them in-process)
+DEFAULT_BUDGET_MS = float(os.environ.get("YAHTZEE_MC_BUDGET_MS", "50"))
+DEFAULT_WORKERS = int(os.environ.get("YAHTZEE_MC_WORKERS", "1"))
+# Turns a rollout plays after the current one before the rest of the card is estimated (0 plays the whole game)
+DEFAULT_HORIZON = int(os.environ.get("YAHTZEE_MC_HORIZON", "1"))
+# Rounds played before candidates start being dropped
+MIN_ROUNDS = 4
+FACES = (1, 2, 3, 4, 5, 6)
+
+# Scorecard attributes that are wiring rather than game state
+_NOT_STATE = {'events', 'board', 'rules'}
+
+
+def _clone(scorecard: ScorecardLogic) -> ScorecardLogic:
+    """
+    A detached copy of a scorecard to play a rollout on
+    """
+    clone = copy.copy(scorecard)
+    for key, value in vars(scorecard).items():
+        if isinstance(value, (dict, list)):
+            setattr(clone, key, value.copy())
+    clone.events = None
+    clone.board = None
+    return clone
+
+
+def _greedy_keep(dice: Sequence[int]) -> List[int]:
+    """
+    The rollout policy's holds: every die showing the most common (then highest) value
+    """
+    best = max(dice, key=lambda d: (dice.count(d), d))
+    return [d for d in dice if d == best]
+
+
+def _finish_turn(scorecard: ScorecardLogic, dice: List[int], rolls_left: int, faces: Iterator[int]) -> None:
+    """
+    Plays out the rest of a turn with the rollout policy and scores it
+    """
+    while rolls_left > 0:
+        keep = _greedy_keep(dice)
+        if len(keep) == 5:
+            break
+        dice = keep + [next(faces) for _ in range(5 - len(keep))]
+        rolls_left -= 1
+    scorecard.update_score(dice, ev_category(dice, scorecard))
+
+
+def leaf_value(scorecard: ScorecardLogic) -> float:
+    """
+    Estimated final score of a part-filled card: the score so far, each open
+    category's usual score, and credit for being ahead of par on the upper
+    section while the bonus is still to play for
+    """
+    value = float(scorecard.total_score)
+    rules = getattr(scorecard, 'rules', None)
+    for i, category in enumerate(scorecard.get_all_categories()):
+        if scorecard.scores[category] is None:
+            if rules is not None:
+                value += rules.rules[rules.card_base[i]].baseline * rules.multipliers[i]
+            else:
+                value += CATEGORY_BASELINES[i]
+    if not scorecard.has_upper_bonus:
+        value += UPPER_BONUS_WEIGHT * scorecard.plus_minus
+    return value
+
+
+def _play_out(scorecard: ScorecardLogic, turns: int, horizon: int, faces: Iterator[int]) -> float:
+    """
+    Plays up to <horizon> of the <turns> left (all of them if horizon is 0),
+    and returns the final score, or the estimate of it if turns are left over
+    """
+    played = turns if horizon <= 0 else min(turns, horizon)
+    for _ in range(played):
+        _finish_turn(scorecard, [next(faces) for _ in range(5)], 2, faces)
+    return scorecard.final_tally() if played == turns else leaf_value(scorecard)
+
+
+def search(scorecard: ScorecardLogic, dice: Sequence[int], rolls_left: int, candidates: Sequence,
+           seed: Optional[int], budget_s: float, horizon: int = DEFAULT_HORIZON
+           ) -> Tuple[List[float], List[int], List[int]]:
+    """
+    Plays rollouts for each candidate until the budget runs out (always at
+    least one round). Candidates are keeps (tuples of held dice) to re-roll
+    around with <rolls_left>, or category names to score the dice in.
+
+    Returns the summed final scores and rollout counts per candidate, and the
+    indices of the candidates still in the running.
+    """
+    deadline = time.perf_counter() + budget_s
+    rng = Random(seed)
+    # Turns left after this one, and the most dice a rollout can roll
+    turns = sum(score is None for score in scorecard.scores.values()) - 1
+    needed = 5 * rolls_left + 15 * (turns if horizon <= 0 else min(turns, horizon))
+    holds = isinstance(candidates[0], tuple)
+    totals = [0.0] * len(candidates)
+    counts = [0] * len(candidates)
+    alive = list(range(len(candidates)))
+
+    rounds = 0
+    while True:
+        batch = rng.choices(FACES, k=needed)
+        for c in alive:
+            faces = iter(batch)
+            sim = _clone(scorecard)
+            if holds:
+                keep = list(candidates[c])
+                rolled = keep + [next(faces) for _ in range(5 - len(keep))]
+                # Holding all five ends the turn
+                _finish_turn(sim, rolled, rolls_left - 1 if len(keep) < 5 else 0, faces)
+            else:
+                sim.update_score(list(dice), candidates[c])
+            totals[c] += _play_out(sim, turns, horizon, faces)
+            counts[c] += 1
+        rounds += 1
+
+        if len(alive) == 1 or time.perf_counter() >= deadline:
+            break
+        # Successive halving: drop the weaker half at rounds 4, 8, 16, ...
+        if rounds >= MIN_ROUNDS and rounds & (rounds - 1) == 0 and len(alive) > 2:
+            alive.sort(key=lambda i: totals[i] / counts[i], reverse=True)
+            alive = alive[:(len(alive) + 1) // 2]
+    return totals, counts, alive
+
+
+def _pack(scorecard: ScorecardLogic) -> Tuple[Optional[str], Dict]:
+    """
+    A picklable form of a scorecard: its rules variant name and its state
+    """
+    rules = getattr(scorecard, 'rules', None)
+    return (rules.name if rules else None,
+            {key: value for key, value in vars(scorecard).items() if key not in _NOT_STATE})
+
+
+def _unpack(packed: Tuple[Optional[str], Dict]) -> ScorecardLogic:
+    rules_name, state = packed
+    if rules_name:
+        from .rules import VariantScorecard, get_rules
+        scorecard = VariantScorecard(state['player_name'], get_rules(rules_name))
+    else:
+        scorecard = ScorecardLogic(state['player_name'])
+    vars(scorecard).update(state)
+    return scorecard
+
+
+def _worker_search(packed: Tuple[Optional[str], Dict], dice: Sequence[int], rolls_left: int,
+                   candidates: Sequence, seed: int, budget_s: float, horizon: int
+                   ) -> Tuple[List[float], List[int], List[int]]:
+    return search(_unpack(packed), dice, rolls_left, candidates, seed, budget_s, horizon)
+
+
+# Process pool shared by every Monte Carlo bot in this process, by size
+_POOLS: Dict[int, 'ProcessPoolExecutor'] = {}
+
+
+def _pool(workers: int):
+    from concurrent.futures import ProcessPoolExecutor
+
+    if workers not in _POOLS:
+        _POOLS[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _POOLS[workers]
+
+
+@register_strategy("montecarlo")
+class MonteCarloStrategy:
+    """
+    Picks holds and categories by the average score of rollouts of the rest
+    of the game, within a time budget per decision
+    """
+
+    def __init__(self, budget_ms: float = DEFAULT_BUDGET_MS, workers: int = DEFAULT_WORKERS,
+                 horizon: int = DEFAULT_HORIZON, seed: Optional[int] = None):
+        self.budget_s = budget_ms / 1000
+        self.horizon = horizon
+        self.workers = workers
+        self.rng = Random(seed)
+        # Rollouts played for the last decision
+        self.last_rollouts = 0
+
+    def _best(self, scorecard: ScorecardLogic, dice: Sequence[int], rolls_left: int, candidates: Sequence) -> int:
+        """
+        Returns the index of the candidate with the best average rollout
+        """
+        if len(candidates) == 1:
+            return 0
+        if self.workers <= 1:
+            results = [search(scorecard, dice, rolls_left, candidates, self.rng.getrandbits(64), self.budget_s,
+                              self.horizon)]
+        else:
+            # Leave a little of the budget for handing the work out and back
+            packed = _pack(scorecard)
+            futures = [_pool(self.workers).submit(_worker_search, packed, list(dice), rolls_left, candidates,
+                                                  self.rng.getrandbits(64), self.budget_s * 0.8, self.horizon)
+                       for _ in range(self.workers)]
+            results = [future.result() for future in futures]
+
+        totals = [sum(r[0][c] for r in results) for c in range(len(candidates))]
+        counts = [sum(r[1][c] for r in results) for c in range(len(candidates))]
+        self.last_rollouts = sum(counts)
+        alive = set().union(*(r[2] for r in results))
+        return max(alive, key=lambda c: totals[c] / counts[c])
+
+    def choose_holds(self, dice: DiceLogic, scorecard: ScorecardLogic) -> List[bool]:
+        """
+        Holds the dice whose re-rolls play out best
+        """
+        keeps = [KEEPS[k] for k in OUTCOME_KEEPS[OUTCOME_INDEX[tuple(sorted(dice.rolled))]]]
+        best = self._best(scorecard, dice.rolled, dice.rolls_left, keeps)
+        return holds_for_keep(dice.rolled, keeps[best])
+
+    def choose_category(self, dice: DiceLogic, scorecard: ScorecardLogic) -> str:
+        """
+        Scores the open category that plays out best
+        """
+        open_categories = [c for c in scorecard.get_all_categories() if not scorecard.is_category_used(c)]
+        return open_categories[self._best(scorecard, dice.rolled, 0, open_categories)]
@@ -0,0 +1,249 @@
+"""
+Thin client for the table server: a blocking protocol client, and a pygame
+front end that shows a server-hosted table with the regular UI components.
+
+Run with e.g. `python -m lib.net_client --port 7777 "Alice;Yahtzee Bot"`,
+or `--join TABLE` to sit at an existing table.
+"""
+import argparse
+import json
+import socket
+import sys
+from typing import Any, Dict, Optional, Sequence
+
+from .game_logic import YahtzeeGame
+from .server import ENCODING
+
+
+class ServerError(Exception):
+    """
+    The server answered a request with ERR
+    """
+
+
+class GameClient:
+    """
+    Blocking client for the table server's line protocol
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 7777, unix_path: Optional[str] = None):
+        if unix_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(unix_path)
+        else:
+            self.sock = socket.create_connection((host, port))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.file = self.sock.makefile('rwb')
+
+    def request(self, line: str) -> Dict[str, Any]:
+        """
+        Sends one request and returns the decoded reply
+        """
+        self.file.write((line + "\n").encode(ENCODING))
+        self.file.flush()
+        reply = self.file.readline().decode(ENCODING).rstrip("\n")
+        if not reply:
+            raise ConnectionError("Server closed the connection")
+        status, _, body = reply.partition(" ")
+        if status != "OK":
+            raise ServerError(body)
+        return json.loads(body)
+
+    def new_table(self, names: Sequence[str]) -> Dict[str, Any]:
+        """
+        Starts a table and returns its state
+        """
+        return self.request("NEW " + ";".join(names))
+
+    def join(self, table_id: int) -> Dict[str, Any]:
+        """
+        Sits at an existing table and returns its state
+        """
+        return self.request(f"JOIN {table_id}")
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Returns the current table's state
+        """
+        return self.request("STATE")
+
+    def roll(self) -> Dict[str, Any]:
+        """
+        Rolls the dice
+        """
+        return self.request("ROLL")
+
+    def hold(self, die: int) -> Dict[str, Any]:
+        """
+        Toggles holding a die
+        """
+        return self.request(f"HOLD {die}")
+
+    def score(self, category: str) -> Dict[str, Any]:
+        """
+        Scores the dice in a category
+        """
+        return self.request(f"SCORE {category}")
+
+    def close(self) -> None:
+        """
+        Says goodbye and closes the connection
+        """
+        try:
+            self.file.write(b"QUIT\n")
+            self.file.flush()
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def apply_state(game: YahtzeeGame, state: Dict[str, Any]) -> None:
+    """
+    Mirrors a server table state into a local game, so the regular UI components can draw it
+    """
+    players = state['players']
+    names = [player['name'] for player in players]
+    if game.player_names != names:
+        game.setup_new_game(*names, bots=["remote" if player['bot'] else None for player in players])
+
+    for seat, (scorecard, player) in enumerate(zip(game.scorecards, players)):
+        scorecard.scores.update(player['scores'])
+        scorecard.throws.update(player['throws'])
+        scorecard.upper_sub = player['upper_sub']
+        scorecard.lower_sub = player['lower_sub']
+        scorecard.plus_minus = player['plus_minus']
+        scorecard.total_score = player['total']
+        # Rankings and the winner are read from the scoreboard
+        game.board.set_row(seat, player['scores'], player['total'])
+
+    game.current_round = state['round']
+    game.current_player = state['player']
+    dice = game.active_dice
+    dice.rolled = list(state['dice'])
+    dice.held = list(state['held'])
+    dice.rolls_left = state['rolls_left']
+
+
+class RemoteGameUI:
+    """
+    Plays a server-hosted table in a pygame window. Every human seat is played from this window.
+    """
+
+    def __init__(self, client: GameClient, state: Dict[str, Any]):
+        # pygame opens the window on import, so only import the UI here
+        from .dice_ui import DiceUI
+        from .scorecard_ui import layout_cards
+
+        self.client = client
+        self.table_id = state['table']
+        self.game = YahtzeeGame(load_high_scores=False)
+        apply_state(self.game, state)
+        self.game_over = state['game_over']
+        self.dice_ui = DiceUI(self.game.active_dice)
+        self.card_uis = layout_cards(self.game.scorecards)
+        self.message = ""
+
+    def _send(self, func, *args) -> None:
+        """
+        Sends a request and mirrors the resulting state
+        """
+        try:
+            state = func(*args)
+        except ServerError as e:
+            self.message = str(e)
+            return
+        self.message = ""
+        apply_state(self.game, state)
+        self.game_over = state['game_over']
+
+    def status_text(self) -> str:
+        """
+        The line above the dice: whose turn it is, or who won
+        """
+        dice = self.game.active_dice
+        name = self.game.player_names[self.game.current_player]
+        if self.game_over:
+            winner, score, _ = self.game.get_winner()
+            return f"Game over: {winner} wins with {score}. Press Q to quit."
+        if dice.rolls_left > 0:
+            return f"Table {self.table_id}: {name}'s turn. {dice.rolls_left} rolls left"
+        return f"No more rolls, {name}. Pick a scoring category..."
+
+    def _draw(self, roll_button) -> None:
+        """
+        Draws the whole table
+        """
+        import pygame
+        from .ui_common import SCREEN, POOL_TABLE_GREEN, FONT, WHITE, mouse_pos, present
+
+        SCREEN.fill(POOL_TABLE_GREEN)
+        for card_ui in self.card_uis:
+            card_ui.draw()
+        self.dice_ui.draw()
+
+        if not self.game_over and self.game.active_dice.rolls_left > 0:
+            roll_button.draw(mouse_pos())
+        SCREEN.blit(FONT.render(self.status_text(), True, WHITE), (50, 50))
+        if self.message:
+            SCREEN.blit(FONT.render(self.message, True, WHITE), (50, 180))
+        present()
+
+    def run(self) -> None:
+        """
+        Event loop: roll, hold and score by talking to the server
+        """
+        import pygame
+        from .button import Button
+        from .ui_common import BUTTON_WIDTH, BUTTON_HEIGHT, mouse_pos
+
+        roll_button = Button((370, 100), (BUTTON_WIDTH, BUTTON_HEIGHT), "ROLL")
+        while True:
+            self._draw(roll_button)
+            event = pygame.event.wait()
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_q):
+                self.client.close()
+                sys.exit()
+            if self.game_over:
+                continue
+
+            pos = mouse_pos()
+            if roll_button.handle_event(event, pos) or (
+                    event.type == pygame.KEYDOWN and event.key == pygame.K_r):
+                self._send(self.client.roll)
+                continue
+
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                die_index = self.dice_ui.get_die_at_pos(pos)
+                if die_index >= 0:
+                    self._send(self.client.hold, die_index)
+                    continue
+                card_ui = self.card_uis[self.game.current_player]
+                for category in self.game.scorecards[self.game.current_player].get_all_categories():
+                    if card_ui.is_category_clicked(pos, category):
+                        self._send(self.client.score, category)
+                        break
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Play at a Yahtzee table server")
+    parser.add_argument('players', nargs='?', default="Player;Yahtzee Bot",
+                        help="';'-separated player names for a new table")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    parser.add_argument('--unix', default=None)
+    parser.add_argument('--join', type=int, default=None, help="sit at an existing table")
+    args = parser.parse_args(argv)
+
+    client = GameClient(args.host, args.port, args.unix)
+    if args.join is not None:
+        state = client.join(args.join)
+    else:
+        state = client.new_table(args.players.split(";"))
+    RemoteGameUI(client, state).run()
+
+
+if __name__ == "__main__":
+    main()
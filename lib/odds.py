@@ -0,0 +1,99 @@
+"""
+Exact odds of making each category from the dice on the table.
+
+"Making" a category means meeting its condition: three or more of the face
+for an upper category (par for the bonus), a non-zero score for the lower
+categories, and always for Chance. Odds assume the current holds are used for
+the next roll and every later roll is held to give that category its best
+chance.
+
+The odds come from a Markov chain over the 252 sorted outcomes: with k rolls
+left, an outcome's chance is the best over its keeps of the keep's transition
+row times the chances with k - 1 rolls left. Tables are built once per
+category, on first use, and queries are memoized.
+"""
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .dice_logic import DiceLogic
+from .outcomes import (
+    CATEGORIES, CATEGORY_INDEX, KEEP_INDEX, KEEP_TRANSITIONS, KEEPS, OUTCOME_INDEX, OUTCOME_KEEPS,
+    OUTCOMES, SCORE_TABLE, Dice,
+)
+
+# Most rolls a turn can have left
+MAX_ROLLS = 3
+
+
+def _made(category: str) -> List[float]:
+    """
+    1.0 for each outcome that makes <category>, else 0.0
+    """
+    c = CATEGORY_INDEX[category]
+    if c < 6:
+        return [1.0 if dice.count(c + 1) >= 3 else 0.0 for dice in OUTCOMES]
+    return [1.0 if scores[c] > 0 else 0.0 for scores in SCORE_TABLE]
+
+
+@lru_cache(maxsize=None)
+def keep_tables(category: str) -> Tuple[array, ...]:
+    """
+    Returns (made, keep_1, keep_2, keep_3). made[o] is 1.0 if outcome o makes
+    <category>; keep_k[i] is the chance of making it when rolling around keep i
+    with k rolls left, holding optimally afterwards.
+    """
+    made = array('d', _made(category))
+    tables = [made]
+    chances = made
+    for _ in range(MAX_ROLLS):
+        # One step of the chain: each keep's transition row times the chances one roll later
+        keep_chances = array('d', [sum(p * chances[i] for i, p in zip(indices, probs))
+                                   for indices, probs in KEEP_TRANSITIONS])
+        tables.append(keep_chances)
+        # Best keep from each outcome (keeping all five dice is always an option)
+        chances = array('d', [max(keep_chances[k] for k in keeps) for keeps in OUTCOME_KEEPS])
+    return tuple(tables)
+
+
+@lru_cache(maxsize=65536)
+def _odds(outcome: Optional[Dice], keep: Dice, rolls_left: int) -> Tuple[float, ...]:
+    """
+    Chances of every category, in CATEGORIES order
+    """
+    if rolls_left <= 0:
+        o = OUTCOME_INDEX[outcome]
+        return tuple(keep_tables(category)[0][o] for category in CATEGORIES)
+    k = KEEP_INDEX[keep]
+    return tuple(keep_tables(category)[rolls_left][k] for category in CATEGORIES)
+
+
+def category_odds(rolled: Sequence[int], held: Sequence[bool], rolls_left: int) -> Dict[str, float]:
+    """
+    Returns the exact chance of making each category, given the dice on the
+    table, which of them are held and the rolls left. Before the first roll
+    pass no dice.
+    """
+    if not rolled:
+        return dict(zip(CATEGORIES, _odds(None, (), min(rolls_left, MAX_ROLLS))))
+    keep = tuple(sorted(die for die, hold in zip(rolled, held) if hold))
+    return dict(zip(CATEGORIES, _odds(tuple(sorted(rolled)), keep, min(rolls_left, MAX_ROLLS))))
+
+
+def dice_odds(dice: DiceLogic) -> Dict[str, float]:
+    """
+    category_odds() for the state of a DiceLogic
+    """
+    return category_odds(dice.rolled, dice.held, dice.rolls_left)
+
+
+def best_keep(rolled: Sequence[int], rolls_left: int, category: str) -> Dice:
+    """
+    Returns the dice to hold to give <category> its best chance
+    """
+    if not rolled or rolls_left <= 0:
+        return tuple(sorted(rolled))
+    table = keep_tables(category)[min(rolls_left, MAX_ROLLS)]
+    keeps = OUTCOME_KEEPS[OUTCOME_INDEX[tuple(sorted(rolled))]]
+    # Ties go to holding more dice
+    return KEEPS[max(keeps, key=lambda k: (table[k], len(KEEPS[k])))]
@@ -0,0 +1,98 @@
+"""
+Precomputed tables over the 252 distinct outcomes of rolling five dice.
+
+Outcomes and 'keeps' (the dice held back before a re-roll) are sorted
+tuples, so order on the table doesn't matter. Everything here is built
+once at import and shared by the strategies.
+"""
+from itertools import combinations_with_replacement, product
+from math import factorial
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from .scorecard_logic import ScorecardLogic
+
+Dice = Tuple[int, ...]
+
+# All 252 sorted five-dice outcomes
+OUTCOMES: List[Dice] = list(combinations_with_replacement(range(1, 7), 5))
+OUTCOME_INDEX: Dict[Dice, int] = {dice: i for i, dice in enumerate(OUTCOMES)}
+
+# All 462 sorted sub-multisets of 0 to 5 dice that can be held
+KEEPS: List[Dice] = [keep for n in range(6) for keep in combinations_with_replacement(range(1, 7), n)]
+KEEP_INDEX: Dict[Dice, int] = {keep: i for i, keep in enumerate(KEEPS)}
+
+
+def roll_distribution(n: int) -> List[Tuple[Dice, float]]:
+    """
+    Returns every sorted outcome of rolling <n> dice with its probability
+    """
+    distribution = []
+    for dice in combinations_with_replacement(range(1, 7), n):
+        ways = factorial(n)
+        for face in set(dice):
+            ways //= factorial(dice.count(face))
+        distribution.append((dice, ways / 6 ** n))
+    return distribution
+
+
+def _keep_transitions() -> List[Tuple[List[int], List[float]]]:
+    """
+    For each keep, the outcome indices reachable by re-rolling the rest, and their probabilities
+    """
+    distributions = {n: roll_distribution(n) for n in range(6)}
+    transitions = []
+    for keep in KEEPS:
+        indices, probs = [], []
+        for dice, p in distributions[5 - len(keep)]:
+            indices.append(OUTCOME_INDEX[tuple(sorted(keep + dice))])
+            probs.append(p)
+        transitions.append((indices, probs))
+    return transitions
+
+
+def _outcome_keeps() -> List[List[int]]:
+    """
+    For each outcome, the indices of the distinct keeps it allows
+    """
+    result = []
+    for dice in OUTCOMES:
+        keeps = {tuple(d for d, held in zip(dice, mask) if held)
+                 for mask in product((False, True), repeat=5)}
+        result.append(sorted(KEEP_INDEX[keep] for keep in keeps))
+    return result
+
+
+# KEEP_TRANSITIONS[k] = (outcome indices, probabilities) after re-rolling around keep k
+KEEP_TRANSITIONS = _keep_transitions()
+# OUTCOME_KEEPS[o] = keep indices available from outcome o
+OUTCOME_KEEPS = _outcome_keeps()
+# Probability of each outcome on a fresh roll of all five dice
+FIRST_ROLL = KEEP_TRANSITIONS[KEEP_INDEX[()]]
+
+
+def score_table(score: Callable[[List[int], str], int], categories: Sequence[str]) -> List[List[int]]:
+    """
+    Tabulates a scoring function: table[outcome index][category index]
+    """
+    return [[score(list(dice), category) for category in categories] for dice in OUTCOMES]
+
+
+# Standard rules score table, built from the reference scoring logic
+CATEGORIES: List[str] = ScorecardLogic("").get_all_categories()
+CATEGORY_INDEX: Dict[str, int] = {category: i for i, category in enumerate(CATEGORIES)}
+SCORE_TABLE = score_table(ScorecardLogic("").calculate_score, CATEGORIES)
+
+
+def holds_for_keep(rolled: Sequence[int], keep: Dice) -> List[bool]:
+    """
+    Converts a keep back into per-die hold flags for the dice on the table
+    """
+    remaining = list(keep)
+    held = []
+    for die in rolled:
+        if die in remaining:
+            remaining.remove(die)
+            held.append(True)
+        else:
+            held.append(False)
+    return held
@@ -0,0 +1,402 @@
+"""
+Rules variants, declared as data and compiled into lookup tables.
+
+A RuleSet lists its categories, each with a scoring function over sorted
+dice, plus the bonus, joker, forced-order and multi-column settings. On
+first use it is compiled into the same kind of tables the standard game
+uses: scores per outcome and category, strategy values, and an LRU cache of
+solved turns of its own. VariantScorecard plays a RuleSet with the same
+interface as ScorecardLogic, so YahtzeeGame and the bots work unchanged.
+
+The standard game keeps using ScorecardLogic; STANDARD here reproduces it
+exactly and exists so variants can be checked against it.
+"""
+from array import array
+from functools import cached_property, lru_cache, partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .events import EventStream
+from .outcomes import OUTCOME_INDEX, Dice, score_table
+from .scoreboard import Scoreboard
+from .strategy import UPPER_BONUS_WEIGHT, solve_turn
+
+
+class CategoryRule:
+    """
+    One category: how it scores, its usual score under good play (which the
+    EV bot measures against), its face if it's an upper category, and the
+    points a joker Yahtzee scores in it, if jokers apply
+    """
+
+    def __init__(self, name: str, score: Callable[[Dice], int], baseline: float,
+                 face: int = 0, joker: Optional[int] = None):
+        self.name = name
+        self.score = score
+        self.baseline = baseline
+        self.face = face
+        self.joker = joker
+
+
+def _counts(dice: Dice) -> List[int]:
+    return [dice.count(face) for face in range(1, 7)]
+
+
+def upper(name: str, face: int, baseline: float) -> CategoryRule:
+    """
+    Sum of the dice showing <face>
+    """
+    return CategoryRule(name, lambda dice: face * dice.count(face), baseline, face=face)
+
+
+def of_a_kind(name: str, n: int, baseline: float, matched: bool = False) -> CategoryRule:
+    """
+    At least <n> dice alike: scores the sum of all dice, or with <matched>
+    just the <n> matching dice (highest face first)
+    """
+    def score(dice: Dice) -> int:
+        counts = _counts(dice)
+        faces = [face for face in range(6, 0, -1) if counts[face - 1] >= n]
+        if not faces:
+            return 0
+        return n * faces[0] if matched else sum(dice)
+    return CategoryRule(name, score, baseline)
+
+
+def pairs(name: str, n: int, baseline: float) -> CategoryRule:
+    """
+    <n> pairs of different faces: scores the highest <n> pairs
+    """
+    def score(dice: Dice) -> int:
+        counts = _counts(dice)
+        faces = [face for face in range(6, 0, -1) if counts[face - 1] >= 2]
+        return 2 * sum(faces[:n]) if len(faces) >= n else 0
+    return CategoryRule(name, score, baseline)
+
+
+def full_house(name: str, baseline: float, points: Optional[int] = None) -> CategoryRule:
+    """
+    Three of one face and two of another: scores <points>, or the dice's sum
+    """
+    def score(dice: Dice) -> int:
+        counts = _counts(dice)
+        if 2 in counts and 3 in counts:
+            return sum(dice) if points is None else points
+        return 0
+    return CategoryRule(name, score, baseline, joker=points)
+
+
+def straight(name: str, runs: Sequence[Dice], points: int, baseline: float, joker: bool = True) -> CategoryRule:
+    """
+    Dice containing any of <runs>: scores <points>
+    """
+    run_sets = [set(run) for run in runs]
+
+    def score(dice: Dice) -> int:
+        faces = set(dice)
+        return points if any(run <= faces for run in run_sets) else 0
+    return CategoryRule(name, score, baseline, joker=points if joker else None)
+
+
+def five_of_a_kind(name: str, points: int, baseline: float) -> CategoryRule:
+    """
+    All five dice alike
+    """
+    return CategoryRule(name, lambda dice: points if len(set(dice)) == 1 else 0, baseline)
+
+
+def chance(name: str, baseline: float) -> CategoryRule:
+    """
+    Sum of the dice
+    """
+    return CategoryRule(name, sum, baseline)
+
+
+class RuleSet:
+    """
+    A rules variant: its categories in card order, and how bonuses work.
+
+    <columns> plays that many copies of the card, column n scoring n times
+    over (triple Yahtzee). With <forced_order> the categories must be filled
+    top to bottom. <yahtzee> names the five-of-a-kind category that enables
+    the extra Yahtzee bonus and, with <jokers>, the joker scores.
+    """
+
+    def __init__(self, name: str, categories: Sequence[CategoryRule], yahtzee: str,
+                 upper_bonus: int = 35, upper_threshold: int = 63, yahtzee_bonus: int = 100,
+                 jokers: bool = True, forced_order: bool = False, columns: int = 1):
+        self.name = name
+        self.rules = list(categories)
+        self.yahtzee = yahtzee
+        self.upper_bonus = upper_bonus
+        self.upper_threshold = upper_threshold
+        self.yahtzee_bonus = yahtzee_bonus
+        self.jokers = jokers
+        self.forced_order = forced_order
+        self.columns = columns
+
+        # Card categories, column by column, and each one's rule index and multiplier
+        names = [rule.name for rule in self.rules]
+        if columns == 1:
+            self.categories = names
+        else:
+            self.categories = [f"{name} x{column + 1}" for column in range(columns) for name in names]
+        self.card_base = [i % len(names) for i in range(len(self.categories))]
+        self.multipliers = [i // len(names) + 1 for i in range(len(self.categories))]
+        self.category_index: Dict[str, int] = {c: i for i, c in enumerate(self.categories)}
+        self.yahtzee_cells = [i for i, base in enumerate(self.card_base) if names[base] == yahtzee]
+
+    @property
+    def rounds(self) -> int:
+        """
+        Turns each player takes in a game
+        """
+        return len(self.categories)
+
+    @cached_property
+    def score_table(self) -> List[List[int]]:
+        """
+        score_table[outcome][rule], built on first use
+        """
+        by_name = {rule.name: rule for rule in self.rules}
+        return score_table(lambda dice, name: by_name[name].score(tuple(dice)),
+                           [rule.name for rule in self.rules])
+
+    @cached_property
+    def values(self) -> List[List[float]]:
+        """
+        values[outcome][card category]: the EV bot's end-of-turn value of each score
+        """
+        table = []
+        for scores in self.score_table:
+            row = []
+            for base, multiplier in zip(self.card_base, self.multipliers):
+                rule = self.rules[base]
+                score = scores[base]
+                value = score - rule.baseline
+                if rule.face:
+                    value += UPPER_BONUS_WEIGHT * (score - 3 * rule.face)
+                row.append(multiplier * value)
+            table.append(row)
+        return table
+
+    @cached_property
+    def _turn_cache(self) -> Callable:
+        # Each variant solves and caches its own turns
+        return lru_cache(maxsize=1024)(partial(solve_turn, self.values))
+
+    def turn_table(self, mask: int) -> Tuple[array, array]:
+        """
+        solve_turn() for this variant, cached by open categories
+        """
+        return self._turn_cache(mask)
+
+    def open_mask(self, scorecard: 'VariantScorecard') -> int:
+        """
+        Returns a bitmask of the card categories the scorecard can still fill
+        """
+        mask = 0
+        for i, category in enumerate(self.categories):
+            if not scorecard.is_category_used(category):
+                mask |= 1 << i
+        return mask
+
+    def best_category(self, dice_values: Sequence[int], scorecard: 'VariantScorecard') -> str:
+        """
+        The EV bot's category choice: the open category with the best value, applying joker scores
+        """
+        values = self.values[OUTCOME_INDEX[tuple(sorted(dice_values))]]
+        joker = self.jokers and scorecard.bonus_yahtzee(dice_values)
+        best_category = ""
+        best_value = float('-inf')
+        for i, category in enumerate(self.categories):
+            if scorecard.is_category_used(category):
+                continue
+            value = values[i]
+            rule = self.rules[self.card_base[i]]
+            if joker and rule.joker is not None:
+                value += self.multipliers[i] * rule.joker
+            if value > best_value:
+                best_value = value
+                best_category = category
+        return best_category
+
+
+class VariantScorecard:
+    """
+    Scorecard for a RuleSet, with the same interface as ScorecardLogic.
+    Scores are looked up in the ruleset's compiled tables.
+    """
+
+    def __init__(self, player_name: str, rules: RuleSet):
+        self.player_name = player_name
+        self.rules = rules
+        self.has_upper_bonus = False
+        self.upper_cats = [c for c, base in zip(rules.categories, rules.card_base) if rules.rules[base].face]
+        self.lower_cats = [c for c in rules.categories if c not in self.upper_cats]
+        self.scores: Dict[str, Optional[int]] = {category: None for category in rules.categories}
+        self.throws: Dict[str, Optional[List[int]]] = {category: None for category in rules.categories}
+        self.upper_sub = 0
+        self.lower_sub = 0
+        self.total_score = 0
+        self.plus_minus = 0
+        self.yahtzee_bonus = 0
+        # Unweighted upper total and bonus of each column
+        self._column_upper = [0] * rules.columns
+        self._column_bonus = [False] * rules.columns
+        # Categories filled so far, which is also the next one in forced order
+        self._filled = 0
+        self.events: Optional[EventStream] = None
+        self.board: Optional[Scoreboard] = None
+        self.seat = 0
+
+    def calculate_score(self, dice_values: Sequence[int], category: Optional[str]) -> int:
+        """
+        Returns the score of the dice in a category, without jokers or bonuses
+        """
+        if not category:
+            return 0
+        i = self.rules.category_index[category]
+        score = self.rules.score_table[OUTCOME_INDEX[tuple(sorted(dice_values))]][self.rules.card_base[i]]
+        return score * self.rules.multipliers[i]
+
+    def bonus_yahtzee(self, dice_values: Sequence[int]) -> bool:
+        """
+        Whether the dice are an extra Yahtzee, i.e. a Yahtzee box already holds one
+        """
+        if len(set(dice_values)) != 1:
+            return False
+        categories = self.rules.categories
+        return any(self.scores[categories[i]] for i in self.rules.yahtzee_cells)
+
+    def calc_plus_minus_str(self) -> str:
+        """
+        Calculates the 'plus/minus' on the upper bonus, and returns in string form.
+        """
+        if self.plus_minus == 0:
+            return 'even'
+        if self.plus_minus > 0:
+            return f'up {self.plus_minus}'
+        return f'down {abs(self.plus_minus)}'
+
+    def is_category_used(self, category: str) -> bool:
+        """
+        Checks if a category can't be filled: it's been used or, in forced order, it isn't next
+        """
+        if self.scores[category] is not None:
+            return True
+        return self.rules.forced_order and category != self.rules.categories[self._filled]
+
+    def update_score(self, dice_values: List[int], category: str) -> None:
+        """
+        Updates the score attached to a category, and updates the subtotals.
+        """
+        if self.is_category_used(category):
+            return
+
+        rules = self.rules
+        i = rules.category_index[category]
+        base, multiplier = rules.card_base[i], rules.multipliers[i]
+        rule = rules.rules[base]
+        score = rules.score_table[OUTCOME_INDEX[tuple(sorted(dice_values))]][base]
+
+        if self.bonus_yahtzee(dice_values):
+            if rules.jokers and rule.joker is not None:
+                score = rule.joker
+            if rules.yahtzee_bonus:
+                # Counted twice per bonus, as ScorecardLogic does
+                self.yahtzee_bonus += 2
+                self.lower_sub += rules.yahtzee_bonus
+                if self.events:
+                    self.events.emit('yahtzee_bonus', player=self.player_name, bonus=rules.yahtzee_bonus)
+
+        self.throws[category] = sorted(dice_values)
+        raw_score = score
+        score *= multiplier
+        self.scores[category] = score
+        self._filled += 1
+
+        if rule.face:
+            column = i // len(rules.rules)
+            self.plus_minus += raw_score - 3 * rule.face
+            self.upper_sub += score
+            self._column_upper[column] += raw_score
+            if not self._column_bonus[column] and self._column_upper[column] >= rules.upper_threshold:
+                self._column_bonus[column] = True
+                self.has_upper_bonus = True
+                self.upper_sub += rules.upper_bonus * multiplier
+                if self.events:
+                    self.events.emit('upper_bonus', player=self.player_name, bonus=rules.upper_bonus * multiplier)
+        else:
+            self.lower_sub += score
+
+        self.total_score = self.upper_sub + self.lower_sub
+        if self.board:
+            self.board.record(self.seat, category, score, self.total_score)
+
+        if self.events:
+            self.events.emit('category_scored', player=self.player_name, category=category,
+                             score=score, throws=self.throws[category])
+
+    def final_tally(self) -> int:
+        """
+        Returns the final score.
+        """
+        return self.total_score
+
+    def get_all_categories(self) -> List[str]:
+        """
+        Returns all categories, in card order
+        """
+        return list(self.rules.categories)
+
+
+def _standard_categories() -> List[CategoryRule]:
+    faces = ['Ones', 'Twos', 'Threes', 'Fours', 'Fives', 'Sixes']
+    baselines = [2.1, 5.3, 8.6, 12.2, 15.7, 19.2]
+    return [upper(name, face + 1, baseline) for face, (name, baseline) in enumerate(zip(faces, baselines))] + [
+        of_a_kind('Three of a Kind', 3, 21.7),
+        of_a_kind('Four of a Kind', 4, 13.1),
+        full_house('Full House', 22.6, points=25),
+        straight('Small Straight', [(1, 2, 3, 4), (2, 3, 4, 5), (3, 4, 5, 6)], 30, 29.5),
+        straight('Large Straight', [(1, 2, 3, 4, 5), (2, 3, 4, 5, 6)], 40, 32.7),
+        five_of_a_kind('Yahtzee', 50, 16.9),
+        chance('Chance', 22.0),
+    ]
+
+
+def _yatzy_categories() -> List[CategoryRule]:
+    faces = ['Ones', 'Twos', 'Threes', 'Fours', 'Fives', 'Sixes']
+    baselines = [2.1, 5.3, 8.6, 12.2, 15.7, 19.2]
+    return [upper(name, face + 1, baseline) for face, (name, baseline) in enumerate(zip(faces, baselines))] + [
+        pairs('One Pair', 1, 9.5),
+        pairs('Two Pairs', 2, 15.0),
+        of_a_kind('Three of a Kind', 3, 11.0, matched=True),
+        of_a_kind('Four of a Kind', 4, 8.5, matched=True),
+        straight('Small Straight', [(1, 2, 3, 4, 5)], 15, 6.5, joker=False),
+        straight('Large Straight', [(2, 3, 4, 5, 6)], 20, 9.0, joker=False),
+        full_house('Full House', 14.0),
+        chance('Chance', 22.0),
+        five_of_a_kind('Yatzy', 50, 15.0),
+    ]
+
+
+# Standard rules, matching ScorecardLogic
+STANDARD = RuleSet('standard', _standard_categories(), yahtzee='Yahtzee')
+# Scandinavian Yatzy: pairs, matched-dice kinds, fixed straights, 50 point bonus, no jokers
+YATZY = RuleSet('yatzy', _yatzy_categories(), yahtzee='Yatzy', upper_bonus=50,
+                yahtzee_bonus=0, jokers=False)
+# Standard categories, filled strictly top to bottom
+FORCED_ORDER = RuleSet('forced', _standard_categories(), yahtzee='Yahtzee', forced_order=True)
+# Three standard cards side by side, scoring x1, x2 and x3
+TRIPLE = RuleSet('triple', _standard_categories(), yahtzee='Yahtzee', columns=3)
+
+VARIANTS: Dict[str, RuleSet] = {rules.name: rules for rules in (STANDARD, YATZY, FORCED_ORDER, TRIPLE)}
+
+
+def get_rules(name: str) -> RuleSet:
+    """
+    Returns the named rules variant
+    """
+    if name not in VARIANTS:
+        raise ValueError(f"Unknown rules variant: {name}")
+    return VARIANTS[name]
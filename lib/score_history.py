@@ -0,0 +1,335 @@
+"""
+Full game history in a local SQLite database, with leaderboard and
+per-player statistics queries.
+
+Every finished game adds one row per player, and one row per opponent of
+each player, so head-to-head records work for multiplayer games too.
+Indexes on score, player and date keep the queries fast over millions of
+rows, and a per-score histogram and per-player totals kept up to date by
+triggers answer percentile and ranking queries without scanning the games
+at all.
+
+Run `python -m lib.score_history --help` for the command line tools.
+"""
+import argparse
+import sqlite3
+import time
+from random import Random
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .score_writer import read_high_score_file
+
+# Game history database file
+HISTORY_DB = "score_history.db"
+
+# Name bot players are given (BOT_NAME in game_logic, which imports this module)
+BOT_PREFIX = "Yahtzee Bot"
+# Joins a multiplayer game's opponents into one 'opponent' value, as in the high score file
+OPPONENT_SEPARATOR = " & "
+
+# (player, opponent, score, won) for one player in one game.
+# 'won' is 1 or 0, or None when unknown (legacy imports).
+GameResult = Tuple[str, str, int, Optional[int]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    player TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    won INTEGER,
+    -- 0 for practice and bot-only games, which stay off the leaderboard
+    ranked INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_scores_score ON scores (score DESC, player DESC, opponent DESC);
+CREATE INDEX IF NOT EXISTS idx_scores_player ON scores (player, opponent, score, won);
+CREATE INDEX IF NOT EXISTS idx_scores_played_at ON scores (played_at);
+
+-- Number of games at each score, for percentile queries
+CREATE TABLE IF NOT EXISTS score_counts (
+    score INTEGER PRIMARY KEY,
+    n INTEGER NOT NULL
+);
+-- Running totals per player, for ranking players by average
+CREATE TABLE IF NOT EXISTS player_totals (
+    player TEXT PRIMARY KEY,
+    games INTEGER NOT NULL,
+    total INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS scores_count_insert AFTER INSERT ON scores BEGIN
+    INSERT INTO score_counts (score, n) VALUES (NEW.score, 1)
+        ON CONFLICT (score) DO UPDATE SET n = n + 1;
+    INSERT INTO player_totals (player, games, total) VALUES (NEW.player, 1, NEW.score)
+        ON CONFLICT (player) DO UPDATE SET games = games + 1, total = total + NEW.score;
+END;
+CREATE TRIGGER IF NOT EXISTS scores_count_delete AFTER DELETE ON scores BEGIN
+    UPDATE score_counts SET n = n - 1 WHERE score = OLD.score;
+    UPDATE player_totals SET games = games - 1, total = total - OLD.score WHERE player = OLD.player;
+END;
+
+-- Each opponent of each score, and what they scored in that game (NULL when unknown)
+CREATE TABLE IF NOT EXISTS opponents (
+    score_id INTEGER NOT NULL,
+    opponent TEXT NOT NULL,
+    opponent_score INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_opponents_score_id ON opponents (score_id);
+CREATE INDEX IF NOT EXISTS idx_opponents_opponent ON opponents (opponent, score_id);
+CREATE TRIGGER IF NOT EXISTS scores_opponents_delete AFTER DELETE ON scores BEGIN
+    DELETE FROM opponents WHERE score_id = OLD.id;
+END;
+"""
+
+# Created after _migrate(), as it needs the columns added since the first version
+_VIEWS = """
+DROP VIEW IF EXISTS high_scores;
+-- Leaderboard of games with a human and an opponent, ordered the way the high score file is
+CREATE VIEW high_scores AS
+    SELECT score, player, opponent FROM scores
+    WHERE ranked AND opponent != ''
+    ORDER BY score DESC, player DESC, opponent DESC;
+"""
+
+
+def _is_bot(name: str) -> bool:
+    return name.startswith(BOT_PREFIX)
+
+
+class ScoreHistory:
+    """
+    Game history store backed by a SQLite database
+    """
+
+    def __init__(self, path: str = HISTORY_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._migrate()
+        self.conn.executescript(_VIEWS)
+
+    def _migrate(self) -> None:
+        """
+        Brings a database from an earlier version up to date
+        """
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(scores)")]
+        if 'ranked' not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE scores ADD COLUMN ranked INTEGER NOT NULL DEFAULT 1")
+                # Bot-only games recorded before the column existed
+                unranked = [(row_id,) for row_id, player, opponent in self.conn.execute(
+                                "SELECT id, player, opponent FROM scores WHERE player LIKE ?", (BOT_PREFIX + '%',))
+                            if _is_bot(player) and all(_is_bot(name) for name in opponent.split(OPPONENT_SEPARATOR))]
+                self.conn.executemany("UPDATE scores SET ranked = 0 WHERE id = ?", unranked)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+            with self.conn:
+                # Games recorded before each opponent had a row of their own
+                self._link_opponents(0)
+                self.conn.execute("PRAGMA user_version = 1")
+
+    def _link_opponents(self, after_id: int) -> None:
+        """
+        Adds the opponents rows of the scores after <after_id>. An opponent's
+        score is found among the rows of the same game, recorded at the same
+        time; it's left unknown where that isn't certain, and for undated
+        (legacy) rows.
+        """
+        rows = self.conn.execute("SELECT id, played_at, player, opponent, score FROM scores WHERE id > ?",
+                                 (after_id,)).fetchall()
+        scores: Dict[Tuple[float, str], List[int]] = {}
+        for _, played_at, player, _, score in rows:
+            scores.setdefault((played_at, player), []).append(score)
+        links = []
+        for score_id, played_at, _, opponent, _ in rows:
+            if not opponent:
+                continue
+            for name in opponent.split(OPPONENT_SEPARATOR):
+                found = scores.get((played_at, name), []) if played_at else []
+                links.append((score_id, name, found[0] if len(found) == 1 else None))
+        self.conn.executemany("INSERT INTO opponents (score_id, opponent, opponent_score) VALUES (?, ?, ?)", links)
+
+    def _last_id(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM scores").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Closes the database
+        """
+        self.conn.close()
+
+    def is_empty(self) -> bool:
+        """
+        Returns True if no games have been recorded
+        """
+        return self.conn.execute("SELECT 1 FROM scores LIMIT 1").fetchone() is None
+
+    def record_game(self, results: Sequence[GameResult], played_at: Optional[float] = None,
+                    ranked: bool = True) -> None:
+        """
+        Records every player's result from one game. Unranked games (practice
+        and bot-only games) count in the statistics but not on the leaderboard.
+        """
+        played_at = time.time() if played_at is None else played_at
+        with self.conn:
+            last_id = self._last_id()
+            self.conn.executemany(
+                "INSERT INTO scores (played_at, player, opponent, score, won, ranked) VALUES (?, ?, ?, ?, ?, ?)",
+                [(played_at, player, opponent, score, won, int(ranked))
+                 for player, opponent, score, won in results])
+            self._link_opponents(last_id)
+
+    def bulk_insert(self, rows: Iterable[Tuple[float, str, str, int, Optional[int]]]) -> int:
+        """
+        Inserts (played_at, player, opponent, score, won) rows in one transaction
+        and returns how many were added
+        """
+        rows = list(rows)
+        with self.conn:
+            last_id = self._last_id()
+            self.conn.executemany(
+                "INSERT INTO scores (played_at, player, opponent, score, won) VALUES (?, ?, ?, ?, ?)",
+                rows)
+            self._link_opponents(last_id)
+        return len(rows)
+
+    def import_legacy(self, path: str) -> int:
+        """
+        Imports a legacy 'score,name,opponent' high score file and returns the number of rows added.
+        The file records neither dates nor results, so those are left unknown.
+        """
+        return self.bulk_insert((0.0, name, opponent, score, None)
+                                for score, name, opponent in read_high_score_file(path))
+
+    def top_scores(self, limit: int = 10) -> List[Tuple[int, str, str]]:
+        """
+        Returns the best (score, name, opponent) entries; replaces the old sorted high score list
+        """
+        return self.conn.execute("SELECT score, player, opponent FROM high_scores LIMIT ?",
+                                 (limit,)).fetchall()
+
+    def player_stats(self, player: str) -> Dict[str, float]:
+        """
+        Returns games played, average, best and worst score, and wins for a player
+        """
+        games, average, best, worst, wins = self.conn.execute(
+            "SELECT COUNT(*), AVG(score), MAX(score), MIN(score), SUM(won) FROM scores WHERE player = ?",
+            (player,)).fetchone()
+        return {'games': games, 'average': average or 0.0, 'best': best or 0,
+                'worst': worst or 0, 'wins': wins or 0}
+
+    def player_averages(self, min_games: int = 1, limit: int = 10) -> List[Tuple[str, int, float]]:
+        """
+        Returns (player, games, average score) for the players with the best averages
+        """
+        return self.conn.execute(
+            "SELECT player, games, CAST(total AS REAL) / games AS average FROM player_totals "
+            "WHERE games >= ? ORDER BY average DESC LIMIT ?",
+            (min_games, limit)).fetchall()
+
+    def head_to_head(self, player: str, opponent: str) -> Dict[str, int]:
+        """
+        Returns a player's wins, losses and ties against an opponent, in every
+        recorded game they both played: who scored more, whoever else was playing
+        """
+        games, wins, losses, ties = self.conn.execute(
+            "SELECT COUNT(*), SUM(s.score > o.opponent_score), SUM(s.score < o.opponent_score), "
+            "SUM(s.score = o.opponent_score) "
+            "FROM opponents o JOIN scores s ON s.id = o.score_id WHERE o.opponent = ? AND s.player = ?",
+            (opponent, player)).fetchone()
+        return {'games': games, 'wins': wins or 0, 'losses': losses or 0, 'ties': ties or 0}
+
+    def percentile(self, score: int) -> float:
+        """
+        Returns the percentage of recorded games that scored below <score>
+        """
+        below, total = self.conn.execute(
+            "SELECT COALESCE(SUM(CASE WHEN score < ? THEN n END), 0), COALESCE(SUM(n), 0) "
+            "FROM score_counts", (score,)).fetchone()
+        return 100.0 * below / total if total else 0.0
+
+    def score_at_percentile(self, percent: float) -> int:
+        """
+        Returns the lowest score that at least <percent>% of games scored at or below
+        """
+        total = self.conn.execute("SELECT COALESCE(SUM(n), 0) FROM score_counts").fetchone()[0]
+        if not total:
+            return 0
+        target = total * percent / 100.0
+        running = 0
+        score = 0
+        for score, n in self.conn.execute("SELECT score, n FROM score_counts WHERE n > 0 ORDER BY score"):
+            running += n
+            if running >= target:
+                break
+        return score
+
+
+def _populate(history: ScoreHistory, count: int, seed: int = 0) -> None:
+    """
+    Fills the database with synthetic games, for trying out query speed
+    """
+    rng = Random(seed)
+    players = [f"Player {i}" for i in range(1000)]
+    now = time.time()
+    rows = []
+    for i in range(count // 2):
+        a, b = rng.sample(players, 2)
+        score_a, score_b = int(rng.gauss(230, 40)), int(rng.gauss(230, 40))
+        played_at = now - rng.random() * 3e7
+        rows.append((played_at, a, b, score_a, int(score_a > score_b)))
+        rows.append((played_at, b, a, score_b, int(score_b > score_a)))
+        if len(rows) >= 100000:
+            history.bulk_insert(rows)
+            rows = []
+    history.bulk_insert(rows)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Query the Yahtzee game history")
+    parser.add_argument('--db', default=HISTORY_DB)
+    commands = parser.add_subparsers(dest='command', required=True)
+    imp = commands.add_parser('import', help="import a legacy high score file")
+    imp.add_argument('file')
+    top = commands.add_parser('top', help="show the leaderboard")
+    top.add_argument('-n', type=int, default=10)
+    stats = commands.add_parser('stats', help="show a player's statistics")
+    stats.add_argument('player')
+    commands.add_parser('averages', help="show the best player averages")
+    h2h = commands.add_parser('h2h', help="show a head-to-head record")
+    h2h.add_argument('player')
+    h2h.add_argument('opponent')
+    pct = commands.add_parser('percentile', help="show the percentile of a score")
+    pct.add_argument('score', type=int)
+    pop = commands.add_parser('populate', help="add synthetic games for testing")
+    pop.add_argument('count', type=int)
+    args = parser.parse_args(argv)
+
+    history = ScoreHistory(args.db)
+    start = time.perf_counter()
+    if args.command == 'import':
+        print(f"Imported {history.import_legacy(args.file)} scores")
+    elif args.command == 'top':
+        for i, (score, name, opponent) in enumerate(history.top_scores(args.n), 1):
+            print(f"{i:>3}. {name:<20} vs. {opponent:<20} {score:>5}")
+    elif args.command == 'stats':
+        print(history.player_stats(args.player))
+    elif args.command == 'averages':
+        for name, games, average in history.player_averages():
+            print(f"{name:<20} {games:>8} games  {average:>7.1f}")
+    elif args.command == 'h2h':
+        print(history.head_to_head(args.player, args.opponent))
+    elif args.command == 'percentile':
+        print(f"{history.percentile(args.score):.1f}% of games scored below {args.score}")
+    elif args.command == 'populate':
+        _populate(history, args.count)
+    print(f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Crash-safe high score file persistence on a background thread.
+
+The file is only ever replaced whole (written to a temp file, then renamed
+over the original), and every write holds a lock file while it re-reads
+and merges the scores on disk, so several game instances can share one
+high score file without losing each other's entries.
+"""
+import atexit
+import os
+import queue
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from .instrument import INSTRUMENTS
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+HighScore = Tuple[int, str, str]
+
+# Number of entries kept in the high score file
+HS_LIMIT = 10
+
+
+def parse_high_scores(lines: Iterator[str]) -> List[HighScore]:
+    """
+    Parses 'score,name,opponent' lines, skipping malformed ones
+    """
+    scores = []
+    for line in lines:
+        items = line.strip().split(",")
+        if len(items) >= 3:
+            try:
+                scores.append((int(items[0]), items[1], items[2]))
+            except ValueError:
+                continue
+    return scores
+
+
+def read_high_score_file(path: str) -> List[HighScore]:
+    """
+    Returns the entries in a high score file, or an empty list if there isn't one
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_high_scores(f)
+
+
+def atomic_write_text(path: str, text: str) -> None:
+    """
+    Replaces <path> with <text> so readers see either the old or the new file, never half of one
+    """
+    _atomic_write(path, text, 'w', 'utf-8')
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """
+    atomic_write_text() for binary files
+    """
+    _atomic_write(path, data, 'wb', None)
+
+
+def _atomic_write(path: str, content, mode: str, encoding: Optional[str]) -> None:
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".part")
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Holds an exclusive, inter-process lock on <path>.lock for the duration of the block
+    """
+    with open(path + ".lock", 'a+b') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def merge_high_scores(path: str, new_scores: List[HighScore], limit: int = HS_LIMIT) -> List[HighScore]:
+    """
+    Merges new entries into the high score file on disk and returns its new contents
+    """
+    with file_lock(path):
+        merged = sorted(read_high_score_file(path) + new_scores, reverse=True)[:limit]
+        atomic_write_text(path, "".join(f"{s[0]},{s[1]},{s[2]}\n" for s in merged))
+    return merged
+
+
+class HighScoreWriter:
+    """
+    Background thread which merges queued high scores into the file.
+    Scores queued while a write is in progress are coalesced into the next one.
+    """
+
+    def __init__(self, path: str, limit: int = HS_LIMIT):
+        self.path = path
+        self.limit = limit
+        self._queue: "queue.Queue[Optional[List[HighScore]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="high-score-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, scores: List[HighScore]) -> None:
+        """
+        Queues new entries to be merged into the file
+        """
+        self._queue.put(list(scores))
+
+    def flush(self) -> None:
+        """
+        Blocks until everything queued so far is on disk
+        """
+        self._queue.join()
+
+    def close(self) -> None:
+        """
+        Writes anything still queued and stops the thread
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        """
+        Writer loop
+        """
+        while True:
+            batch = self._queue.get()
+            pending = []
+            taken = 1
+            stop = batch is None
+            if batch:
+                pending.extend(batch)
+
+            # Coalesce anything else that is already waiting
+            while True:
+                try:
+                    batch = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if batch is None:
+                    stop = True
+                else:
+                    pending.extend(batch)
+
+            if pending:
+                try:
+                    with INSTRUMENTS.timer('hiscore_write_ms'):
+                        merge_high_scores(self.path, pending, self.limit)
+                except OSError as e:
+                    print(f"Could not write to high score file: {e}")
+
+            for _ in range(taken):
+                self._queue.task_done()
+            if stop:
+                return
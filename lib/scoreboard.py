@@ -0,0 +1,58 @@
+"""
+Array-backed table of every player's scores in one game.
+"""
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+# Score stored for a category that hasn't been used yet
+UNUSED = -1
+
+
+class Scoreboard:
+    """
+    Scores for all players in flat arrays: one row of category scores per
+    seat, plus a totals array that ranking and winner checks work from.
+    ScorecardLogic writes into it whenever a score is recorded.
+    """
+
+    def __init__(self, num_players: int, categories: Sequence[str]):
+        self.num_players = num_players
+        self.num_categories = len(categories)
+        self.category_index: Dict[str, int] = {c: i for i, c in enumerate(categories)}
+        self.cells = array('h', [UNUSED] * (num_players * self.num_categories))
+        self.totals = array('i', [0] * num_players)
+        self.filled = array('b', [0] * num_players)
+
+    def record(self, seat: int, category: str, score: int, total: int) -> None:
+        """
+        Records a scored category and the player's new total
+        """
+        self.cells[seat * self.num_categories + self.category_index[category]] = score
+        self.totals[seat] = total
+        self.filled[seat] += 1
+
+    def set_row(self, seat: int, scores: Dict[str, Optional[int]], total: int) -> None:
+        """
+        Overwrites one player's category scores (None where not yet scored)
+        and total, e.g. to mirror a scorecard kept elsewhere
+        """
+        start = seat * self.num_categories
+        for category, score in scores.items():
+            self.cells[start + self.category_index[category]] = UNUSED if score is None else score
+        self.totals[seat] = total
+        self.filled[seat] = sum(score is not None for score in scores.values())
+
+    def row(self, seat: int) -> array:
+        """
+        Returns one player's category scores (UNUSED where not yet scored)
+        """
+        start = seat * self.num_categories
+        return self.cells[start:start + self.num_categories]
+
+    def rankings(self) -> List[int]:
+        """
+        Returns seat numbers best total first. Ties rank the later seat first,
+        as the two-player game always has.
+        """
+        totals = self.totals
+        return sorted(range(self.num_players), key=lambda seat: (totals[seat], seat), reverse=True)
@@ -2,6 +2,8 @@
 Defines the core scorecard logic for Yahtzee game, independent of any UI.
 """
 from typing import Dict, List, Optional, Set, Tuple
+from .events import EventStream
+from .scoreboard import Scoreboard
 
 
 class ScorecardLogic:
@@ -28,6 +30,11 @@ class ScorecardLogic:
         self.total_score = 0
         self.plus_minus = 0
         self.yahtzee_bonus = 0
+        # Analytics event stream, if one is attached
+        self.events: Optional[EventStream] = None
+        # Shared game scoreboard and this player's seat on it, if any
+        self.board: Optional[Scoreboard] = None
+        self.seat = 0
 
     def calculate_score(self, dice_values: List[int], category: Optional[str]) -> int:
         """
@@ -129,6 +136,8 @@ class ScorecardLogic:
                 # Add Yahtzee bonus
                 self.yahtzee_bonus += 1
                 self.lower_sub += 100
+                if self.events:
+                    self.events.emit('yahtzee_bonus', player=self.player_name, bonus=100)
 
         # Store the dice values for display purposes
         if self.throws[category] is None:
@@ -150,9 +159,17 @@ class ScorecardLogic:
             self.has_upper_bonus = True
             self.upper_bonus_counted = True
             self.upper_sub += 35
+            if self.events:
+                self.events.emit('upper_bonus', player=self.player_name, bonus=35)
 
         # Tally total score
         self.total_score = self.upper_sub + self.lower_sub
+        if self.board:
+            self.board.record(self.seat, category, score, self.total_score)
+
+        if self.events:
+            self.events.emit('category_scored', player=self.player_name, category=category,
+                             score=score, throws=self.throws[category])
 
     def final_tally(self) -> int:
         """
@@ -2,9 +2,16 @@
 UI components for scorecard visualization
 """
 import pygame
-from typing import Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 from .scorecard_logic import ScorecardLogic
-from .ui_common import SCREEN, BLACK, WIDTH, HEIGHT, WHITE, FONT, int_to_mini_die
+from .ui_common import (
+    SCREEN, BLACK, WIDTH, HEIGHT, WHITE, FONT, NAME_FONT, SMALL_FONT, POOL_TABLE_GREEN,
+    int_to_mini_die, draw_line, draw_rect
+)
+
+# Compact panel dimensions, used when there are more than two players
+COMPACT_WIDTH, COMPACT_HEIGHT = 340, 325
+COMPACT_ROW = 19
 
 
 class ScorecardUI:
@@ -12,32 +19,41 @@ class ScorecardUI:
     Visual representation of a scorecard
     """
 
-    def __init__(self, x: int, y: int, scorecard_logic: ScorecardLogic):
+    def __init__(self, x: int, y: int, scorecard_logic: ScorecardLogic, compact: bool = False):
         self.x = x
         self.y = y
         self.scorecard_logic = scorecard_logic
+        # Compact panels are small boxes without mini dice, for games of 3+ players
+        self.compact = compact
         # Keep track of rectangles for hit detection
         self.category_rects = {}
 
     def draw(self) -> None:
         """
-        Draws a scorecard to the screen.
+        Draws a scorecard to the screen, clearing its own area first
+        so a single card can be redrawn without repainting the screen.
         """
+        if self.compact:
+            self._draw_compact()
+            return
+
+        # Clear this card's area
+        draw_rect(SCREEN, POOL_TABLE_GREEN, (self.x, self.y - 70, 670, 660))
+
         # Draw horizontal lines
-        pygame.draw.line(SCREEN, BLACK, (0, self.y - 75), (WIDTH, self.y - 75), 10)
-        pygame.draw.line(SCREEN, BLACK, (0, self.y - 10), (WIDTH, self.y - 10), 5)
-        pygame.draw.line(SCREEN, BLACK, (0, self.y + 520), (WIDTH, self.y + 520), 5)
+        draw_line(SCREEN, BLACK, (0, self.y - 75), (WIDTH, self.y - 75), 10)
+        draw_line(SCREEN, BLACK, (0, self.y - 10), (WIDTH, self.y - 10), 5)
+        draw_line(SCREEN, BLACK, (0, self.y + 520), (WIDTH, self.y + 520), 5)
 
         # Draw vertical line
-        pygame.draw.line(SCREEN, BLACK, (725, self.y - 75), (725, HEIGHT), 10)
+        draw_line(SCREEN, BLACK, (725, self.y - 75), (725, HEIGHT), 10)
 
         # Print player name
-        name_font = pygame.font.SysFont("Arial", 36)
-        text = name_font.render(self.scorecard_logic.player_name, True, BLACK)
+        text = NAME_FONT.render(self.scorecard_logic.player_name, True, BLACK)
         SCREEN.blit(text, (self.x, self.y - 60))
 
         # Print total score
-        text = name_font.render(str(self.scorecard_logic.total_score), True, BLACK)
+        text = NAME_FONT.render(str(self.scorecard_logic.total_score), True, BLACK)
         SCREEN.blit(text, (self.x + 575, self.y - 60))
 
         # Print score for each category
@@ -69,6 +85,34 @@ class ScorecardUI:
         t = FONT.render(sub_text, True, BLACK)
         SCREEN.blit(t, (self.x, self.y + 560))
 
+    def _draw_compact(self) -> None:
+        """
+        Draws the scorecard as a small boxed panel
+        """
+        panel = pygame.Rect(self.x, self.y, COMPACT_WIDTH, COMPACT_HEIGHT)
+        draw_rect(SCREEN, POOL_TABLE_GREEN, panel)
+        draw_rect(SCREEN, BLACK, panel, 3)
+
+        # Player name and total score
+        text = FONT.render(self.scorecard_logic.player_name, True, BLACK)
+        SCREEN.blit(text, (self.x + 10, self.y + 5))
+        text = FONT.render(str(self.scorecard_logic.total_score), True, BLACK)
+        SCREEN.blit(text, (self.x + COMPACT_WIDTH - 10 - text.get_width(), self.y + 5))
+
+        top = self.y + 40
+        for i, category in enumerate(self.scorecard_logic.scores):
+            score = self.scorecard_logic.scores[category]
+            y = top + i * COMPACT_ROW
+            self.category_rects[category] = pygame.Rect(self.x, y, COMPACT_WIDTH, COMPACT_ROW)
+            SCREEN.blit(SMALL_FONT.render(category, True, WHITE), (self.x + 10, y))
+            score_text = SMALL_FONT.render(str(score) if score is not None else "-", True, WHITE)
+            SCREEN.blit(score_text, (self.x + 200, y))
+
+        sub_text = (f"Upper: {self.scorecard_logic.upper_sub} "
+                    f"({self.scorecard_logic.calc_plus_minus_str()})  "
+                    f"Lower: {self.scorecard_logic.lower_sub}")
+        SCREEN.blit(SMALL_FONT.render(sub_text, True, BLACK), (self.x + 10, top + 13 * COMPACT_ROW + 5))
+
     def is_category_clicked(self, pos: Tuple[int, int], category: str) -> bool:
         """
         Checks if a category was clicked
@@ -76,3 +120,18 @@ class ScorecardUI:
         if category in self.category_rects:
             return self.category_rects[category].collidepoint(pos)
         return False
+
+
+def layout_cards(scorecards: Sequence[ScorecardLogic]) -> List[ScorecardUI]:
+    """
+    Create a scorecard UI per player. One or two players get full-size cards;
+    more get compact panels, four to a row.
+    """
+    if len(scorecards) <= 2:
+        return [ScorecardUI(x, 300, scorecard) for x, scorecard in zip((50, 775), scorecards)]
+
+    gap = (WIDTH - 4 * COMPACT_WIDTH) // 5
+    return [ScorecardUI(gap + (seat % 4) * (COMPACT_WIDTH + gap),
+                        235 + (seat // 4) * (COMPACT_HEIGHT + 10),
+                        scorecard, compact=True)
+            for seat, scorecard in enumerate(scorecards)]
@@ -0,0 +1,288 @@
+"""
+Asyncio server hosting many concurrent Yahtzee tables over a line protocol.
+
+Every request is one line, '<COMMAND> [args]', and gets one reply line:
+'OK <json state>' or 'ERR <message>'. Commands:
+
+    NEW <name>[;<name>...]     start a table; names starting 'Yahtzee Bot' are bots
+    JOIN <table>               make <table> this connection's current table
+    STATE                      show the current table
+    ROLL                       roll the dice for the player whose turn it is
+    HOLD <die>                 toggle holding a die (0-4)
+    SCORE <category>           score the dice and end the turn
+    CLOSE                      close the current table
+    QUIT                       close the connection
+
+A table is closed once no connection has it as its current table, so a
+long-running server doesn't fill up with abandoned tables. Bot turns are played automatically, on an executor, whenever a turn passes
+to a bot. Run with `python -m lib.server --port 7777` (or `--unix PATH`).
+"""
+import argparse
+import asyncio
+import itertools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from .game_logic import YahtzeeGame
+
+# Encoding of the line protocol
+ENCODING = 'utf-8'
+
+
+def game_state(table_id: int, game: YahtzeeGame) -> Dict[str, Any]:
+    """
+    Returns a JSON-serializable view of a table
+    """
+    dice = game.active_dice
+    return {
+        'table': table_id,
+        'round': game.current_round,
+        'player': game.current_player,
+        'game_over': game.is_game_over(),
+        'dice': list(dice.rolled),
+        'held': list(dice.held),
+        'rolls_left': dice.rolls_left,
+        'players': [
+            {
+                'name': scorecard.player_name,
+                'bot': game.is_bot(seat),
+                'scores': scorecard.scores,
+                'throws': scorecard.throws,
+                'upper_sub': scorecard.upper_sub,
+                'lower_sub': scorecard.lower_sub,
+                'plus_minus': scorecard.plus_minus,
+                'total': scorecard.total_score,
+            }
+            for seat, scorecard in enumerate(game.scorecards)
+        ],
+    }
+
+
+class ProtocolError(Exception):
+    """
+    A request that can't be carried out; reported to the client as ERR
+    """
+
+
+class Table:
+    """
+    One game hosted by the server
+    """
+
+    def __init__(self, table_id: int, names: List[str]):
+        self.table_id = table_id
+        # Tables never record high scores, so don't load them either
+        self.game = YahtzeeGame(load_high_scores=False)
+        self.game.setup_new_game(*names)
+        self.lock = asyncio.Lock()
+        # Connections whose current table this is
+        self.connections = 0
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Returns the table state
+        """
+        return game_state(self.table_id, self.game)
+
+
+class GameServer:
+    """
+    Hosts tables and serves client connections
+    """
+
+    def __init__(self, max_tables: int = 10000, bot_workers: int = 4):
+        self.tables: Dict[int, Table] = {}
+        self.max_tables = max_tables
+        self.executor = ThreadPoolExecutor(max_workers=bot_workers, thread_name_prefix="bot")
+        self._ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 7777, unix_path: Optional[str] = None) -> None:
+        """
+        Starts listening on a TCP port, or a Unix socket if <unix_path> is given
+        """
+        if unix_path:
+            self._server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+        else:
+            self._server = await asyncio.start_server(self.handle_client, host, port)
+
+    @property
+    def port(self) -> int:
+        """
+        The TCP port being listened on (useful when started on port 0)
+        """
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """
+        Serves until cancelled
+        """
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """
+        Stops listening and shuts the bot executor down
+        """
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves one connection, one request line at a time
+        """
+        table: Optional[Table] = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    try:
+                        command, _, arg = line.decode(ENCODING).strip().partition(" ")
+                    except UnicodeDecodeError:
+                        raise ProtocolError(f"Request is not {ENCODING} text")
+                    command = command.upper()
+                    if command == 'QUIT':
+                        break
+                    table, reply = await self.dispatch(table, command, arg.strip())
+                    response = "OK " + json.dumps(reply, separators=(',', ':'))
+                except ProtocolError as e:
+                    response = f"ERR {e}"
+                writer.write((response + "\n").encode(ENCODING))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._move(table, None)
+            writer.close()
+
+    def _move(self, old: Optional[Table], new: Optional[Table]) -> None:
+        """
+        Moves a connection from table <old> to table <new>, closing <old> if that was its last connection
+        """
+        if new is old:
+            return
+        if new is not None:
+            new.connections += 1
+        if old is not None:
+            old.connections -= 1
+            if old.connections <= 0:
+                self.tables.pop(old.table_id, None)
+
+    async def dispatch(self, table: Optional[Table], command: str, arg: str):
+        """
+        Carries out one command. Returns the connection's (possibly new) table and the reply.
+        """
+        if command == 'NEW':
+            names = [name.strip() for name in arg.split(";") if name.strip()]
+            if not names:
+                raise ProtocolError("NEW needs at least one player name")
+            if len(self.tables) >= self.max_tables:
+                raise ProtocolError("Too many tables")
+            try:
+                new_table = Table(next(self._ids), names)
+            except ValueError as e:
+                raise ProtocolError(str(e))
+            self.tables[new_table.table_id] = new_table
+            self._move(table, new_table)
+            async with new_table.lock:
+                await self._play_bots(new_table)
+            return new_table, new_table.state()
+
+        if command == 'JOIN':
+            try:
+                new_table = self.tables[int(arg)]
+            except (ValueError, KeyError):
+                raise ProtocolError(f"No such table: {arg}")
+            self._move(table, new_table)
+            return new_table, new_table.state()
+
+        if table is None or table.table_id not in self.tables:
+            raise ProtocolError("No table; use NEW or JOIN first")
+
+        async with table.lock:
+            game = table.game
+            dice = game.active_dice
+            if command == 'STATE':
+                pass
+            elif command == 'CLOSE':
+                del self.tables[table.table_id]
+                self._move(table, None)
+                return None, {'closed': table.table_id}
+            elif game.is_game_over():
+                raise ProtocolError("Game over")
+            elif command == 'ROLL':
+                if dice.rolls_left <= 0:
+                    raise ProtocolError("No rolls left")
+                dice.roll_dice()
+                dice.rolls_left -= 1
+            elif command == 'HOLD':
+                if not dice.rolled:
+                    raise ProtocolError("Roll first")
+                # isdigit() alone passes digits such as '²' that int() rejects
+                if not (arg.isascii() and arg.isdigit()) or not 0 <= int(arg) < 5:
+                    raise ProtocolError("HOLD needs a die number from 0 to 4")
+                dice.toggle_hold(int(arg))
+            elif command == 'SCORE':
+                scorecard = game.scorecards[game.current_player]
+                if not dice.rolled:
+                    raise ProtocolError("Roll first")
+                if arg not in scorecard.scores:
+                    raise ProtocolError(f"No such category: {arg}")
+                if scorecard.is_category_used(arg):
+                    raise ProtocolError(f"{arg} is already scored")
+                scorecard.update_score(dice.rolled, arg)
+                game.end_turn()
+                game.reset_turn()
+                await self._play_bots(table)
+            else:
+                raise ProtocolError(f"Unknown command: {command}")
+            return table, table.state()
+
+    async def _play_bots(self, table: Table) -> None:
+        """
+        Plays bot turns on the executor until it's a human's turn or the game ends
+        """
+        game = table.game
+        loop = asyncio.get_running_loop()
+        while not game.is_game_over() and game.is_bot(game.current_player):
+            scorecard = game.scorecards[game.current_player]
+            game.reset_turn()
+            await loop.run_in_executor(self.executor, game.process_turn_ai, scorecard,
+                                       game.bots[game.current_player])
+            game.end_turn()
+            game.reset_turn()
+
+
+async def _serve(host: str, port: int, unix_path: Optional[str], bot_workers: int) -> None:
+    server = GameServer(bot_workers=bot_workers)
+    await server.start(host, port, unix_path)
+    print(f"Serving Yahtzee tables on {unix_path or f'{host}:{server.port}'}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Host Yahtzee tables over a line protocol")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    parser.add_argument('--unix', default=None, help="listen on this Unix socket instead of TCP")
+    parser.add_argument('--bot-workers', type=int, default=4)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args.host, args.port, args.unix, args.bot_workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Headless game simulator, optionally streaming every game's events to disk.
+
+Run with e.g. `python -m lib.simulate --games 100000 --strategy ev --events games.jsonl`
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from .events import EventStream, make_sink
+from .rules import VARIANTS
+from .strategy import available_strategies
+from .tournament import RunningStats, _worker_game, play_game
+
+
+def _shard_path(path: str, shard: int) -> str:
+    """
+    Returns the event file name for one worker's shard
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{shard:03d}{ext}"
+
+
+def simulate_range(strategy: str, first_seed: int, count: int, events_path: Optional[str] = None,
+                   fmt: str = 'jsonl', rules: Optional[str] = None) -> List[int]:
+    """
+    Plays solitaire games on seeds first_seed .. first_seed + count - 1 and
+    returns their scores, writing their events to <events_path> if given
+    """
+    game = _worker_game(rules)
+    if events_path:
+        game.events = EventStream(make_sink(events_path, fmt))
+        game.events.game = first_seed - 1
+    try:
+        return [play_game([strategy], seed, rules)[0] for seed in range(first_seed, first_seed + count)]
+    finally:
+        if game.events:
+            game.events.close()
+            game.events = None
+
+
+def simulate(strategy: str, games: int, seed: int = 0, workers: Optional[int] = None,
+             events_path: Optional[str] = None, fmt: str = 'jsonl',
+             rules: Optional[str] = None) -> Tuple[RunningStats, float]:
+    """
+    Splits the games evenly over a process pool. With an event file each worker
+    writes its own shard of it. Returns the score statistics and elapsed seconds.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, games))
+    per_worker = -(-games // workers)
+    stats = RunningStats()
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for shard in range(workers):
+            first = seed + shard * per_worker
+            count = min(per_worker, seed + games - first)
+            if count <= 0:
+                break
+            path = _shard_path(events_path, shard) if events_path else None
+            futures.append(pool.submit(simulate_range, strategy, first, count, path, fmt, rules))
+        for future in futures:
+            for score in future.result():
+                stats.add(score)
+
+    return stats, time.perf_counter() - start
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Simulate headless Yahtzee games")
+    parser.add_argument('--strategy', choices=available_strategies(), default='ev')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--events', default=None, help="write game events to this file (one shard per worker)")
+    parser.add_argument('--format', choices=['jsonl', 'columnar'], default='jsonl')
+    parser.add_argument('--rules', choices=sorted(VARIANTS), default='standard')
+    args = parser.parse_args(argv)
+
+    rules = None if args.rules == 'standard' else args.rules
+    stats, elapsed = simulate(args.strategy, args.games, args.seed, args.workers, args.events, args.format, rules)
+    low, high = stats.confidence_interval()
+    print(f"{stats.count} games of {args.strategy} in {elapsed:.1f}s ({stats.count / elapsed:.0f} games/sec)")
+    print(f"mean score {stats.mean:.1f}  95% CI [{low:.1f}, {high:.1f}]")
+
+
+if __name__ == "__main__":
+    main()
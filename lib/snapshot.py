@@ -0,0 +1,141 @@
+"""
+Save and restore a game in progress.
+
+A snapshot holds everything needed to carry on exactly where a game left
+off: the players, every scorecard, the dice, the round and seat, and the
+state of the random number generator the dice roll from, and for a Bot vs
+Bot game the speed it was being watched at. It's a small JSON
+file, written atomically, so a crash mid-write leaves the previous snapshot
+in place.
+"""
+import base64
+import json
+import math
+import os
+import random
+import struct
+from typing import Any, Dict, Optional
+
+from .game_logic import YahtzeeGame
+from .score_writer import atomic_write_text
+
+# Snapshot file the UI saves to after every scored category
+SNAPSHOT_FILE = "yahtzee_snapshot.json"
+# Bumped whenever the snapshot layout changes; older snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+# Scorecard attributes that are wiring rather than game state
+_NOT_STATE = {'player_name', 'events', 'board', 'seat', 'rules', 'upper_cats', 'lower_cats'}
+
+
+def _pack_rng(state: tuple) -> list:
+    """
+    Packs a Mersenne Twister state into [version, base64 words, gauss_next]
+    """
+    version, words, gauss_next = state
+    return [version, base64.b64encode(struct.pack(f"<{len(words)}I", *words)).decode('ascii'), gauss_next]
+
+
+def _unpack_rng(packed: list) -> tuple:
+    version, encoded, gauss_next = packed
+    raw = base64.b64decode(encoded)
+    return version, struct.unpack(f"<{len(raw) // 4}I", raw), gauss_next
+
+
+def snapshot_game(game: YahtzeeGame, time_scale: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Returns a JSON-serializable snapshot of a game, watched at <time_scale> if it's a Bot vs Bot game
+    """
+    dice = game.active_dice
+    rng = dice.rng.getstate() if dice.rng else random.getstate()
+    return {
+        'version': SNAPSHOT_VERSION,
+        'rules': game.rules.name if game.rules else None,
+        'players': game.player_names,
+        'bots': game.bots,
+        'round': game.current_round,
+        'player': game.current_player,
+        'dice': {'rolled': dice.rolled, 'held': dice.held, 'rolls_left': dice.rolls_left},
+        'rng': _pack_rng(rng),
+        # 0 for uncapped, as the speed prompt takes it (JSON has no infinity)
+        'time_scale': 0 if time_scale is not None and math.isinf(time_scale) else time_scale,
+        'scorecards': [{key: value for key, value in vars(scorecard).items() if key not in _NOT_STATE}
+                       for scorecard in game.scorecards],
+    }
+
+
+def restore_game(game: YahtzeeGame, snapshot: Dict[str, Any]) -> None:
+    """
+    Puts a game back into the state of a snapshot
+    """
+    if snapshot['rules']:
+        from .rules import get_rules
+        game.rules = get_rules(snapshot['rules'])
+    else:
+        game.rules = None
+    game.setup_new_game(*snapshot['players'], bots=snapshot['bots'])
+
+    for seat, (scorecard, state) in enumerate(zip(game.scorecards, snapshot['scorecards'])):
+        for key, value in state.items():
+            if hasattr(scorecard, key):
+                setattr(scorecard, key, value)
+        # Rebuild this player's row of the shared scoreboard
+        for category, score in scorecard.scores.items():
+            if score is not None:
+                game.board.record(seat, category, score, scorecard.total_score)
+
+    game.current_round = snapshot['round']
+    game.current_player = snapshot['player']
+    dice = game.active_dice
+    dice.rolled = list(snapshot['dice']['rolled'])
+    dice.held = list(snapshot['dice']['held'])
+    dice.rolls_left = snapshot['dice']['rolls_left']
+    rng = _unpack_rng(snapshot['rng'])
+    if dice.rng:
+        dice.rng.setstate(rng)
+    else:
+        random.setstate(rng)
+
+
+def saved_time_scale(snapshot: Dict[str, Any]) -> Optional[float]:
+    """
+    The speed a snapshot's Bot vs Bot game was watched at, or None if it isn't one
+    """
+    time_scale = snapshot.get('time_scale')
+    if time_scale is None:
+        return None
+    return math.inf if time_scale == 0 else float(time_scale)
+
+
+def save_snapshot(game: YahtzeeGame, path: str = SNAPSHOT_FILE, time_scale: Optional[float] = None) -> None:
+    """
+    Atomically writes a snapshot of the game to <path>
+    """
+    atomic_write_text(path, json.dumps(snapshot_game(game, time_scale), separators=(',', ':')))
+
+
+def load_snapshot(path: str = SNAPSHOT_FILE) -> Optional[Dict[str, Any]]:
+    """
+    Reads a snapshot, or returns None if there isn't a usable one
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Could not read saved game: {e}")
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+def clear_snapshot(path: str = SNAPSHOT_FILE) -> None:
+    """
+    Removes the snapshot, once its game is over
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,260 @@
+"""
+Soak test: plays thousands of consecutive games through the real UI flow
+(new game, game loop, game-over screen, play again) headlessly with
+lib.ui_driver, and watches for anything that grows from game to game.
+
+Every --interval games it samples resident memory, memory traced by
+tracemalloc and its biggest allocation sites, the Python stack depth at the
+game-over screen, and frame-time percentiles. The report fits a trend line
+to each series and flags the ones that keep growing.
+
+Run with e.g. `python -m lib.soak --games 2000 --report soak.json`. It exits
+with status 1 if a trend is flagged or the run stopped early.
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence
+
+from .loadgen import percentile
+
+# Growth per 1000 games above which a series is flagged. Frame times are
+# judged relative to their mean (0.25 = 25% slower per 1000 games).
+TREND_LIMITS = {
+    'rss_mb': 16.0,
+    'traced_mb': 4.0,
+    'stack_depth': 1.0,
+    'frame_p95_ms': 0.25,
+}
+RELATIVE_TRENDS = {'frame_p95_ms'}
+# Allocation sites listed per sample, and in the report's growth table
+TOP_ALLOCATIONS = 5
+# Errors that end a soak run but still get a report: what leaks turn into
+STOPPING_ERRORS = (RecursionError, MemoryError)
+
+
+def rss_mb() -> float:
+    """
+    Resident set size of this process in MiB, or the peak RSS where the current one can't be read
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def _site(stat: tracemalloc.Statistic) -> str:
+    frame = stat.traceback[0]
+    return f"{os.path.relpath(frame.filename)}:{frame.lineno}"
+
+
+# Allocations left out of the samples: tracing's own, imports', and the monitor's sample rows
+_NOISE = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+          tracemalloc.Filter(False, "<unknown>"), tracemalloc.Filter(False, __file__))
+
+
+class SoakMonitor:
+    """
+    Takes a sample every <interval> games, from the UI driver's game-over hook
+    """
+
+    def __init__(self, interval: int = 50, trace: bool = True, top: int = TOP_ALLOCATIONS):
+        self.interval = interval
+        self.trace = trace
+        self.top = top
+        self.samples: List[Dict[str, Any]] = []
+        self.games = 0
+        self.started = time.perf_counter()
+        self._first_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._last_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def on_game_over(self, driver, game: int) -> None:
+        """
+        GameOverHook for the driver's scripts
+        """
+        self.games = game + 1
+        if self.games % self.interval == 0:
+            self.sample(driver)
+
+    def sample(self, driver) -> Dict[str, Any]:
+        """
+        Records memory, stack depth and the frame times since the last sample
+        """
+        # Count the UI's frames under the script that called us, not the monitor's own
+        frame, depth = sys._getframe(1), 0
+        while frame is not None:
+            depth += 1
+            frame = frame.f_back
+
+        frame_ms = sorted(driver.frame_ms)
+        driver.frame_ms.clear()
+        gc.collect()
+        row = {
+            'games': self.games,
+            'elapsed_s': round(time.perf_counter() - self.started, 2),
+            'rss_mb': round(rss_mb(), 2),
+            'stack_depth': depth,
+            'frames': len(frame_ms),
+            'frame_p50_ms': round(percentile(frame_ms, 50), 3),
+            'frame_p95_ms': round(percentile(frame_ms, 95), 3),
+            'frame_p99_ms': round(percentile(frame_ms, 99), 3),
+        }
+        if self.trace and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces(_NOISE)
+            row['traced_mb'] = round(tracemalloc.get_traced_memory()[0] / 2 ** 20, 3)
+            row['top_allocations'] = [f"{_site(stat)} {stat.size / 1024:.1f} KiB in {stat.count}"
+                                      for stat in snapshot.statistics('lineno')[:self.top]]
+            if self._first_snapshot is None:
+                self._first_snapshot = snapshot
+            self._last_snapshot = snapshot
+        self.samples.append(row)
+        return row
+
+    def top_growth(self) -> List[str]:
+        """
+        The allocation sites that grew most between the first and last samples
+        """
+        if self._first_snapshot is None or self._last_snapshot is self._first_snapshot:
+            return []
+        diffs = self._last_snapshot.compare_to(self._first_snapshot, 'lineno')
+        return [f"{_site(diff)} {diff.size_diff / 1024:+.1f} KiB, {diff.count_diff:+d} blocks"
+                for diff in diffs[:self.top] if diff.size_diff > 0]
+
+
+def trend(samples: Sequence[Dict[str, Any]], key: str) -> Optional[Dict[str, Any]]:
+    """
+    Least-squares growth of one series per 1000 games, skipping the first
+    (warm-up) sample when there are enough, and whether it passes its limit
+    """
+    points = [(s['games'], s[key]) for s in samples if key in s]
+    if len(points) >= 3:
+        points = points[1:]
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / spread if spread else 0.0
+    per_1000 = slope * 1000
+    growth = per_1000 / mean_y if key in RELATIVE_TRENDS and mean_y else per_1000
+    return {
+        'first': points[0][1],
+        'last': points[-1][1],
+        'per_1000_games': round(per_1000, 4),
+        'flagged': growth > TREND_LIMITS[key],
+    }
+
+
+def run_soak(games: int, mode: str = 'auto', speed: str = "0", interval: int = 50, seed: int = 0,
+             trace: bool = True, top: int = TOP_ALLOCATIONS) -> Dict[str, Any]:
+    """
+    Plays <games> games through the UI in 'auto' (Bot vs Bot at <speed>) or
+    'practice' mode, and returns the report
+    """
+    # The driver sets SDL up for headless running, so only import it here
+    from .ui_driver import UIDriver, auto_script, practice_script
+
+    monitor = SoakMonitor(interval, trace, top)
+    if mode == 'auto':
+        script = auto_script(speed, games, monitor.on_game_over)
+    else:
+        script = practice_script("Soak", games, monitor.on_game_over)
+
+    stopped = None
+    if trace:
+        tracemalloc.start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="yahtzee-soak-") as workdir:
+            driver = UIDriver(script, seed=seed, workdir=workdir, time_frames=True)
+            try:
+                driver.run()
+            except STOPPING_ERRORS as e:
+                stopped = f"{type(e).__name__} after {monitor.games} games: {e}"
+    finally:
+        growth = monitor.top_growth()
+        if trace:
+            tracemalloc.stop()
+
+    trends = {}
+    for key in TREND_LIMITS:
+        result = trend(monitor.samples, key)
+        if result is not None:
+            trends[key] = result
+    return {
+        'mode': mode,
+        'games': monitor.games,
+        'seed': seed,
+        'elapsed_s': round(time.perf_counter() - monitor.started, 2),
+        'recursion_limit': sys.getrecursionlimit(),
+        'stopped': stopped,
+        'flagged': [key for key, result in trends.items() if result['flagged']],
+        'trends': trends,
+        'top_growth': growth,
+        'samples': monitor.samples,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """
+    Prints the samples table, trends and allocation growth
+    """
+    print(f"{report['games']} {report['mode']} games in {report['elapsed_s']:.1f}s")
+    print(f"{'games':>7} {'rss MB':>8} {'traced MB':>10} {'stack':>6} {'frames':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for s in report['samples']:
+        print(f"{s['games']:>7} {s['rss_mb']:>8.1f} {s.get('traced_mb', 0):>10.2f} {s['stack_depth']:>6} "
+              f"{s['frames']:>7} {s['frame_p50_ms']:>8.2f} {s['frame_p95_ms']:>8.2f} {s['frame_p99_ms']:>8.2f}")
+    print()
+    for key, result in report['trends'].items():
+        mark = "GROWING" if result['flagged'] else "ok"
+        print(f"{key:<14} {result['first']:>10} -> {result['last']:<10} "
+              f"{result['per_1000_games']:+.3f} per 1000 games  {mark}")
+    if report['top_growth']:
+        print("\nLargest allocation growth:")
+        for line in report['top_growth']:
+            print(f"  {line}")
+    if report['stopped']:
+        print(f"\nStopped early: {report['stopped']} (recursion limit {report['recursion_limit']})")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Soak test the Yahtzee UI flow for growth over many games")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--mode', choices=['auto', 'practice'], default='auto')
+    parser.add_argument('--speed', default="0", help="Bot vs Bot speed-up in auto mode (0 for uncapped)")
+    parser.add_argument('--interval', type=int, default=50, help="games between samples")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--top', type=int, default=TOP_ALLOCATIONS, help="allocation sites to list")
+    parser.add_argument('--no-tracemalloc', action='store_true', help="skip allocation tracing, which slows games")
+    parser.add_argument('--report', default=None, help="write the full report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = run_soak(args.games, args.mode, args.speed, args.interval, args.seed,
+                      not args.no_tracemalloc, args.top)
+    print_report(report)
+    if args.report:
+        import json
+        from .score_writer import atomic_write_text
+        atomic_write_text(args.report, json.dumps(report, indent=2))
+    if report['flagged'] or report['stopped']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
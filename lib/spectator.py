@@ -0,0 +1,360 @@
+"""
+Spectator view: many headless bot games on background threads, shown as a
+grid of thumbnails in one window.
+
+The games run as fast as they can; the window samples them. Each frame only
+redraws thumbnails whose game has moved on, and stops once the frame's render
+budget is spent, carrying on with the next thumbnails in the following frame.
+
+Run with e.g. `python -m lib.spectator ev greedy --tables 16`
+"""
+import argparse
+import math
+import threading
+import time
+from random import Random
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from .game_logic import YahtzeeGame
+from .outcomes import CATEGORIES
+from .strategy import available_strategies
+
+# Short category labels for the thumbnails, in scorecard order
+CATEGORY_LABELS = ['1s', '2s', '3s', '4s', '5s', '6s', '3K', '4K', 'FH', 'SS', 'LS', 'Y', 'Ch']
+
+# Height of the summary strip above the thumbnails
+HEADER_HEIGHT = 40
+
+
+class TableSnapshot(NamedTuple):
+    """
+    Immutable view of a table, published after every turn for the renderer
+    """
+    version: int
+    games: int
+    round: int
+    seat: int
+    dice: Tuple[int, ...]
+    category: str
+    totals: Tuple[int, ...]
+    # Per seat, the category scores (None where not yet scored)
+    scores: Tuple[Tuple[Optional[int], ...], ...]
+    wins: Tuple[int, ...]
+    # Games with no outright winner
+    ties: int
+
+
+class SpectatedTable:
+    """
+    One headless bot game, played over and over
+    """
+
+    def __init__(self, table_id: int, strategies: Sequence[str], seed: int):
+        self.table_id = table_id
+        self.strategies = list(strategies)
+        self.game = YahtzeeGame(load_high_scores=False)
+        self.rng = Random(seed)
+        self.games = 0
+        self.turns = 0
+        self.wins = [0] * len(strategies)
+        self.ties = 0
+        self._version = 0
+        self.snapshot: Optional[TableSnapshot] = None
+        self._new_game()
+
+    def _new_game(self) -> None:
+        """
+        Start the next game at this table
+        """
+        seats = [f"{name} #{i + 1}" for i, name in enumerate(self.strategies)]
+        self.game.setup_new_game(*seats, bots=self.strategies)
+        self._publish(-1, "")
+
+    def step(self) -> None:
+        """
+        Play one bot turn, starting a new game once this one is over
+        """
+        game = self.game
+        seat = game.current_player
+        game.reset_turn()
+        game.active_dice.rng = self.rng
+        category = game.process_turn_ai(game.scorecards[seat], self.strategies[seat])
+        self.turns += 1
+        self._publish(seat, category)
+        game.end_turn()
+
+        if game.is_game_over():
+            if len(self.strategies) > 1:
+                # Only an outright best score is a win, as in the tournament
+                totals = list(game.board.totals)
+                best = max(totals)
+                if totals.count(best) == 1:
+                    self.wins[totals.index(best)] += 1
+                else:
+                    self.ties += 1
+            self.games += 1
+            self._new_game()
+
+    def _publish(self, seat: int, category: str) -> None:
+        """
+        Replace the snapshot; a single assignment, so readers never see a half-made one
+        """
+        game = self.game
+        self._version += 1
+        self.snapshot = TableSnapshot(
+            version=self._version,
+            games=self.games,
+            round=game.current_round,
+            seat=seat,
+            dice=tuple(game.active_dice.rolled),
+            category=category,
+            totals=tuple(scorecard.total_score for scorecard in game.scorecards),
+            scores=tuple(tuple(scorecard.scores[c] for c in CATEGORIES) for scorecard in game.scorecards),
+            wins=tuple(self.wins),
+            ties=self.ties,
+        )
+
+
+class Spectator:
+    """
+    Runs the tables on background threads, each thread stepping its share of
+    the tables in turn
+    """
+
+    def __init__(self, strategies: Sequence[str], tables: int, threads: int = 2, seed: int = 0):
+        self.strategies = list(strategies)
+        self.tables = [SpectatedTable(n, strategies, seed + n) for n in range(tables)]
+        self.running = threading.Event()
+        self.running.set()
+        self._stop = threading.Event()
+        threads = max(1, min(threads, tables))
+        self.threads = [threading.Thread(target=self._run, args=(self.tables[n::threads],),
+                                         name=f"spectator-{n}", daemon=True)
+                        for n in range(threads)]
+
+    def start(self) -> None:
+        """
+        Start the simulation threads
+        """
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the simulation threads
+        """
+        self._stop.set()
+        self.running.set()
+        for thread in self.threads:
+            thread.join()
+
+    def _run(self, tables: List[SpectatedTable]) -> None:
+        while not self._stop.is_set():
+            self.running.wait()
+            for table in tables:
+                table.step()
+
+    def games_played(self) -> int:
+        """
+        Total games finished over all tables
+        """
+        return sum(table.games for table in self.tables)
+
+
+def grid(count: int, width: int, height: int) -> List[Tuple[int, int, int, int]]:
+    """
+    Returns a rect per thumbnail, filling <width> x <height> as evenly as possible
+    """
+    cols = max(1, math.ceil(math.sqrt(count * width / height)))
+    rows = math.ceil(count / cols)
+    cell_w, cell_h = width // cols, height // rows
+    return [((n % cols) * cell_w, HEADER_HEIGHT + (n // cols) * cell_h, cell_w, cell_h) for n in range(count)]
+
+
+class SpectatorUI:
+    """
+    Draws the spectated tables as thumbnails, within a per-frame time budget
+    """
+
+    def __init__(self, spectator: Spectator, budget_ms: float = 8.0, fps: int = 30):
+        # pygame opens the window on import, so only import the UI here
+        import pygame
+        from .ui_common import WIDTH, HEIGHT
+
+        self.spectator = spectator
+        self.budget_ms = budget_ms
+        self.fps = fps
+        rects = grid(len(spectator.tables), WIDTH, HEIGHT - HEADER_HEIGHT)
+        self.rects = [pygame.Rect(rect) for rect in rects]
+        self._cursor = 0
+        self._layout()
+
+    def _layout(self) -> None:
+        """
+        Sets up the thumbnails for the canvas's current scale. They are drawn
+        in pixels, so fonts and dice are sized to the thumbnails' pixel size.
+        """
+        from .ui_common import SCREEN, font
+
+        self.canvas_version = SCREEN.version
+        self.thumbnails = [SCREEN.subsurface(rect) for rect in self.rects]
+        # Snapshot version last drawn for each table
+        self.drawn = [-1] * len(self.spectator.tables)
+
+        cell_w, cell_h = self.thumbnails[0].get_size()
+        self.row_height = max(8, (cell_h - 8) // (len(CATEGORIES) + 4))
+        self.font = font(max(8, self.row_height - 1))
+        self.die_size = min(round(30 * SCREEN.scale), self.row_height * 2, (cell_w - 20) // 5)
+        self.dice = self._scaled_dice(self.die_size)
+
+    @staticmethod
+    def _scaled_dice(size: int) -> dict:
+        """
+        Mini dice images scaled to <size> pixels
+        """
+        from .ui_common import die_image
+
+        return {n: die_image(n, size) for n in range(1, 7)}
+
+    def draw_table(self, index: int, snap: TableSnapshot) -> None:
+        """
+        Draws one table into its thumbnail
+        """
+        import pygame
+        from .ui_common import BLACK, WHITE, RED, POOL_TABLE_GREEN
+
+        surface = self.thumbnails[index]
+        width, height = surface.get_size()
+        font, row = self.font, self.row_height
+        surface.fill(POOL_TABLE_GREEN)
+        pygame.draw.rect(surface, BLACK, surface.get_rect(), 1)
+
+        title = f"Table {index + 1}  game {snap.games + 1}  round {min(snap.round + 1, 13)}"
+        surface.blit(font.render(title, True, BLACK), (5, 3))
+
+        y = 5 + row
+        for i, value in enumerate(snap.dice):
+            surface.blit(self.dice[value], (5 + i * (self.die_size + 2), y))
+        if snap.category:
+            surface.blit(font.render(snap.category, True, WHITE), (10 + 5 * (self.die_size + 2), y))
+
+        # Mini scorecards: a label column, then one column per seat
+        y += self.die_size + 4
+        column = (width - 30) // len(snap.totals)
+        for seat, (total, wins) in enumerate(zip(snap.totals, snap.wins)):
+            colour = RED if seat == snap.seat else BLACK
+            surface.blit(font.render(f"{total} ({wins}w)", True, colour), (30 + seat * column, y))
+        for c, label in enumerate(CATEGORY_LABELS):
+            y_row = y + (c + 1) * row
+            if y_row + row > height:
+                break
+            surface.blit(font.render(label, True, BLACK), (5, y_row))
+            for seat, scores in enumerate(snap.scores):
+                score = scores[c]
+                surface.blit(font.render("-" if score is None else str(score), True, WHITE),
+                             (30 + seat * column, y_row))
+
+    def draw_header(self, games_per_sec: float) -> None:
+        """
+        Draws the summary strip: throughput and wins per strategy
+        """
+        from .ui_common import SCREEN, WIDTH, FONT, WHITE, POOL_TABLE_GREEN, draw_rect
+
+        draw_rect(SCREEN, POOL_TABLE_GREEN, (0, 0, WIDTH, HEADER_HEIGHT))
+        wins = [0] * len(self.spectator.strategies)
+        ties = 0
+        for table in self.spectator.tables:
+            for seat, count in enumerate(table.wins):
+                wins[seat] += count
+            ties += table.ties
+        text = (f"{self.spectator.games_played()} games, {games_per_sec:.0f}/sec   " +
+                "  ".join(f"{name}: {count} wins" for name, count in zip(self.spectator.strategies, wins)) +
+                f"  ties: {ties}")
+        if not self.spectator.running.is_set():
+            text += "   PAUSED"
+        SCREEN.blit(FONT.render(text, True, WHITE), (10, 8))
+
+    def draw_frame(self) -> List:
+        """
+        Redraws changed thumbnails until the budget runs out, starting where
+        the last frame left off. Returns the rects drawn.
+        """
+        from .ui_common import SCREEN
+
+        if SCREEN.version != self.canvas_version:
+            # Resized: the thumbnails are new, and blank
+            self._layout()
+        tables = self.spectator.tables
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        updated = []
+        for _ in range(len(tables)):
+            index = self._cursor
+            self._cursor = (self._cursor + 1) % len(tables)
+            snap = tables[index].snapshot
+            if snap is None or snap.version == self.drawn[index]:
+                continue
+            self.draw_table(index, snap)
+            self.drawn[index] = snap.version
+            updated.append(self.rects[index])
+            if time.perf_counter() >= deadline:
+                break
+        return updated
+
+    def run(self) -> None:
+        """
+        Window loop. Space pauses the games, Q or closing the window quits.
+        """
+        import pygame
+        from .ui_common import SCREEN, WIDTH, POOL_TABLE_GREEN, present
+
+        SCREEN.fill(POOL_TABLE_GREEN)
+        present()
+        clock = pygame.time.Clock()
+        self.spectator.start()
+        last_time, last_games = time.perf_counter(), 0
+        rate = 0.0
+        try:
+            while True:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_q):
+                        return
+                    if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                        if self.spectator.running.is_set():
+                            self.spectator.running.clear()
+                        else:
+                            self.spectator.running.set()
+
+                now = time.perf_counter()
+                if now - last_time >= 1.0:
+                    games = self.spectator.games_played()
+                    rate = (games - last_games) / (now - last_time)
+                    last_time, last_games = now, games
+
+                self.draw_header(rate)
+                updated = self.draw_frame()
+                present([pygame.Rect(0, 0, WIDTH, HEADER_HEIGHT)] + updated)
+                clock.tick(self.fps)
+        finally:
+            self.spectator.stop()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Watch many bot games at once")
+    parser.add_argument('strategies', nargs='*', choices=available_strategies(), default=['ev', 'greedy'],
+                        help="strategy at each seat")
+    parser.add_argument('--tables', type=int, default=9)
+    parser.add_argument('--threads', type=int, default=2, help="simulation threads")
+    parser.add_argument('--budget', type=float, default=8.0, help="render budget per frame (ms)")
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    spectator = Spectator(args.strategies or ['ev', 'greedy'], args.tables, args.threads, args.seed)
+    SpectatorUI(spectator, args.budget, args.fps).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+Pluggable bot strategies and the registry used to look them up by name.
+
+A strategy makes two decisions: which dice to hold before each re-roll, and
+which category to score once rolling is done. The rolling itself is left to
+the caller (YahtzeeGame, the UI or a simulator), so every front end plays
+by the same rules.
+"""
+import importlib
+import time
+from array import array
+from functools import lru_cache
+from typing import Callable, Dict, List, Protocol, Sequence, Tuple, Type
+
+from .dice_logic import DiceLogic
+from .outcomes import (
+    CATEGORIES, KEEPS, KEEP_TRANSITIONS, OUTCOME_INDEX, OUTCOME_KEEPS, OUTCOMES,
+    SCORE_TABLE, holds_for_keep
+)
+from .scorecard_logic import ScorecardLogic
+
+
+class Strategy(Protocol):
+    """
+    Interface every bot strategy implements
+    """
+
+    def choose_holds(self, dice: DiceLogic, scorecard: ScorecardLogic) -> List[bool]:
+        """
+        Returns hold flags for the rolled dice. Holding all five ends the turn.
+        """
+
+    def choose_category(self, dice: DiceLogic, scorecard: ScorecardLogic) -> str:
+        """
+        Returns the open category to score the rolled dice in
+        """
+
+
+class CallStats:
+    """
+    Call count and latency totals for one strategy method
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, elapsed_ns: int) -> None:
+        """
+        Records one call
+        """
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def merge(self, other: 'CallStats') -> None:
+        """
+        Adds another set of counters (e.g. from a worker process) into this one
+        """
+        self.calls += other.calls
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+    def mean_us(self) -> float:
+        """
+        Returns the mean call latency in microseconds
+        """
+        return self.total_ns / self.calls / 1000 if self.calls else 0.0
+
+
+class TimedStrategy:
+    """
+    Wraps a strategy and counts the latency of each of its calls
+    """
+
+    def __init__(self, name: str, strategy: Strategy):
+        self.name = name
+        self.strategy = strategy
+        self.holds_stats = CallStats()
+        self.category_stats = CallStats()
+
+    def choose_holds(self, dice: DiceLogic, scorecard: ScorecardLogic) -> List[bool]:
+        """
+        Times and forwards a hold decision
+        """
+        start = time.perf_counter_ns()
+        held = self.strategy.choose_holds(dice, scorecard)
+        self.holds_stats.add(time.perf_counter_ns() - start)
+        return held
+
+    def choose_category(self, dice: DiceLogic, scorecard: ScorecardLogic) -> str:
+        """
+        Times and forwards a category decision
+        """
+        start = time.perf_counter_ns()
+        category = self.strategy.choose_category(dice, scorecard)
+        self.category_stats.add(time.perf_counter_ns() - start)
+        return category
+
+
+# Registered strategy classes, and the timed instances handed out so far
+_REGISTRY: Dict[str, Type] = {}
+_INSTANCES: Dict[str, TimedStrategy] = {}
+# Strategies defined in their own modules, which register themselves when
+# imported. They import this module, and some solve tables at import, so
+# they're only imported when first asked for.
+_LAZY_MODULES = {'montecarlo': 'mc_strategy', 'compact': 'compact_table', 'heuristic': 'heuristic'}
+
+
+def register_strategy(name: str) -> Callable[[Type], Type]:
+    """
+    Class decorator which registers a strategy under <name>
+    """
+    def decorator(cls: Type) -> Type:
+        _REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+def available_strategies() -> List[str]:
+    """
+    Returns the names of all registered strategies
+    """
+    return sorted(set(_REGISTRY) | set(_LAZY_MODULES))
+
+
+def get_strategy(name: str) -> TimedStrategy:
+    """
+    Returns the shared, timed instance of the named strategy
+    """
+    if name not in _INSTANCES:
+        if name not in _REGISTRY and name in _LAZY_MODULES:
+            importlib.import_module(f".{_LAZY_MODULES[name]}", __package__)
+        if name not in _REGISTRY:
+            raise ValueError(f"Unknown strategy: {name}")
+        _INSTANCES[name] = TimedStrategy(name, _REGISTRY[name]())
+    return _INSTANCES[name]
+
+
+def strategy_latency() -> Dict[str, Tuple[CallStats, CallStats]]:
+    """
+    Returns (choose_holds, choose_category) latency counters per strategy used in this process
+    """
+    return {name: (s.holds_stats, s.category_stats) for name, s in _INSTANCES.items()}
+
+
+def reset_latency() -> None:
+    """
+    Zeroes the latency counters of every strategy
+    """
+    for s in _INSTANCES.values():
+        s.holds_stats = CallStats()
+        s.category_stats = CallStats()
+
+
+def best_raw_category(dice_values: List[int], scorecard: ScorecardLogic) -> str:
+    """
+    Returns the open category with the highest immediate score
+    """
+    best_category = ""
+    best_score = -1
+    for category in scorecard.get_all_categories():
+        if not scorecard.is_category_used(category):
+            score = scorecard.calculate_score(dice_values, category)
+            if score > best_score:
+                best_score = score
+                best_category = category
+    return best_category
+
+
+@register_strategy("greedy")
+class GreedyStrategy:
+    """
+    Holds the most common value and takes the highest immediate score
+    """
+
+    def choose_holds(self, dice: DiceLogic, scorecard: ScorecardLogic) -> List[bool]:
+        """
+        Holds every die showing the most common value
+        """
+        counts: Dict[int, int] = {}
+        for die in dice.rolled:
+            counts[die] = counts.get(die, 0) + 1
+
+        common_value, _ = max(counts.items(), key=lambda x: x[1])
+        return [die == common_value for die in dice.rolled]
+
+    def choose_category(self, dice: DiceLogic, scorecard: ScorecardLogic) -> str:
+        """
+        Picks the open category with the highest score
+        """
+        return best_raw_category(dice.rolled, scorecard)
+
+
+@register_strategy("lazy")
+class LazyStrategy:
+    """
+    Baseline bot which never re-rolls
+    """
+
+    def choose_holds(self, dice: DiceLogic, scorecard: ScorecardLogic) -> List[bool]:
+        """
+        Holds everything, ending the turn after the first roll
+        """
+        return [True] * len(dice.rolled)
+
+    def choose_category(self, dice: DiceLogic, scorecard: ScorecardLogic) -> str:
+        """
+        Picks the open category with the highest score
+        """
+        return best_raw_category(dice.rolled, scorecard)
+
+
+# Average score of each category under good play. The EV strategy scores a
+# category relative to these, so it doesn't burn e.g. Chance on a mediocre roll.
+CATEGORY_BASELINES = [2.1, 5.3, 8.6, 12.2, 15.7, 19.2,
+                      21.7, 13.1, 22.6, 29.5, 32.7, 16.9, 22.0]
+# Points a joker Yahtzee scores in categories it wouldn't normally fill
+JOKER_SCORES = {'Full House': 25, 'Small Straight': 30, 'Large Straight': 40}
+# Extra credit per point scored above par (three of a kind) in an upper category
+UPPER_BONUS_WEIGHT = 0.5
+
+
+def category_value(outcome: int, category: int) -> float:
+    """
+    Returns the end-of-turn value of scoring an outcome in a category
+    """
+    score = SCORE_TABLE[outcome][category]
+    value = score - CATEGORY_BASELINES[category]
+    if category < 6:
+        value += UPPER_BONUS_WEIGHT * (score - 3 * (category + 1))
+    return value
+
+
+# VALUES[outcome][category], precomputed
+VALUES = [[category_value(o, c) for c in range(len(CATEGORIES))] for o in range(len(OUTCOMES))]
+
+
+def open_mask(scorecard: ScorecardLogic) -> int:
+    """
+    Returns a bitmask of the scorecard's open categories
+    """
+    mask = 0
+    for i, category in enumerate(CATEGORIES):
+        if not scorecard.is_category_used(category):
+            mask |= 1 << i
+    return mask
+
+
+def solve_turn(values: Sequence[Sequence[float]], mask: int) -> Tuple[array, array]:
+    """
+    Solves one turn exactly for a set of open categories, given the value of
+    scoring each outcome in each category (values[outcome][category]).
+
+    Returns the expected end-of-turn value of every keep with one roll left
+    and with two rolls left, indexed like KEEPS.
+    """
+    open_cats = [c for c in range(len(values[0])) if mask & (1 << c)]
+    # Value of stopping on each outcome
+    stop = [max(row[c] for c in open_cats) for row in values]
+
+    def keep_values(outcome_values: List[float]) -> array:
+        result = array('d', bytes(8 * len(KEEPS)))
+        for k, (indices, probs) in enumerate(KEEP_TRANSITIONS):
+            result[k] = sum(p * outcome_values[o] for o, p in zip(indices, probs))
+        return result
+
+    one_left = keep_values(stop)
+    # Best value of each outcome with one roll still to come
+    best = [max(one_left[k] for k in keeps) for keeps in OUTCOME_KEEPS]
+    two_left = keep_values(best)
+    return one_left, two_left
+
+
+@lru_cache(maxsize=1024)
+def turn_table(mask: int) -> Tuple[array, array]:
+    """
+    solve_turn() for the standard rules, cached by open categories
+    """
+    return solve_turn(VALUES, mask)
+
+
+@register_strategy("ev")
+class EVStrategy:
+    """
+    One-turn expected value heuristic: the current turn is solved exactly over
+    all holds and re-rolls, but the game beyond it is only approximated by
+    valuing each category against its usual score (CATEGORY_BASELINES)
+    """
+
+    def choose_holds(self, dice: DiceLogic, scorecard: ScorecardLogic) -> List[bool]:
+        """
+        Holds the dice with the best expected end-of-turn value
+        """
+        # Rules variant scorecards bring their own tables
+        rules = getattr(scorecard, 'rules', None)
+        if rules is not None:
+            one_left, two_left = rules.turn_table(rules.open_mask(scorecard))
+        else:
+            one_left, two_left = turn_table(open_mask(scorecard))
+        table = one_left if dice.rolls_left <= 1 else two_left
+        keeps = OUTCOME_KEEPS[OUTCOME_INDEX[tuple(sorted(dice.rolled))]]
+        best = max(keeps, key=lambda k: table[k])
+        return holds_for_keep(dice.rolled, KEEPS[best])
+
+    def choose_category(self, dice: DiceLogic, scorecard: ScorecardLogic) -> str:
+        """
+        Picks the open category with the best value, applying joker scores
+        """
+        return ev_category(dice.rolled, scorecard)
+
+
+def ev_category(dice_values: Sequence[int], scorecard: ScorecardLogic) -> str:
+    """
+    Returns the open category with the best EV bot value for the dice, applying joker scores
+    """
+    rules = getattr(scorecard, 'rules', None)
+    if rules is not None:
+        return rules.best_category(dice_values, scorecard)
+
+    values = VALUES[OUTCOME_INDEX[tuple(sorted(dice_values))]]
+    joker = len(set(dice_values)) == 1 and bool(scorecard.scores['Yahtzee'])
+    best_category = ""
+    best_value = float('-inf')
+    for i, category in enumerate(CATEGORIES):
+        if scorecard.is_category_used(category):
+            continue
+        value = values[i]
+        if joker and category in JOKER_SCORES:
+            value += JOKER_SCORES[category]
+        if value > best_value:
+            best_value = value
+            best_category = category
+    return best_category
+
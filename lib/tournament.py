@@ -0,0 +1,267 @@
+"""
+Headless tournament runner which pits bot strategies against each other.
+
+Run with e.g. `python -m lib.tournament greedy lazy --format solitaire`
+"""
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from random import Random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .game_logic import YahtzeeGame
+from .rules import get_rules
+from .scorecard_logic import ScorecardLogic
+from .strategy import CallStats, available_strategies, reset_latency, strategy_latency
+
+# Reusable game objects in this worker process, by rules variant (None for standard rules)
+_GAMES: Dict[Optional[str], YahtzeeGame] = {}
+
+
+def _worker_game(rules: Optional[str] = None) -> YahtzeeGame:
+    """
+    Returns this process's reusable game object for a rules variant
+    """
+    if rules not in _GAMES:
+        _GAMES[rules] = YahtzeeGame(load_high_scores=False, rules=get_rules(rules) if rules else None)
+    return _GAMES[rules]
+
+
+def play_game(names: Sequence[str], seed: int, rules: Optional[str] = None) -> Tuple[int, ...]:
+    """
+    Plays one game between the named strategies and returns their final scores.
+
+    Every player rolls from its own generator seeded with <seed>, so the
+    dice a strategy sees do not depend on what its opponent does (common
+    random numbers). A single name plays a solitaire game. <rules> names a
+    rules variant to play instead of the standard game.
+    """
+    return tuple(scorecard.final_tally() for scorecard in play_scorecards(names, seed, rules))
+
+
+def play_scorecards(names: Sequence[str], seed: int, rules: Optional[str] = None) -> List[ScorecardLogic]:
+    """
+    Plays one game as play_game() does, and returns the players' final
+    scorecards, for callers that want more than the totals
+    """
+    game = _worker_game(rules)
+    # Suffix seat numbers so two copies of one strategy get distinct cards
+    seats = [f"{name} #{i + 1}" for i, name in enumerate(names)]
+    game.setup_new_game(*seats, bots=list(names))
+    scorecards = game.scorecards
+    rngs = [Random(seed) for _ in names]
+
+    while not game.is_game_over():
+        for name, scorecard, rng in zip(names, scorecards, rngs):
+            game.reset_turn()
+            game.active_dice.rng = rng
+            game.process_turn_ai(scorecard, name)
+        game.next_round()
+
+    game.active_dice.rng = None
+    return scorecards
+
+
+def _play_batch(names: Sequence[str], seeds: Sequence[int], solitaire: bool
+                ) -> Tuple[List[Tuple[int, ...]], Dict[str, Tuple[CallStats, CallStats]]]:
+    """
+    Plays a batch of games in a worker and returns one score tuple per seed,
+    plus the strategies' latency counters for the batch.
+
+    In solitaire format each strategy plays its own game on the same seed;
+    otherwise the (two) strategies play each other.
+    """
+    reset_latency()
+    if solitaire:
+        scores = [tuple(play_game([name], seed)[0] for name in names) for seed in seeds]
+    else:
+        scores = [play_game(names, seed) for seed in seeds]
+    return scores, strategy_latency()
+
+
+class RunningStats:
+    """
+    Streaming mean and variance (Welford's algorithm)
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        """
+        Adds a sample
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def confidence_interval(self, z: float = 1.96) -> Tuple[float, float]:
+        """
+        Returns the normal-approximation confidence interval of the mean
+        """
+        if self.count < 2:
+            return (self.mean, self.mean)
+        half = z * math.sqrt(self._m2 / (self.count - 1) / self.count)
+        return (self.mean - half, self.mean + half)
+
+
+class SequentialTest:
+    """
+    Two-sided Wald sequential probability ratio test on paired win/loss outcomes.
+
+    H0 is that both strategies win half of the decisive games; the alternatives
+    are that one of them wins at least 0.5 + <delta>. Ties are ignored.
+    """
+
+    def __init__(self, delta: float = 0.05, alpha: float = 0.05, beta: float = 0.1):
+        p1 = 0.5 + delta
+        self.win_step = math.log(2 * p1)
+        self.loss_step = math.log(2 * (1 - p1))
+        # Each side gets half the type I error budget
+        self.upper = math.log((1 - beta) / (alpha / 2))
+        self.lower = math.log(beta / (1 - alpha / 2))
+        self.wins = 0
+        self.losses = 0
+        self.ties = 0
+        self.decision: Optional[str] = None
+
+    def add(self, score_a: int, score_b: int) -> None:
+        """
+        Records one paired outcome and updates the decision
+        """
+        if score_a > score_b:
+            self.wins += 1
+        elif score_a < score_b:
+            self.losses += 1
+        else:
+            self.ties += 1
+
+        if self.decision is not None:
+            return
+        llr_a = self.wins * self.win_step + self.losses * self.loss_step
+        llr_b = self.wins * self.loss_step + self.losses * self.win_step
+        if llr_a >= self.upper:
+            self.decision = 'A stronger'
+        elif llr_b >= self.upper:
+            self.decision = 'B stronger'
+        elif llr_a <= self.lower and llr_b <= self.lower:
+            self.decision = 'no difference'
+
+    def win_rate(self) -> float:
+        """
+        Returns A's win rate, counting ties as half a win
+        """
+        played = self.wins + self.losses + self.ties
+        return (self.wins + 0.5 * self.ties) / played if played else 0.0
+
+
+def run_tournament(names: Sequence[str], solitaire: bool = True, max_games: int = 20000,
+                   batch_size: int = 100, workers: Optional[int] = None, seed: int = 0,
+                   delta: float = 0.05) -> None:
+    """
+    Runs games in batches over a process pool until every pairing has a
+    significant result (or <max_games> seeds are used), then prints a report
+    """
+    for name in names:
+        if name not in available_strategies():
+            raise ValueError(f"Unknown strategy: {name}")
+    if len(names) < 2:
+        raise ValueError("A tournament needs at least two strategies")
+    if not solitaire and len(names) != 2:
+        raise ValueError("The two-player format takes exactly two strategies")
+
+    workers = workers or os.cpu_count() or 1
+    # Results are kept per seat, as a strategy can take more than one (e.g. playing itself)
+    if len(set(names)) < len(names):
+        labels = [f"{name} #{i + 1}" for i, name in enumerate(names)]
+    else:
+        labels = list(names)
+    stats = [RunningStats() for _ in names]
+    # Latency is only measured per strategy
+    latency = {name: (CallStats(), CallStats()) for name in dict.fromkeys(names)}
+    pairs = {pair: SequentialTest(delta) for pair in combinations(range(len(names)), 2)}
+    next_seed = seed
+    games = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while games < max_games and any(t.decision is None for t in pairs.values()):
+            # One round of batches across all workers, then check the stopping rule
+            futures = []
+            for _ in range(workers):
+                count = min(batch_size, max_games - (next_seed - seed))
+                if count <= 0:
+                    break
+                futures.append(pool.submit(_play_batch, names,
+                                           range(next_seed, next_seed + count), solitaire))
+                next_seed += count
+
+            for future in futures:
+                batch, batch_latency = future.result()
+                for name, (holds, category) in batch_latency.items():
+                    if name not in latency:
+                        continue
+                    latency[name][0].merge(holds)
+                    latency[name][1].merge(category)
+                for scores in batch:
+                    games += 1
+                    for seat, score in enumerate(scores):
+                        stats[seat].add(score)
+                    for (a, b), test in pairs.items():
+                        test.add(scores[a], scores[b])
+
+    elapsed = time.perf_counter() - start
+    fmt = 'solitaire' if solitaire else 'two-player'
+    print(f"{' vs '.join(names)} ({fmt}): {games} games in {elapsed:.1f}s "
+          f"({games / elapsed:.0f} games/sec)")
+    print()
+    print(f"{'strategy':<12}{'mean':>8}   95% CI")
+    for label, seat_stats in zip(labels, stats):
+        low, high = seat_stats.confidence_interval()
+        print(f"{label:<12}{seat_stats.mean:>8.1f}   [{low:.1f}, {high:.1f}]")
+    print()
+    print(f"{'pairing':<24}{'W':>7}{'L':>7}{'T':>7}{'win rate':>10}   result")
+    for (a, b), test in pairs.items():
+        label = f"{labels[a]} vs {labels[b]}"
+        if test.decision == 'A stronger':
+            result = f"{labels[a]} stronger"
+        elif test.decision == 'B stronger':
+            result = f"{labels[b]} stronger"
+        else:
+            result = test.decision or 'undecided'
+        print(f"{label:<24}{test.wins:>7}{test.losses:>7}{test.ties:>7}"
+              f"{test.win_rate():>10.3f}   {result}")
+    print()
+    print(f"{'strategy':<12}{'holds (us)':>12}{'max':>10}{'category (us)':>16}{'max':>10}")
+    for name, (holds, category) in latency.items():
+        print(f"{name:<12}{holds.mean_us():>12.1f}{holds.max_ns / 1000:>10.0f}"
+              f"{category.mean_us():>16.1f}{category.max_ns / 1000:>10.0f}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Compare Yahtzee bot strategies")
+    parser.add_argument('strategies', nargs='+', choices=available_strategies())
+    parser.add_argument('--format', choices=['solitaire', 'two-player'], default='solitaire')
+    parser.add_argument('--max-games', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--delta', type=float, default=0.05,
+                        help="smallest win-rate edge over 0.5 worth detecting")
+    args = parser.parse_args(argv)
+
+    run_tournament(args.strategies, args.format == 'solitaire', args.max_games,
+                   args.batch_size, args.workers, args.seed, args.delta)
+
+
+if __name__ == "__main__":
+    main()
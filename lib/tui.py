@@ -0,0 +1,386 @@
+"""
+Terminal front end: plays Yahtzee in a terminal with curses, without pygame.
+
+Every mode of the pygame UI is here: practice, human vs human, human vs
+bot, bot vs bot and multi-player. High scores, the game history and saved
+games are shared with the pygame UI. The screen is kept as a buffer of rows
+and only rows whose text changed are rewritten, so playing over a slow SSH
+link stays snappy.
+
+Run with `python -m lib.tui`
+"""
+import curses
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from .events import stream_from_env
+from .game_logic import BOT_NAME, MAX_PLAYERS, MAX_ROUNDS, YahtzeeGame
+from .snapshot import clear_snapshot, load_snapshot, restore_game, save_snapshot
+
+# Key that scores each category, in scorecard order
+CATEGORY_KEYS = "abcdefghijklm"
+# How long a bot's turn stays on screen (ms)
+BOT_DELAY_MS = 800
+# Width of each player's scorecard column
+COLUMN_WIDTH = 14
+
+
+class ScreenBuffer:
+    """
+    Remembers the text on each terminal row, and only rewrites rows that change
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.rows: Dict[int, Tuple[str, int]] = {}
+
+    def put(self, row: int, text: str, attr: int = curses.A_NORMAL) -> None:
+        """
+        Sets one row's text, padded to the window width
+        """
+        height, width = self.window.getmaxyx()
+        if row >= height:
+            return
+        text = text[:width - 1].ljust(width - 1)
+        if self.rows.get(row) == (text, attr):
+            return
+        self.rows[row] = (text, attr)
+        try:
+            self.window.addstr(row, 0, text, attr)
+        except curses.error:
+            pass
+
+    def show(self, lines: List[Tuple[str, int]]) -> None:
+        """
+        Puts a whole screen of rows, blanking any rows left over from the last screen
+        """
+        for row, (text, attr) in enumerate(lines):
+            self.put(row, text, attr)
+        for row in [r for r in self.rows if r >= len(lines)]:
+            self.put(row, "")
+        self.flush()
+
+    def reset(self) -> None:
+        """
+        Forgets the buffer, e.g. after the terminal is resized
+        """
+        self.rows.clear()
+        self.window.erase()
+
+    def flush(self) -> None:
+        """
+        Sends the changes to the terminal
+        """
+        self.window.noutrefresh()
+        curses.doupdate()
+
+
+class TerminalUI:
+    """
+    Drives YahtzeeGame from the keyboard
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.screen = ScreenBuffer(window)
+        self.game = YahtzeeGame()
+        # Stream the games played to an analytics file, if YAHTZEE_EVENTS names one
+        self.game.events = stream_from_env()
+        self.player_names: List[str] = []
+        self.show_odds = False
+        self.message = ""
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+
+    def key(self) -> int:
+        """
+        Waits for a key, redrawing from scratch if the terminal is resized
+        """
+        key = self.window.getch()
+        if key == curses.KEY_RESIZE:
+            self.screen.reset()
+        return key
+
+    def prompt(self, question: str) -> str:
+        """
+        Asks for a line of text
+        """
+        self.screen.show([(question, curses.A_BOLD), ("", 0)])
+        curses.echo()
+        try:
+            curses.curs_set(1)
+        except curses.error:
+            pass
+        answer = self.window.getstr(1, 0, 40).decode('utf-8', 'replace')
+        curses.noecho()
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        self.screen.reset()
+        return answer.strip()
+
+    def run(self) -> None:
+        """
+        Menu, games and game-over screens, until the player quits
+        """
+        snapshot = load_snapshot()
+        if snapshot and self._ask_resume(snapshot):
+            restore_game(self.game, snapshot)
+            self.player_names = list(self.game.player_names)
+            choice = self.play(resume=True)
+        else:
+            choice = 'n'
+
+        while True:
+            if choice == 'n':
+                self.player_names = self.menu()
+            choice = self.play()
+
+    def _ask_resume(self, snapshot: dict) -> bool:
+        players = " vs. ".join(snapshot['players'])
+        self.screen.show([(f"Resume your unfinished game? {players}, round {snapshot['round'] + 1}", curses.A_BOLD),
+                          ("", 0), ("(Y)es, resume  /  (N)o, start a new game", 0)])
+        while True:
+            key = self.key()
+            if key in (ord('y'), ord('Y')):
+                return True
+            if key in (ord('n'), ord('N')):
+                clear_snapshot()
+                return False
+
+    def menu(self) -> List[str]:
+        """
+        Picks a game mode and gets the player names
+        """
+        lines = [("Yahtzee", curses.A_BOLD), ("", 0),
+                 ("(P)ractice - play by yourself", 0),
+                 ("(H)uman vs Human", 0),
+                 ("(B)ot vs Human", 0),
+                 ("(A)uto - Bot vs Bot", 0),
+                 (f"(M)ulti-player - 2 to {MAX_PLAYERS} players, humans or bots", 0),
+                 ("", 0),
+                 ("(V)iew high scores   (Q)uit", 0)]
+        while True:
+            self.screen.show(lines)
+            key = self.key()
+            if key in (ord('q'), ord('Q')):
+                sys.exit()
+            if key in (ord('v'), ord('V')):
+                self.high_scores()
+            elif key in (ord('p'), ord('P')):
+                return [self.prompt("Enter your name:")]
+            elif key in (ord('h'), ord('H')):
+                return [self.prompt("Enter player one's name:"), self.prompt("Enter player two's name:")]
+            elif key in (ord('b'), ord('B')):
+                return [self.prompt("Enter your name:"), BOT_NAME]
+            elif key in (ord('a'), ord('A')):
+                return [f"{BOT_NAME} 1", f"{BOT_NAME} 2"]
+            elif key in (ord('m'), ord('M')):
+                return self._multi_players()
+
+    def _multi_players(self) -> List[str]:
+        """
+        Gets the number of players, then each name. A blank name makes that player a bot.
+        """
+        count = 0
+        while not 2 <= count <= MAX_PLAYERS:
+            answer = self.prompt(f"How many players? (2-{MAX_PLAYERS})")
+            count = int(answer) if answer.isdigit() else 0
+
+        names = []
+        bots = 0
+        for i in range(count):
+            name = self.prompt(f"Enter player {i + 1}'s name (leave blank for a bot):")
+            if not name:
+                bots += 1
+                name = f"{BOT_NAME} {bots}"
+            names.append(name)
+        return names
+
+    def draw(self, seat: int) -> None:
+        """
+        Draws the table: status, dice and every scorecard
+        """
+        game = self.game
+        dice = game.active_dice
+        scorecard = game.scorecards[seat]
+        name = game.player_names[seat]
+        rolled = bool(dice.rolled)
+
+        lines: List[Tuple[str, int]] = []
+        status = f"Round {min(game.current_round + 1, MAX_ROUNDS)}/{MAX_ROUNDS}   {name}'s turn"
+        if not game.is_bot(seat):
+            status += f"   {dice.rolls_left} roll{'' if dice.rolls_left == 1 else 's'} left"
+        lines.append((status, curses.A_BOLD))
+        lines.append(("", 0))
+
+        if rolled:
+            faces = "  ".join(f"[{d}]" if held else f" {d} " for d, held in zip(dice.rolled, dice.held))
+            lines.append(("Dice:  " + faces, curses.A_BOLD))
+            lines.append(("        " + "    ".join(str(i + 1) for i in range(len(dice.rolled))), curses.A_DIM))
+        else:
+            lines.append(("Dice:  (not rolled yet)", 0))
+            lines.append(("", 0))
+        lines.append(("", 0))
+
+        odds = None
+        if self.show_odds and not game.is_bot(seat):
+            from .odds import dice_odds
+            odds = dice_odds(dice)
+
+        header = " " * 22 + "".join(f"{n[:COLUMN_WIDTH - 1]:<{COLUMN_WIDTH}}" for n in game.player_names)
+        lines.append((header + ("odds" if odds else ""), curses.A_UNDERLINE))
+        for key, category in zip(CATEGORY_KEYS, scorecard.get_all_categories()):
+            row = f"{key}) {category:<19}"
+            for card in game.scorecards:
+                score = card.scores[category]
+                if score is not None:
+                    cell = str(score)
+                elif card is scorecard and rolled and not game.is_bot(seat):
+                    # What the dice would score here
+                    cell = f"({card.calculate_score(dice.rolled, category)})"
+                else:
+                    cell = "-"
+                row += f"{cell:<{COLUMN_WIDTH}}"
+            if odds and not scorecard.is_category_used(category):
+                row += f"{odds[category]:.0%}"
+            lines.append((row, 0))
+
+        lines.append(("", 0))
+        for label, value in (("Upper", lambda c: f"{c.upper_sub} ({c.calc_plus_minus_str()})"),
+                             ("Lower", lambda c: str(c.lower_sub)),
+                             ("Total", lambda c: str(c.total_score))):
+            lines.append((f"   {label:<19}" + "".join(f"{value(c):<{COLUMN_WIDTH}}" for c in game.scorecards),
+                          curses.A_BOLD if label == "Total" else 0))
+
+        lines.append(("", 0))
+        lines.append((self.message, curses.A_BOLD))
+        lines.append(("r roll   1-5 hold   a-m score   o odds   q quit", curses.A_DIM))
+        self.screen.show(lines)
+
+    def human_turn(self, seat: int) -> None:
+        """
+        Rolls, holds and scores from the keyboard
+        """
+        game = self.game
+        dice = game.active_dice
+        scorecard = game.scorecards[seat]
+        categories = scorecard.get_all_categories()
+        game.reset_turn()
+
+        while True:
+            self.draw(seat)
+            key = self.key()
+            self.message = ""
+            if key in (ord('q'), ord('Q')):
+                sys.exit()
+            elif key in (ord('o'), ord('O')):
+                self.show_odds = not self.show_odds
+            elif key in (ord('r'), ord('R'), ord(' ')):
+                if dice.rolls_left > 0:
+                    dice.roll_dice()
+                    dice.rolls_left -= 1
+                else:
+                    self.message = "No more rolls. Pick a category."
+            elif ord('1') <= key <= ord('5'):
+                if dice.rolled and dice.rolls_left > 0:
+                    dice.toggle_hold(key - ord('1'))
+            elif 0 <= key - ord('a') < len(categories):
+                category = categories[key - ord('a')]
+                if not dice.rolled:
+                    self.message = "Roll first."
+                elif scorecard.is_category_used(category):
+                    self.message = f"{category} is already scored."
+                else:
+                    scorecard.update_score(dice.rolled, category)
+                    return
+
+    def bot_turn(self, seat: int) -> None:
+        """
+        Plays a bot's whole turn, then shows what it did
+        """
+        game = self.game
+        scorecard = game.scorecards[seat]
+        game.reset_turn()
+        category = game.process_turn_ai(scorecard, game.bots[seat])
+        self.message = f"{scorecard.player_name} scores {scorecard.scores[category]} in {category}."
+        self.draw(seat)
+        curses.napms(BOT_DELAY_MS)
+
+    def play(self, resume: bool = False) -> str:
+        """
+        Plays a game to the end
+        """
+        if not resume:
+            self.game.setup_new_game(*self.player_names)
+        self.message = ""
+        while not self.game.is_game_over():
+            seat = self.game.current_player
+            if self.game.is_bot(seat):
+                self.bot_turn(seat)
+            else:
+                self.human_turn(seat)
+            self.game.end_turn()
+            # Saved after every scored category, like the pygame UI
+            save_snapshot(self.game)
+        return self.game_over()
+
+    def game_over(self) -> str:
+        """
+        Shows the result. Returns 'p' to play again with the same players, or 'n' for a new mode.
+        """
+        clear_snapshot()
+        self.game.write_high_scores()
+        rankings = self.game.get_rankings()
+        if len(rankings) == 1:
+            lines = [(f"Game complete! Score: {rankings[0][1]}", curses.A_BOLD)]
+        else:
+            lines = [(f"{rankings[0][0]} WINS!", curses.A_BOLD)]
+        lines.append(("", 0))
+        lines += [(f"{i + 1}. {name:<24} {score}", 0) for i, (name, score) in enumerate(rankings)]
+        lines += [("", 0), ("(P)lay again   (N)ew game mode   (V)iew high scores   (Q)uit", 0)]
+
+        while True:
+            self.screen.show(lines)
+            key = self.key()
+            if key in (ord('q'), ord('Q')):
+                sys.exit()
+            if key in (ord('v'), ord('V')):
+                self.high_scores()
+            elif key in (ord('p'), ord('P')):
+                return 'p'
+            elif key in (ord('n'), ord('N')):
+                return 'n'
+
+    def high_scores(self) -> None:
+        """
+        Shows the high scores until a key is pressed
+        """
+        lines = [("High Scores", curses.A_BOLD), ("", 0)]
+        for i, (score, name, opponent) in enumerate(self.game.get_sorted_high_scores()):
+            lines.append((f"{i + 1:>2}. {name:<24} vs. {opponent:<24} {score}", 0))
+        lines += [("", 0), ("Press any key", curses.A_DIM)]
+        self.screen.show(lines)
+        self.key()
+        self.screen.reset()
+
+
+def _main(window) -> None:
+    TerminalUI(window).run()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Command line entry point
+    """
+    try:
+        curses.wrapper(_main)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
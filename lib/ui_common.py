@@ -1,18 +1,58 @@
 """
 Defines various UI constants and utilities for the Yahtzee game
 """
+import atexit
+import math
 import sys
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
 import pygame
 
+from .asset_cache import AssetCache
+
 # Initialize pygame
 pygame.init()
 
 # AI turn pause length in milliseconds
 AI_TURN_DELAY = 2000
 
-# Set up the display
+# Speed-up applied to every pause; math.inf skips pauses altogether
+TIME_SCALE = 1.0
+TIME_SCALES = [1.0, 2.0, 4.0, 8.0, 16.0, 64.0, math.inf]
+# Whether '+' and '-' change the time scale: only while watching a Bot vs Bot game
+SPEED_KEYS = False
+# From this speed up, dice animations are skipped and only every few turns are drawn
+FAST_FORWARD_SCALE = 8.0
+# Keys answered whenever the UI pumps events, whoever's turn it is, e.g. 'd' for the debug HUD
+KEY_HANDLERS: Dict[int, Callable[[], None]] = {}
+
+# Layout size. Every coordinate in the UI is in these units, whatever size the window is.
 WIDTH, HEIGHT = 1440, 900
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
+# How long the window size must hold still before the UI is drawn afresh at the new size (ms)
+RESIZE_DEBOUNCE_MS = 150
+# Posted once the window size has held still, so waiting loops redraw at the new size
+RESIZE_SETTLED = pygame.event.custom_type()
+
+
+def _initial_window_size() -> Tuple[int, int]:
+    """
+    The layout size, shrunk to fit a small desktop, or doubled on a HiDPI one
+    """
+    try:
+        desktop_w, desktop_h = pygame.display.get_desktop_sizes()[0]
+    except (AttributeError, IndexError, pygame.error):
+        return WIDTH, HEIGHT
+    if desktop_w >= 2 * WIDTH and desktop_h >= 2 * HEIGHT + 100:
+        scale = 2.0
+    else:
+        scale = min(1.0, 0.95 * desktop_w / WIDTH, 0.9 * desktop_h / HEIGHT)
+    return round(WIDTH * scale), round(HEIGHT * scale)
+
+
+# Set up the (resizable) window. Everything is drawn onto SCREEN, a Canvas
+# addressed in layout units, and present() shows it in the window.
+WINDOW = pygame.display.set_mode(_initial_window_size(), pygame.RESIZABLE)
 pygame.display.set_caption("Yahtzee")
 
 # Colour constants
@@ -25,8 +65,13 @@ LIGHT_GRAY = (200, 200, 200)
 BLUE = (0, 122, 204)
 DARK_BLUE = (0, 102, 174)
 
-# Font
-FONT = pygame.font.SysFont("Arial", 24)
+
+@lru_cache(maxsize=None)
+def font(size: int) -> pygame.font.Font:
+    """
+    The UI font at <size> pixels, created once per size (until the canvas's scale changes)
+    """
+    return pygame.font.SysFont("Arial", size)
 
 # High score file
 HS_FILE = "high_score.txt"
@@ -34,91 +79,534 @@ HS_FILE = "high_score.txt"
 # Button dimensions
 BUTTON_WIDTH, BUTTON_HEIGHT = 150, 60
 
-# Load player images
-try:
-    hum = pygame.image.load("assets/human.png")
-    HUMAN_IMAGE = pygame.transform.scale(hum, (400, 400))
-
-    bot = pygame.image.load("assets/robot.png")
-    BOT_IMAGE = pygame.transform.scale(bot, (400, 400))
-except pygame.error as e:
-    print(f"Error loading player images: {e}")
-    HUMAN_IMAGE = pygame.Surface((400, 400))
-    HUMAN_IMAGE.fill((255, 0, 0))
-    BOT_IMAGE = pygame.Surface((400, 400))
-    BOT_IMAGE.fill((0, 0, 255))
-
-# Load dice images
-DS = 60  # dice size (px)
-try:
-    # Regular dice images
-    d1 = pygame.image.load("assets/diceOne.png")
-    D1 = pygame.transform.scale(d1, (DS, DS))
-    d2 = pygame.image.load("assets/diceTwo.png")
-    D2 = pygame.transform.scale(d2, (DS, DS))
-    d3 = pygame.image.load("assets/diceThree.png")
-    D3 = pygame.transform.scale(d3, (DS, DS))
-    d4 = pygame.image.load("assets/diceFour.png")
-    D4 = pygame.transform.scale(d4, (DS, DS))
-    d5 = pygame.image.load("assets/diceFive.png")
-    D5 = pygame.transform.scale(d5, (DS, DS))
-    d6 = pygame.image.load("assets/diceSix.png")
-    D6 = pygame.transform.scale(d6, (DS, DS))
-
-    # Mini dice for scorecard
-    DS = 30  # mini dice size (px)
-    MD1 = pygame.transform.scale(d1, (DS, DS))
-    MD2 = pygame.transform.scale(d2, (DS, DS))
-    MD3 = pygame.transform.scale(d3, (DS, DS))
-    MD4 = pygame.transform.scale(d4, (DS, DS))
-    MD5 = pygame.transform.scale(d5, (DS, DS))
-    MD6 = pygame.transform.scale(d6, (DS, DS))
-except pygame.error as e:
-    print(f"Error loading dice images: {e}")
-    # Create fallback surfaces
-    D1, D2, D3, D4, D5, D6 = [pygame.Surface((60, 60)) for _ in range(6)]
-    MD1, MD2, MD3, MD4, MD5, MD6 = [pygame.Surface((30, 30)) for _ in range(6)]
-    
-    # Fill with numbers
-    for i, d in enumerate([D1, D2, D3, D4, D5, D6]):
-        d.fill(WHITE)
-        text = FONT.render(str(i+1), True, BLACK)
-        d.blit(text, (25, 20))
-    
-    for i, d in enumerate([MD1, MD2, MD3, MD4, MD5, MD6]):
-        d.fill(WHITE)
-        mini_font = pygame.font.SysFont("Arial", 16)
-        text = mini_font.render(str(i+1), True, BLACK)
-        d.blit(text, (12, 10))
+
+@lru_cache(maxsize=None)
+def _load_image(path: str) -> Optional[pygame.Surface]:
+    """
+    A source image, decoded the first time a size of it isn't in the pixel cache
+    """
+    try:
+        return pygame.image.load(path)
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"Error loading {path}: {e}")
+        return None
+
+
+# Source images, scaled on demand
+PORTRAIT_FILES = {'human': "assets/human.png", 'bot': "assets/robot.png"}
+PORTRAIT_FALLBACK_COLOURS = {'human': (255, 0, 0), 'bot': (0, 0, 255)}
+DIE_FILES = ["assets/diceOne.png", "assets/diceTwo.png", "assets/diceThree.png",
+             "assets/diceFour.png", "assets/diceFive.png", "assets/diceSix.png"]
+
+# Scaled images from earlier runs (see lib.asset_cache)
+ASSET_CACHE = AssetCache()
+
+
+def _scaled(path: str, size: int) -> Optional[pygame.Surface]:
+    """
+    The image at <path> scaled to <size> pixels square: from the pixel cache,
+    or decoded, scaled and added to it. None if the image can't be loaded.
+    """
+    image = ASSET_CACHE.get(path, (size, size))
+    if image is not None:
+        return image
+    source = _load_image(path)
+    if source is None:
+        return None
+    image = pygame.transform.smoothscale(source.convert_alpha(), (size, size))
+    ASSET_CACHE.put(path, (size, size), image)
+    return image
+
+
+@lru_cache(maxsize=None)
+def portrait(kind: str, size: int) -> pygame.Surface:
+    """
+    The 'human' or 'bot' portrait at <size> pixels square, scaled once per size
+    """
+    image = _scaled(PORTRAIT_FILES[kind], size)
+    if image is None:
+        image = pygame.Surface((size, size))
+        image.fill(PORTRAIT_FALLBACK_COLOURS[kind])
+    return image
+
+
+@lru_cache(maxsize=None)
+def die_image(value: int, size: int) -> pygame.Surface:
+    """
+    The die face for <value> at <size> pixels square, scaled once per size
+    """
+    image = _scaled(DIE_FILES[value - 1], size)
+    if image is not None:
+        return image
+    # Fallback: the number on a white square
+    image = pygame.Surface((size, size))
+    image.fill(WHITE)
+    text = font(max(8, size * 2 // 5)).render(str(value), True, BLACK)
+    image.blit(text, text.get_rect(center=(size // 2, size // 2)))
+    return image
+
+
+class Viewport:
+    """
+    Where the layout sits in the window: one scale factor for both axes,
+    centred, with bars on the sides that don't fit
+    """
+
+    def __init__(self):
+        self.window_size = (0, 0)
+        self.scale = 1.0
+        self.offset = (0, 0)
+        self.size = (WIDTH, HEIGHT)
+        self.resized_at = 0
+
+    def fit(self, window_size: Tuple[int, int], now: int) -> None:
+        """
+        Fits the layout into a new window size
+        """
+        self.window_size = window_size
+        self.scale = min(window_size[0] / WIDTH, window_size[1] / HEIGHT)
+        self.size = (max(1, round(WIDTH * self.scale)), max(1, round(HEIGHT * self.scale)))
+        self.offset = ((window_size[0] - self.size[0]) // 2, (window_size[1] - self.size[1]) // 2)
+        self.resized_at = now
+
+    def settled(self, now: int) -> bool:
+        """
+        Whether the window has stopped being resized
+        """
+        return now - self.resized_at >= RESIZE_DEBOUNCE_MS
+
+    def to_layout(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        """
+        Converts a window position to layout units
+        """
+        return (int((pos[0] - self.offset[0]) / self.scale), int((pos[1] - self.offset[1]) / self.scale))
+
+    def to_window(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        """
+        Converts a position in layout units to the window
+        """
+        return (self.offset[0] + round(pos[0] * self.scale), self.offset[1] + round(pos[1] * self.scale))
+
+
+VIEWPORT = Viewport()
+# The window opens at its final size, so there is nothing to wait for
+VIEWPORT.fit(WINDOW.get_size(), -RESIZE_DEBOUNCE_MS)
+
+
+class Text:
+    """
+    A line of text rendered by a LayoutFont. Its size is in layout units; it
+    is rendered for the canvas's scale when drawn, and again if that changes.
+    """
+
+    def __init__(self, layout_font: 'LayoutFont', text: str, antialias: bool, color: Any,
+                 background: Any = None):
+        self.font = layout_font
+        self.args = (text, antialias, _color_key(color), _color_key(background))
+        self.size = font(layout_font.size).size(text)
+        self._scale = 0.0
+        self._surface: Optional[pygame.Surface] = None
+
+    def surface_at(self, scale: float) -> pygame.Surface:
+        """
+        The text rendered at <scale>
+        """
+        if scale != self._scale:
+            self._surface = font(max(1, round(self.font.size * scale))).render(*self.args)
+            self._scale = scale
+        return self._surface
+
+    def _key(self) -> tuple:
+        return self.font.size, self.args
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is type(self) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def get_size(self) -> Tuple[int, int]:
+        return self.size
+
+    def get_width(self) -> int:
+        return self.size[0]
+
+    def get_height(self) -> int:
+        return self.size[1]
+
+    def get_rect(self, **kwargs: Any) -> pygame.Rect:
+        rect = pygame.Rect((0, 0), self.size)
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+
+class LayoutFont:
+    """
+    The UI font at a size in layout units: renders Text, at the pixel size
+    the canvas's scale calls for
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+
+    def render(self, text: str, antialias: bool, color: Any, background: Any = None) -> Text:
+        return Text(self, text, antialias, color, background)
+
+
+class LayoutImage(Text):
+    """
+    A square image at a size in layout units, fetched at the pixel size the
+    canvas's scale calls for from a size-keyed loader (die_image, portrait)
+    """
+
+    def __init__(self, loader: Callable[[Any, int], pygame.Surface], key: Any, size: int):
+        self.loader = loader
+        self.key = key
+        self.size = (size, size)
+
+    def surface_at(self, scale: float) -> pygame.Surface:
+        return self.loader(self.key, max(1, round(self.size[0] * scale)))
+
+    def _key(self) -> tuple:
+        return self.loader, self.key, self.size
+
+
+def _color_key(color: Any) -> Any:
+    """
+    A color as something hashable, to record it by (pygame.Color isn't)
+    """
+    return tuple(color) if isinstance(color, pygame.Color) else color
+
+
+class Canvas:
+    """
+    The surface the UI draws on, addressed in layout units.
+
+    It is kept at the window's scale: coordinates are scaled as they are
+    drawn, and text and images are rendered at the scaled size, so showing
+    a frame is a plain copy. So it only blits Text and LayoutImage, which
+    can be fetched at any scale, never plain surfaces. Every drawing operation is also recorded in
+    layout units, so the canvas can be drawn afresh at a new scale by
+    replaying them. An opaque fill drops the recorded operations it covers,
+    which keeps the record down to what is still on screen.
+    """
+
+    def __init__(self, scale: float = 1.0):
+        self.scale = scale
+        self.surface = pygame.Surface(self._pixel_size())
+        # Bumped whenever the surface is replaced, for owners of subsurfaces
+        self.version = 0
+        # (method, args) -> layout bounds, in drawing order
+        self._ops: Dict[Tuple[Callable[..., Any], tuple], pygame.Rect] = {}
+
+    def _pixel_size(self) -> Tuple[int, int]:
+        return max(1, round(WIDTH * self.scale)), max(1, round(HEIGHT * self.scale))
+
+    def to_pixels(self, rect: Any) -> pygame.Rect:
+        """
+        A rect in layout units as canvas pixels, rounding its edges so neighbouring rects still meet
+        """
+        rect = pygame.Rect(rect)
+        s = self.scale
+        left, top = round(rect.left * s), round(rect.top * s)
+        return pygame.Rect(left, top, round(rect.right * s) - left, round(rect.bottom * s) - top)
+
+    def _width(self, width: int) -> int:
+        return max(1, round(width * self.scale)) if width > 0 else 0
+
+    def _record(self, bounds: pygame.Rect, opaque: bool, method: Callable[..., Any], args: tuple) -> None:
+        if opaque:
+            for covered in [op for op, op_bounds in self._ops.items() if bounds.contains(op_bounds)]:
+                del self._ops[covered]
+        # Drawing the same thing again in the same place makes the earlier copy redundant
+        self._ops.pop((method, args), None)
+        self._ops[method, args] = bounds
+        method(self, *args)
+
+    def set_scale(self, scale: float) -> None:
+        """
+        Redraws everything recorded at a new scale
+        """
+        if scale == self.scale:
+            return
+        self.scale = scale
+        self.surface = pygame.Surface(self._pixel_size())
+        self.version += 1
+        # Fonts and images are cached by pixel size: let the old scale's go
+        for cached in (font, portrait, die_image):
+            cached.cache_clear()
+        for method, args in self._ops:
+            method(self, *args)
+
+    def get_size(self) -> Tuple[int, int]:
+        return WIDTH, HEIGHT
+
+    def get_rect(self, **kwargs: Any) -> pygame.Rect:
+        rect = pygame.Rect(0, 0, WIDTH, HEIGHT)
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def subsurface(self, rect: Any) -> pygame.Surface:
+        """
+        The pixels under a layout rect, to draw on directly. Nothing drawn on
+        it is recorded: its owner redraws it when the version changes.
+        """
+        return self.surface.subsurface(self.to_pixels(rect))
+
+    # Drawing operations, in layout units
+
+    def fill(self, color: Any, rect: Any = None) -> pygame.Rect:
+        if rect is None:
+            self._ops = {}
+        bounds = self.get_rect() if rect is None else pygame.Rect(rect)
+        self._record(bounds, True, Canvas._do_fill, (_color_key(color), tuple(bounds)))
+        return bounds
+
+    def blit(self, source: Text, dest: Any) -> pygame.Rect:
+        if not isinstance(source, Text):
+            raise TypeError(f"Can't blit {type(source).__name__} on the canvas: use LayoutFont or LayoutImage")
+        bounds = pygame.Rect(dest[:2] if not isinstance(dest, pygame.Rect) else dest.topleft, source.get_size())
+        self._record(bounds, False, Canvas._do_blit, (source, bounds.topleft))
+        return bounds
+
+    def draw_rect(self, color: Any, rect: Any, width: int = 0, border_radius: int = 0) -> pygame.Rect:
+        bounds = pygame.Rect(rect)
+        self._record(bounds, width == 0 and border_radius == 0, Canvas._do_rect,
+                     (_color_key(color), tuple(bounds), width, border_radius))
+        return bounds
+
+    def draw_line(self, color: Any, start: Tuple[int, int], end: Tuple[int, int], width: int = 1) -> pygame.Rect:
+        bounds = pygame.Rect(min(start[0], end[0]), min(start[1], end[1]),
+                             abs(end[0] - start[0]) + 1, abs(end[1] - start[1]) + 1).inflate(width + 2, width + 2)
+        self._record(bounds, False, Canvas._do_line, (_color_key(color), tuple(start), tuple(end), width))
+        return bounds
+
+    # The same, in pixels at the current scale
+
+    def _do_fill(self, color: Any, rect: Tuple[int, int, int, int]) -> None:
+        self.surface.fill(color, self.to_pixels(rect))
+
+    def _do_blit(self, source: Text, topleft: Tuple[int, int]) -> None:
+        s = self.scale
+        self.surface.blit(source.surface_at(s), (round(topleft[0] * s), round(topleft[1] * s)))
+
+    def _do_rect(self, color: Any, rect: Tuple[int, int, int, int], width: int, border_radius: int) -> None:
+        pygame.draw.rect(self.surface, color, self.to_pixels(rect), self._width(width),
+                         border_radius=self._width(border_radius))
+
+    def _do_line(self, color: Any, start: Tuple[int, int], end: Tuple[int, int], width: int) -> None:
+        s = self.scale
+        pygame.draw.line(self.surface, color, (round(start[0] * s), round(start[1] * s)),
+                         (round(end[0] * s), round(end[1] * s)), self._width(width))
+
+
+SCREEN = Canvas(VIEWPORT.scale)
+
+
+def draw_rect(surface: Union[Canvas, pygame.Surface], color: Any, rect: Any, width: int = 0,
+              border_radius: int = 0) -> pygame.Rect:
+    """
+    pygame.draw.rect(), on the canvas (in layout units) or on a plain surface
+    """
+    if isinstance(surface, Canvas):
+        return surface.draw_rect(color, rect, width, border_radius)
+    return pygame.draw.rect(surface, color, rect, width, border_radius=border_radius)
+
+
+def draw_line(surface: Union[Canvas, pygame.Surface], color: Any, start: Tuple[int, int],
+              end: Tuple[int, int], width: int = 1) -> pygame.Rect:
+    """
+    pygame.draw.line(), on the canvas (in layout units) or on a plain surface
+    """
+    if isinstance(surface, Canvas):
+        return surface.draw_line(color, start, end, width)
+    return pygame.draw.line(surface, color, start, end, width)
+
+
+@lru_cache(maxsize=32)
+def layout_font(size: int) -> LayoutFont:
+    """
+    The UI font at <size> layout units, for drawing on SCREEN
+    """
+    return LayoutFont(size)
+
+
+# Fonts
+FONT = layout_font(24)
+NAME_FONT = layout_font(36)
+SMALL_FONT = layout_font(18)
+
+HUMAN_IMAGE = LayoutImage(portrait, 'human', 400)
+BOT_IMAGE = LayoutImage(portrait, 'bot', 400)
+
+# Dice sizes (layout units)
+DS = 60
+MINI_DS = 30
 
 # Dice int to image mapping
-int_to_die = {
-    1: D1,
-    2: D2,
-    3: D3,
-    4: D4,
-    5: D5,
-    6: D6
-}
-
-int_to_mini_die = {
-    1: MD1,
-    2: MD2,
-    3: MD3,
-    4: MD4,
-    5: MD5,
-    6: MD6
-}
+int_to_die = {n: LayoutImage(die_image, n, DS) for n in range(1, 7)}
+int_to_mini_die = {n: LayoutImage(die_image, n, MINI_DS) for n in range(1, 7)}
+
+# Scale the images for the window now, and keep them for the next launch;
+# sizes scaled later (after a resize) are kept at exit
+for _image in [HUMAN_IMAGE, BOT_IMAGE, *int_to_die.values(), *int_to_mini_die.values()]:
+    _image.surface_at(SCREEN.scale)
+ASSET_CACHE.save()
+atexit.register(ASSET_CACHE.save)
+
+
+def present(rects: Optional[Sequence[pygame.Rect]] = None) -> None:
+    """
+    Shows the canvas in the window, in place of pygame.display.flip().
+
+    Only <rects> (in layout units), if given, are copied. When the window
+    has been resized, the last frame is stretched to fit with a quick
+    nearest-neighbour scale until the size has held still for
+    RESIZE_DEBOUNCE_MS; then the canvas is drawn afresh at the new scale.
+    """
+    window = pygame.display.get_surface()
+    now = pygame.time.get_ticks()
+    if window.get_size() != VIEWPORT.window_size:
+        VIEWPORT.fit(window.get_size(), now)
+        window.fill(BLACK)
+        rects = None
+
+    if SCREEN.scale != VIEWPORT.scale:
+        if not VIEWPORT.settled(now):
+            window.blit(pygame.transform.scale(SCREEN.surface, VIEWPORT.size), VIEWPORT.offset)
+            pygame.display.flip()
+            # (Re)arm the wake-up for drawing at the new size
+            pygame.time.set_timer(RESIZE_SETTLED, RESIZE_DEBOUNCE_MS, 1)
+            return
+        SCREEN.set_scale(VIEWPORT.scale)
+        rects = None
+
+    if rects is None:
+        window.blit(SCREEN.surface, VIEWPORT.offset)
+        pygame.display.flip()
+    else:
+        areas = [SCREEN.to_pixels(rect) for rect in rects]
+        moved = [area.move(VIEWPORT.offset) for area in areas]
+        for rect, area in zip(moved, areas):
+            window.blit(SCREEN.surface, rect, area)
+        pygame.display.update(moved)
+
+
+def resize_window(size: Tuple[int, int]) -> None:
+    """
+    Sets the window size from code, drawing at the new size straight away
+    """
+    pygame.display.set_mode(size, pygame.RESIZABLE)
+    VIEWPORT.fit(size, -RESIZE_DEBOUNCE_MS)
+    SCREEN.set_scale(VIEWPORT.scale)
+
+
+def mouse_pos() -> Tuple[int, int]:
+    """
+    The mouse position in layout units
+    """
+    return VIEWPORT.to_layout(pygame.mouse.get_pos())
+
+
+def set_time_scale(scale: float, speed_keys: bool = False) -> None:
+    """
+    Set the speed-up applied to pauses: 1 is normal speed, math.inf is uncapped.
+    '+' and '-' change it from there if <speed_keys> is set.
+    """
+    global TIME_SCALE, SPEED_KEYS
+    TIME_SCALE = scale
+    SPEED_KEYS = speed_keys
+    pygame.display.set_caption("Yahtzee" if scale == 1 else f"Yahtzee ({time_scale_label()})")
+
+
+def time_scale_label() -> str:
+    """
+    The current speed, for display
+    """
+    return "uncapped" if math.isinf(TIME_SCALE) else f"{TIME_SCALE:g}x"
+
+
+def fast_forward() -> bool:
+    """
+    Whether the game is running fast enough to skip animations
+    """
+    return TIME_SCALE >= FAST_FORWARD_SCALE
+
+
+def turns_per_frame() -> int:
+    """
+    How many turns to play between redraws: every turn at normal speeds, more when fast-forwarding
+    """
+    if not fast_forward():
+        return 1
+    if math.isinf(TIME_SCALE):
+        return 8
+    return int(TIME_SCALE // FAST_FORWARD_SCALE)
+
+
+def adjustable_time_scale() -> Optional[float]:
+    """
+    The time scale if the speed keys are on (a Bot vs Bot game), otherwise None
+    """
+    return TIME_SCALE if SPEED_KEYS else None
+
+
+def handle_speed_key(event: pygame.event.Event) -> bool:
+    """
+    Step the time scale up with '+' or down with '-', if the speed keys are on.
+    Returns True if the event was one of those keys and changed the speed.
+    """
+    if not SPEED_KEYS or event.type != pygame.KEYDOWN or event.key not in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS,
+                                                         pygame.K_MINUS, pygame.K_KP_MINUS):
+        return False
+    step = -1 if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS) else 1
+    index = TIME_SCALES.index(TIME_SCALE) if TIME_SCALE in TIME_SCALES else 0
+    set_time_scale(TIME_SCALES[max(0, min(len(TIME_SCALES) - 1, index + step))], speed_keys=True)
+    return True
+
+
+def on_key(key: int, handler: Callable[[], None]) -> None:
+    """
+    Call <handler> whenever <key> is pressed while the UI pumps events
+    """
+    KEY_HANDLERS[key] = handler
+
+
+def handle_key(event: pygame.event.Event) -> bool:
+    """
+    Call the handler registered with on_key for a key press.
+    Returns True if the event was one of those keys.
+    """
+    if event.type != pygame.KEYDOWN or event.key not in KEY_HANDLERS:
+        return False
+    KEY_HANDLERS[event.key]()
+    return True
+
+
+def pump_events() -> None:
+    """
+    Answers the events that matter while the UI waits on the game rather than
+    on input (bot turns, pauses): quitting, resizing, the speed keys and the keys
+    registered with on_key.
+    """
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            sys.exit()
+        if event.type in (pygame.VIDEORESIZE, RESIZE_SETTLED):
+            present()
+        handle_speed_key(event)
+        handle_key(event)
 
 
 def pause(delay: int) -> None:
     """
-    Loops until <delay> milliseconds has passed.
+    Loops until <delay> milliseconds, divided by the time scale, has passed.
     """
+    delay = delay / TIME_SCALE
     begin_time = pygame.time.get_ticks()
     while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
-        if pygame.time.get_ticks() - begin_time > delay:
+        pump_events()
+        if delay <= 0 or pygame.time.get_ticks() - begin_time > delay:
             return
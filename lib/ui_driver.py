@@ -0,0 +1,351 @@
+"""
+Drives the real pygame UI headlessly, from a script, on virtual time.
+
+The UI runs under SDL's dummy video driver. Its event reads are answered from
+a script, and its pauses and frame-rate waits only move a virtual clock
+forward. A full game plays out in well under a second. Every frame shown
+through present() is counted and, if asked for, hashed, so a test can check
+that a scripted game still draws what it used to.
+
+A script is a generator taking the driver. It yields events, or lists of
+them, for the UI to read. The generator only runs when the UI asks for
+input, so the code between yields sees the UI as it is at that moment,
+e.g. to click a category:
+
+    def script(driver):
+        yield driver.key('p')
+        yield driver.text("Ann")
+        yield driver.key('r')
+        yield driver.click_category(0, 'Chance')
+        ...
+
+Only the input loops take scripted events. The event pump the game loop
+and pause() share (ui_common.pump_events) is swapped for one that reads
+nothing, so it can't swallow input meant for a turn.
+"""
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame  # noqa: E402
+
+if TYPE_CHECKING:
+    from .ui_common import Canvas
+
+# Repository root: ui_common loads its assets relative to it
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Keys spelled out by name in scripts
+KEY_NAMES = {'\n': pygame.K_RETURN, 'return': pygame.K_RETURN, '\b': pygame.K_BACKSPACE,
+             'backspace': pygame.K_BACKSPACE, '+': pygame.K_PLUS, '-': pygame.K_MINUS}
+
+Script = Callable[['UIDriver'], Iterator[Union[pygame.event.Event, List[pygame.event.Event]]]]
+
+
+class ScriptEnded(Exception):
+    """
+    The UI wanted more input than the script had
+    """
+
+
+class VirtualClock:
+    """
+    Stands in for pygame.time.Clock: tick() moves virtual time on instead of sleeping
+    """
+
+    def __init__(self, driver: 'UIDriver'):
+        self.driver = driver
+
+    def tick(self, framerate: float = 0) -> int:
+        """
+        Advances virtual time by one frame at <framerate>
+        """
+        step = int(1000 / framerate) if framerate else 0
+        self.driver.now_ms += step
+        return step
+
+
+class UIDriver:
+    """
+    Runs YahtzeeUI on a script and records what it drew
+    """
+
+    def __init__(self, script: Script, seed: int = 0, hash_frames: bool = False,
+                 workdir: Optional[str] = None, time_frames: bool = False):
+        self.script = script(self)
+        self.seed = seed
+        self.hash_frames = hash_frames
+        self.time_frames = time_frames
+        # High scores, history and saved games go here, not in the real working directory
+        self.workdir = workdir or tempfile.mkdtemp(prefix="yahtzee-ui-")
+        os.makedirs(self.workdir, exist_ok=True)
+        self.now_ms = 0
+        self.mouse = (0, 0)
+        self.frames = 0
+        self.frame_hashes: List[str] = []
+        # Wall-clock ms from each frame shown to the next, if time_frames is set (callers drain it)
+        self.frame_ms: List[float] = []
+        self._last_frame: Optional[float] = None
+        self.captures: Dict[str, str] = {}
+        self.ui = None
+        self._pending: Deque[pygame.event.Event] = deque()
+        self._patches: List[Tuple[object, str, object]] = []
+
+    # Events for scripts
+
+    def key(self, key: str) -> pygame.event.Event:
+        """
+        A key press: a single character, or 'return', 'backspace', '+' or '-'
+        """
+        code = KEY_NAMES.get(key, None)
+        if code is None:
+            code = ord(key.lower())
+        return pygame.event.Event(pygame.KEYDOWN, key=code, unicode=key if len(key) == 1 else '', mod=0)
+
+    def text(self, text: str) -> List[pygame.event.Event]:
+        """
+        Typing <text> followed by Return
+        """
+        return [self.key(char) for char in text] + [self.key('return')]
+
+    def click(self, pos: Tuple[int, int]) -> List[pygame.event.Event]:
+        """
+        A left click at <pos>, in layout units, wherever that is in the window
+        """
+        from .ui_common import VIEWPORT
+
+        pos = VIEWPORT.to_window((int(pos[0]), int(pos[1])))
+        return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1),
+                pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=1)]
+
+    def click_die(self, index: int) -> List[pygame.event.Event]:
+        """
+        A click on die <index>, at its place in DiceUI.positions
+        """
+        from .ui_common import DS
+
+        x, y = self.ui.dice_ui.positions[index]
+        return self.click((x + DS // 2, y + DS // 2))
+
+    def click_category(self, seat: int, category: str) -> List[pygame.event.Event]:
+        """
+        A click on a category of a player's scorecard, from ScorecardUI.category_rects
+        """
+        return self.click(self.ui.card_uis[seat].category_rects[category].center)
+
+    def resize(self, size: Tuple[int, int]) -> pygame.event.Event:
+        """
+        The window being dragged to <size>: resizes it now, and returns the
+        event the UI reads. The UI shows stretched frames until settle().
+        """
+        pygame.display.set_mode(size, pygame.RESIZABLE)
+        return pygame.event.Event(pygame.VIDEORESIZE, size=size, w=size[0], h=size[1])
+
+    def settle(self) -> pygame.event.Event:
+        """
+        The window holding still after a resize: moves virtual time past the
+        debounce and returns the wake-up event the UI is waiting for
+        """
+        from .ui_common import RESIZE_DEBOUNCE_MS, RESIZE_SETTLED
+
+        self.now_ms += RESIZE_DEBOUNCE_MS
+        return pygame.event.Event(RESIZE_SETTLED)
+
+    def capture(self, label: str) -> str:
+        """
+        Hashes the screen as it is now, under <label>
+        """
+        from .ui_common import SCREEN
+
+        self.captures[label] = self.screen_hash(SCREEN)
+        return self.captures[label]
+
+    @staticmethod
+    def screen_hash(surface: Union[pygame.Surface, 'Canvas']) -> str:
+        """
+        Short hash of a surface's (or the canvas's) pixels
+        """
+        surface = getattr(surface, 'surface', surface)
+        to_bytes = getattr(pygame.image, 'tobytes', None) or pygame.image.tostring
+        return hashlib.blake2b(to_bytes(surface, 'RGB'), digest_size=8).hexdigest()
+
+    # Stand-ins for pygame and ui_common
+
+    def _pull(self) -> None:
+        """
+        Queues the script's next event(s)
+        """
+        try:
+            item = next(self.script)
+        except StopIteration:
+            raise ScriptEnded("The script ran out of input") from None
+        events = item if isinstance(item, list) else [item]
+        for event in events:
+            if hasattr(event, 'pos'):
+                self.mouse = event.pos
+        self._pending.extend(events)
+
+    def _event_get(self, *args, **kwargs) -> List[pygame.event.Event]:
+        if not self._pending:
+            self._pull()
+        events = list(self._pending)
+        self._pending.clear()
+        return events
+
+    def _event_wait(self, *args, **kwargs) -> pygame.event.Event:
+        while not self._pending:
+            self._pull()
+        return self._pending.popleft()
+
+    def _pump_events(self) -> None:
+        pass
+
+    def _pause(self, delay: int) -> None:
+        from . import ui_common
+
+        self.now_ms += int(delay / ui_common.TIME_SCALE)
+
+    def _present(self, rects=None) -> None:
+        from . import ui_common
+
+        self._real_present(rects)
+        self.frames += 1
+        if self.hash_frames:
+            self.frame_hashes.append(self.screen_hash(ui_common.SCREEN))
+        if self.time_frames:
+            now = time.perf_counter()
+            if self._last_frame is not None:
+                self.frame_ms.append((now - self._last_frame) * 1000)
+            self._last_frame = now
+
+    def _patch(self, owner: object, name: str, value: object) -> None:
+        self._patches.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, value)
+
+    def _install(self) -> None:
+        """
+        Swaps the stand-ins into pygame and into every UI module holding its own reference
+        """
+        from . import ui_common
+
+        self._real_present = ui_common.present
+        self._patch(pygame.event, 'get', self._event_get)
+        self._patch(pygame.event, 'wait', self._event_wait)
+        self._patch(pygame.mouse, 'get_pos', lambda: self.mouse)
+        self._patch(pygame.time, 'get_ticks', lambda: self.now_ms)
+        self._patch(pygame.time, 'Clock', lambda: VirtualClock(self))
+
+        stand_ins = {'pause': (ui_common.pause, self._pause),
+                     'pump_events': (ui_common.pump_events, self._pump_events),
+                     'present': (self._real_present, self._present)}
+        package = __name__.rpartition('.')[0]
+        for name, module in list(sys.modules.items()):
+            if module is None or not (name == package or name.startswith(package + '.')):
+                continue
+            for attr, (real, stand_in) in stand_ins.items():
+                if getattr(module, attr, None) is real:
+                    self._patch(module, attr, stand_in)
+
+    def _uninstall(self) -> None:
+        while self._patches:
+            owner, name, value = self._patches.pop()
+            setattr(owner, name, value)
+
+    def run(self) -> 'UIDriver':
+        """
+        Runs the UI until it quits or the script runs out, and returns the driver
+        """
+        cwd = os.getcwd()
+        os.chdir(ROOT)
+        try:
+            from . import game_ui, ui_common
+            # One layout unit per pixel, so frames hash the same on any display
+            ui_common.resize_window((ui_common.WIDTH, ui_common.HEIGHT))
+        finally:
+            os.chdir(cwd)
+
+        state = random.getstate()
+        random.seed(self.seed)
+        self._install()
+        os.chdir(self.workdir)
+        try:
+            self.ui = game_ui.YahtzeeUI.__new__(game_ui.YahtzeeUI)
+            self.ui.__init__()
+        except SystemExit:
+            pass
+        finally:
+            os.chdir(cwd)
+            self._uninstall()
+            random.setstate(state)
+        return self
+
+    @property
+    def scores(self) -> List[int]:
+        """
+        Final scores of the last game played
+        """
+        return [scorecard.total_score for scorecard in self.ui.game.scorecards]
+
+
+# Called at each game-over screen with the driver and the number of the game just finished (from 0)
+GameOverHook = Callable[['UIDriver', int], None]
+
+
+def practice_script(name: str = "Tester", games: int = 1, on_game_over: Optional[GameOverHook] = None) -> Script:
+    """
+    Plays <games> practice games with the EV bot's choices, clicking the dice
+    to hold and the categories to score, then quits
+    """
+    def script(driver: UIDriver):
+        from .strategy import get_strategy
+        bot = get_strategy('ev').strategy
+
+        yield driver.key('p')
+        yield driver.text(name)
+        for game in range(games):
+            if game:
+                # Play again from the game-over screen
+                yield driver.key('p')
+            for _ in range(13):
+                game_state = driver.ui.game
+                dice, scorecard = game_state.active_dice, game_state.scorecards[0]
+                yield driver.key('r')
+                while dice.rolls_left > 0:
+                    holds = bot.choose_holds(dice, scorecard)
+                    if all(holds):
+                        break
+                    for i, (want, held) in enumerate(zip(holds, dice.held)):
+                        if want != held:
+                            yield driver.click_die(i)
+                    yield driver.key('r')
+                yield driver.click_category(0, bot.choose_category(dice, scorecard))
+            driver.capture(f"game {game + 1} over")
+            if on_game_over:
+                on_game_over(driver, game)
+        yield driver.key('q')
+
+    return script
+
+
+def auto_script(speed: str = "0", games: int = 1, on_game_over: Optional[GameOverHook] = None) -> Script:
+    """
+    Watches <games> Bot vs Bot games at a speed-up (0 for uncapped), playing
+    again from each game-over screen, then quits
+    """
+    def script(driver: UIDriver):
+        yield driver.key('a')
+        yield driver.text(speed)
+        for game in range(games):
+            # The next input is read by the game-over screen
+            driver.capture(f"game {game + 1} over")
+            if on_game_over:
+                on_game_over(driver, game)
+            yield driver.key('p' if game + 1 < games else 'q')
+
+    return script